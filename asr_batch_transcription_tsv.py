@@ -8,6 +8,10 @@ for more information on running ASR interactions.
 Example to run:
 python3 asr_batch_transcription_tsv.py "C:\test_audio_ref_file.tsv" results.tsv .raw .ulaw
 
+Add "--concurrency N" to run up to N interactions at once, and "--ordered" to write the results in input order.
+Add "--cache-mb N" to keep up to N MB of audio in memory, for TSVs that list the same audio files many times.
+Add "--global-grammars" to load the grammar once for the deployment and reference it by label in each interaction.
+
 Refer to the integration diagrams found here:
 https://developer.lumenvox.com/asr-integration#section/INTEGRATION-WORKFLOWS/ASR
 
@@ -20,6 +24,7 @@ https://developer.lumenvox.com/asr-lumenvox.proto
 Further information on configuration settings can be found here:
 https://developer.lumenvox.com/asr-configuration
 """
+import asyncio
 import sys
 
 # Import protocol buffer messages from settings.
@@ -33,12 +38,18 @@ from helpers import grammar_helper
 from helpers import settings_helper
 
 # Import code needed to interact with the API.
+from lumenvox_api_handler import deployment_id
+from lumenvox_api_handler import operator_id
 from lumenvox_api_handler import LumenVoxApiClient
 
 # Import AudioHandling code to assist with AudioPush sequences.
 from helpers.audio_helper import AudioHandler
 # Import the AudioFormat used in this file.
 from helpers.audio_helper import AUDIO_FORMAT_ULAW_8KHZ
+# Import the audio cache, used when the same audio files are listed many times.
+from helpers.audio_cache_helper import AudioCache
+# Import the global grammar registry, used to load grammars once instead of sending them with every interaction.
+from helpers.global_grammar_helper import GlobalGrammarRegistry
 
 # Import InteractionData and ASR batch function from the asr_batch_sample.py script.
 from asr_batch_sample import AsrInteractionData
@@ -46,22 +57,46 @@ from asr_batch_sample import asr_batch
 
 
 def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient, tsv_read_file_path: str,
-                         tsv_result_file_path: str, extensions: list = None):
+                         tsv_result_file_path: str, extensions: list = None, concurrency: int = 1,
+                         ordered: bool = False, audio_cache_max_bytes: int = 0, global_grammars: bool = False):
     """
-    Function to run interactions in a loop based on the contents provided in tsv_read_file_path.
+    Function to run interactions based on the contents provided in tsv_read_file_path.
     Specify grammars and settings in this particular function if necessary.
 
     :param lumenvox_api_client: Our class that interacts with the LumenVox API and wraps its gRPC functions.
     :param tsv_read_file_path: Path to TSV file listing audio files to run interactions on.
     :param tsv_result_file_path: Path to TSV to save results to.
     :param extensions: List of strings for limiting the extensions to use.
+    :param concurrency: Maximum number of interactions to run at once. Values above 1 require the client to be in
+    persistent loop mode (used as a context manager), since the interactions share its reader tasks.
+    :param ordered: If True, results are written in the order of the input TSV instead of as interactions complete.
+    :param audio_cache_max_bytes: If set, audio files are read through an AudioCache of this size, so files listed
+    more than once are only read from disk once.
+    :param global_grammars: If True, the grammars are loaded once for the deployment over a Global stream, and each
+    interaction references them by label instead of sending the full grammar text. Requires persistent loop mode.
     """
+    if concurrency > 1 and not lumenvox_api_client.persistent_loop:
+        raise ValueError("Running interactions concurrently requires the LumenVoxApiClient to be used as a context "
+                         "manager (persistent loop mode).")
+    if global_grammars and not lumenvox_api_client.persistent_loop:
+        raise ValueError("Global grammars require the LumenVoxApiClient to be used as a context manager (persistent "
+                         "loop mode).")
 
     # Specify grammars here.
-    grammar_msgs = [
-        grammar_helper.inline_grammar_by_file_ref(
-            grammar_reference='../sample_data/Grammar/en-US/en_transcription.grxml')
-    ]
+    grammar_reference = '../sample_data/Grammar/en-US/en_transcription.grxml'
+    grammar_registry = None
+    if global_grammars:
+        # Load the grammar once, and reference it by its global label in every interaction.
+        grammar_registry = GlobalGrammarRegistry(lumenvox_api_client=lumenvox_api_client,
+                                                 deployment_uuid=deployment_id, operator_uuid=operator_id)
+        grammar_msgs = [
+            lumenvox_api_client.run_user_coroutine(user_coroutine=grammar_registry.load_grammar_file(
+                language='en-us', grammar_reference=grammar_reference))[0]
+        ]
+    else:
+        grammar_msgs = [
+            grammar_helper.inline_grammar_by_file_ref(grammar_reference=grammar_reference)
+        ]
 
     # Define an audio format for ULAW 8kHz. See the audio_helper file referenced above for more information on the
     # data within these messages.
@@ -79,14 +114,100 @@ def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCl
     recognition_settings = settings_helper.define_recognition_settings()
     vad_settings = settings_helper.define_vad_settings(use_vad=True)
 
+    audio_cache = AudioCache(max_bytes=audio_cache_max_bytes) if audio_cache_max_bytes else None
+
+    def define_interaction_data(filepath: str) -> AsrInteractionData:
+        """
+        Construct interaction data for the given audio file.
+        """
+        interaction_data = AsrInteractionData()
+        interaction_data.language_code = 'en-us'
+        interaction_data.audio_consume_settings = audio_consume_settings
+        interaction_data.recognition_settings = recognition_settings
+        interaction_data.vad_settings = vad_settings
+        interaction_data.audio_handler = \
+            AudioHandler(
+                audio_file_path=filepath,
+                audio_format=audio_format_msg,
+                lumenvox_api_client=lumenvox_api_client,
+                chunk_audio=False,
+                audio_cache=audio_cache)
+        interaction_data.grammar_messages = grammar_msgs
+
+        return interaction_data
+
     # Open the result file in the specified path and write the first line.
     results_tsv = open(tsv_result_file_path, "a")
     results_tsv.write("audio_file_ref\tinteraction_id\tfinal_result_status\ttranscript\n")
 
-    # Loop through files referenced in TSV and run ASR interactions.
+    filepaths = read_audio_file_refs_from_tsv(tsv_read_file_path=tsv_read_file_path, extensions=extensions)
+
+    if concurrency > 1:
+        # Run up to `concurrency` interactions at once, all within a single coroutine.
+        coroutine = run_interactions_concurrently(lumenvox_api_client=lumenvox_api_client, filepaths=filepaths,
+                                                  define_interaction_data=define_interaction_data,
+                                                  results_tsv=results_tsv, concurrency=concurrency, ordered=ordered,
+                                                  grammar_registry=grammar_registry)
+        lumenvox_api_client.run_user_coroutine(user_coroutine=coroutine)
+    else:
+        # Loop through files referenced in TSV and run ASR interactions one after another.
+        for filepath in filepaths:
+            # Run the coroutine for the file referenced in the TSV.
+            coroutine = run_asr_batch(lumenvox_api_client=lumenvox_api_client,
+                                      define_interaction_data=define_interaction_data, filepath=filepath,
+                                      grammar_registry=grammar_registry)
+
+            # The function that handles the interaction will be run alongside the stream-reading tasks.
+            # Upon finishing, the tasks will provide return values as a tuple. run_user_coroutine returns those
+            # values, the first of which being the result needed for this script.
+            try:
+                loop_run_return_values = lumenvox_api_client.run_user_coroutine(user_coroutine=coroutine)
+                final_result_msg = loop_run_return_values[0]
+            except Exception as e:
+                # A failed row is written without a result, instead of stopping the rest of the batch.
+                print("Interaction for", filepath, "failed:", repr(e))
+                final_result_msg = None
+
+            # Write results to TSV file.
+            write_result_info_to_tsv(tsv_file=results_tsv, result_msg=final_result_msg, audio_file_ref=filepath)
+
+    if grammar_registry:
+        lumenvox_api_client.run_user_coroutine(user_coroutine=grammar_registry.close())
+
+
+async def run_asr_batch(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient, define_interaction_data,
+                        filepath: str, grammar_registry: GlobalGrammarRegistry = None):
+    """
+    Run an ASR batch interaction for the given audio file. If the interaction fails because a global grammar it
+    references is missing from the server, the grammar is reloaded and the interaction is run once more.
+
+    :param lumenvox_api_client: Our class that interacts with the LumenVox API and wraps its gRPC functions.
+    :param define_interaction_data: Function returning the AsrInteractionData for an audio file path.
+    :param filepath: Path of the audio file.
+    :param grammar_registry: Registry of the global grammars referenced by the interaction, if any.
+    :return: Final result message.
+    """
+    final_result_msg = await asr_batch(lumenvox_api_client=lumenvox_api_client,
+                                       asr_interaction_data=define_interaction_data(filepath))
+
+    if grammar_registry and await grammar_registry.reload_missing_grammars(final_result_msg):
+        final_result_msg = await asr_batch(lumenvox_api_client=lumenvox_api_client,
+                                           asr_interaction_data=define_interaction_data(filepath))
+
+    return final_result_msg
+
+
+def read_audio_file_refs_from_tsv(tsv_read_file_path: str, extensions: list = None) -> list:
+    """
+    Read the audio file references listed in the TSV file (skipping the header line).
+    :param tsv_read_file_path: Path to TSV file listing audio files to run interactions on.
+    :param extensions: List of strings for limiting the extensions to use.
+    :return: List of audio file paths.
+    """
+    filepaths = []
+
     with (open(tsv_read_file_path) as tsv_file):
         first_line_read = False
-        filepath = ''
 
         # Loop through each line in file.
         for line in tsv_file:
@@ -101,6 +222,7 @@ def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCl
 
             # Grab the filepath from the TSV entry.
             # Check for extensions if provided.
+            filepath = ''
             if extensions:
                 for ext in extensions:
                     if split_line[0].endswith(ext):
@@ -110,32 +232,79 @@ def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCl
                 filepath = split_line[0]
 
             if filepath:
-                # Construct interaction data for the current audio file.
-                interaction_data = AsrInteractionData()
-                interaction_data.language_code = 'en-us'
-                interaction_data.audio_consume_settings = audio_consume_settings
-                interaction_data.recognition_settings = recognition_settings
-                interaction_data.vad_settings = vad_settings
-                interaction_data.audio_handler = \
-                    AudioHandler(
-                        audio_file_path=filepath,
-                        audio_format=audio_format_msg,
-                        lumenvox_api_client=lumenvox_api_client,
-                        chunk_audio=False)
-                interaction_data.grammar_messages = grammar_msgs
-
-                # Run the coroutine for the file referenced in the TSV.
-                coroutine = asr_batch(lumenvox_api_client=lumenvox_api_client,
-                                      asr_interaction_data=interaction_data)
-
-                # The function that handles the interaction will be run alongside the stream-reading tasks.
-                # Upon finishing, the tasks will provide return values as a tuple. run_user_coroutine returns those
-                # values, the first of which being the result needed for this script.
-                loop_run_return_values = lumenvox_api_client.run_user_coroutine(user_coroutine=coroutine)
-                final_result_msg = loop_run_return_values[0]
+                filepaths.append(filepath)
+
+    return filepaths
 
-                # Write results to TSV file.
-                write_result_info_to_tsv(tsv_file=results_tsv, result_msg=final_result_msg, audio_file_ref=filepath)
+
+async def run_interactions_concurrently(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient,
+                                        filepaths: list, define_interaction_data, results_tsv, concurrency: int,
+                                        ordered: bool = False, grammar_registry: GlobalGrammarRegistry = None):
+    """
+    Run ASR batch interactions for the given audio files, with at most `concurrency` running at once.
+    Results are written as interactions complete, or in input order if `ordered` is set (in which case a result is
+    held back only until every earlier row has been written). A row whose interaction raises an exception is written
+    with 'No result', and the remaining rows still run.
+
+    :param lumenvox_api_client: Our class that interacts with the LumenVox API and wraps its gRPC functions.
+    :param filepaths: List of audio file paths to run interactions on.
+    :param define_interaction_data: Function returning the AsrInteractionData for an audio file path.
+    :param results_tsv: TSV file to write results to.
+    :param concurrency: Maximum number of interactions to run at once.
+    :param ordered: If True, write results in the order of filepaths.
+    :param grammar_registry: Registry of the global grammars referenced by the interactions, if any.
+    """
+    # A fixed pool of workers pulls rows from a bounded queue, so only `concurrency` rows are in flight at any time,
+    # however many rows the TSV lists.
+    row_queue = asyncio.Queue(maxsize=concurrency)
+    completed_results = {}  # Map of input index to (filepath, result), for results waiting to be written in order.
+    next_index_to_write = 0
+
+    def write_result(index: int, filepath: str, final_result_msg):
+        nonlocal next_index_to_write
+
+        if not ordered:
+            write_result_info_to_tsv(tsv_file=results_tsv, result_msg=final_result_msg, audio_file_ref=filepath)
+            return
+
+        completed_results[index] = (filepath, final_result_msg)
+        while next_index_to_write in completed_results:
+            filepath, final_result_msg = completed_results.pop(next_index_to_write)
+            write_result_info_to_tsv(tsv_file=results_tsv, result_msg=final_result_msg, audio_file_ref=filepath)
+            next_index_to_write += 1
+
+    async def run_worker():
+        while True:
+            row = await row_queue.get()
+            if row is None:
+                return
+
+            index, filepath = row
+            try:
+                # The audio file is only read once a worker picks up the row, to keep memory use bounded.
+                final_result_msg = await run_asr_batch(lumenvox_api_client=lumenvox_api_client,
+                                                       define_interaction_data=define_interaction_data,
+                                                       filepath=filepath, grammar_registry=grammar_registry)
+            except Exception as e:
+                # A failed row is written without a result, instead of stopping the rest of the batch.
+                print("Interaction for", filepath, "failed:", repr(e))
+                final_result_msg = None
+
+            write_result(index=index, filepath=filepath, final_result_msg=final_result_msg)
+
+    worker_count = min(concurrency, len(filepaths))
+    workers = [asyncio.create_task(run_worker()) for _ in range(worker_count)]
+    try:
+        for row in enumerate(filepaths):
+            await row_queue.put(row)
+        # One stop marker per worker, queued after every row.
+        for _ in workers:
+            await row_queue.put(None)
+
+        await asyncio.gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
 
 
 def write_result_info_to_tsv(tsv_file, result_msg, audio_file_ref: str):
@@ -149,18 +318,15 @@ def write_result_info_to_tsv(tsv_file, result_msg, audio_file_ref: str):
     # Define array of fields with final result information.
     fields = [
         audio_file_ref,
-        result_msg.interaction_id,
+        result_msg.interaction_id if result_msg else '',
         str(result_msg.final_result_status) if result_msg else 'No result',
         result_msg.final_result.asr_interaction_result.n_bests[0].asr_result_meta_data.transcript
-        if result_msg else 'No result'
+        if result_msg and result_msg.final_result.asr_interaction_result.n_bests else 'No result'
     ]
 
-    # Populate a string that will be inserted as a line in the results TSV.
-    fields_str = ''
-    for f in fields:
-        fields_str += (f + '\t') if (fields[-1] != f) else f
-
-    fields_str += '\n'
+    # Populate a string that will be inserted as a line in the results TSV. Fields are joined by position, since
+    # several of them can hold the same value (such as 'No result').
+    fields_str = '\t'.join(fields) + '\n'
     tsv_file.write(fields_str)
 
 
@@ -170,9 +336,14 @@ if __name__ == '__main__':
     sys.argv[1] - TSV file to get audio file paths from.
     sys.argv[2] - TSV file to write to.
     (optional) sys.argv[3:] - Audio file extensions to limit to.
+    (optional) --concurrency N - Run up to N interactions at once.
+    (optional) --ordered - Write results in input order (when running concurrently).
+    (optional) --cache-mb N - Cache up to N MB of audio files in memory.
+    (optional) --global-grammars - Load the grammar once for the deployment and reference it by label.
     
     Ex.:
     python3 asr_batch_transcription_tsv.py "C:\test_audio_ref_file.tsv" results.tsv .raw .ulaw
+    python3 asr_batch_transcription_tsv.py "C:\test_audio_ref_file.tsv" results.tsv --concurrency 16 --ordered
     
     The TSV that is read should only contain the header followed by a list of the audio files on each line.
     Example:
@@ -182,25 +353,56 @@ if __name__ == '__main__':
     C:\audio3.raw
 
     """
-
-    if len(sys.argv) < 3:
+    args = sys.argv[1:]
+
+    # Take the optional flags out of the argument list before reading the positional arguments.
+    max_concurrency = 1
+    write_ordered = False
+    cache_max_bytes = 0
+    use_global_grammars = False
+    try:
+        if '--concurrency' in args:
+            flag_index = args.index('--concurrency')
+            max_concurrency = int(args[flag_index + 1])
+            del args[flag_index:flag_index + 2]
+        if '--ordered' in args:
+            write_ordered = True
+            args.remove('--ordered')
+        if '--cache-mb' in args:
+            flag_index = args.index('--cache-mb')
+            cache_max_bytes = int(float(args[flag_index + 1]) * 1024 * 1024)
+            del args[flag_index:flag_index + 2]
+        if '--global-grammars' in args:
+            use_global_grammars = True
+            args.remove('--global-grammars')
+    except (IndexError, ValueError):
+        max_concurrency = 0
+
+    if len(args) < 2 or max_concurrency < 1:
         print("Invalid number of arguments")
         print("sys.argv[1] - TSV file to get audio file paths from")
         print("sys.argv[2] - TSV file to write to")
         print("(optional) sys.argv[3:] - Audio file extensions to limit to")
+        print("(optional) --concurrency N - Run up to N interactions at once")
+        print("(optional) --ordered - Write results in input order (when running concurrently)")
+        print("(optional) --cache-mb N - Cache up to N MB of audio files in memory")
+        print("(optional) --global-grammars - Load the grammar once for the deployment and reference it by label")
 
         sys.exit()
 
-    tsv_file_path = sys.argv[1]
-    tsv_result_path = sys.argv[2]
+    tsv_file_path = args[0]
+    tsv_result_path = args[1]
 
     # This will grab the list of extensions if one or more are provided.
-    file_extensions: list = None if (len(sys.argv) < 4) else sys.argv[3:]
+    file_extensions: list = None if (len(args) < 3) else args[2:]
 
     # Initialize the LumenVoxApiClient class which houses the underlying read/write API functions, as well as allow the
     # user to run sessions as tasks along with other tasks to read responses from the API.
-    lumenvox_api = LumenVoxApiClient()
-
-    # Run through interactions here (and specify different grammars or settings if need be).
-    process_interactions(lumenvox_api_client=lumenvox_api, tsv_read_file_path=tsv_file_path,
-                         tsv_result_file_path=tsv_result_path, extensions=file_extensions)
+    # Using the client as a context manager keeps one event loop, one set of reader tasks and one channel pool for
+    # every row of the TSV.
+    with LumenVoxApiClient() as lumenvox_api:
+        # Run through interactions here (and specify different grammars or settings if need be).
+        process_interactions(lumenvox_api_client=lumenvox_api, tsv_read_file_path=tsv_file_path,
+                             tsv_result_file_path=tsv_result_path, extensions=file_extensions,
+                             concurrency=max_concurrency, ordered=write_ordered,
+                             audio_cache_max_bytes=cache_max_bytes, global_grammars=use_global_grammars)
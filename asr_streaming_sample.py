@@ -125,11 +125,12 @@ async def asr_streaming(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCli
             session_stream=session_stream, interaction_id=interaction_id, correlation_id=correlation_id)
         final_result = await lumenvox_api_client.get_session_final_result(session_stream=session_stream)
     else:
-        # Call get_streaming_response which runs a loop attempting to receive the final result message as audio is being
+        # Call get_streaming_response which waits for the final result message of the interaction as audio is being
         # pushed and processed.
         final_result = \
             await lumenvox_api_client.get_streaming_response(
-                session_stream=session_stream, audio_push_finish_event=audio_push_finish_event)
+                session_stream=session_stream, audio_push_finish_event=audio_push_finish_event,
+                interaction_id=interaction_id)
 
     ####### InteractionClose #######
     # Once we receive the result and there's nothing left to do, we close the interaction.
@@ -34,6 +34,8 @@ from lumenvox_api_handler import LumenVoxApiClient
 from helpers.audio_helper import AudioHandler
 # Import the AudioFormat used in this file.
 from helpers.audio_helper import AUDIO_FORMAT_WAV_8KHZ
+# Both interactions use the same file, so it is read once through the shared audio cache.
+from helpers.audio_cache_helper import shared_audio_cache
 
 # Importing the AsrInteractionData class from the asr_batch_sample.py script.
 from asr_batch_sample import AsrInteractionData
@@ -98,7 +100,8 @@ def run_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient
         AudioHandler(lumenvox_api_client=lumenvox_api_client,
                      audio_file_path=audio_file_path,
                      audio_format=audio_format_msg,
-                     audio_push_chunk_size_bytes=audio_chunk_size))
+                     audio_push_chunk_size_bytes=audio_chunk_size,
+                     audio_cache=shared_audio_cache))
     interaction_data_1.grammar_messages = [grammar_1]
     interaction_data_1.audio_consume_settings = audio_consume_settings_1
     interaction_data_1.vad_settings = vad_settings
@@ -114,7 +117,8 @@ def run_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient
         AudioHandler(lumenvox_api_client=lumenvox_api_client,
                      audio_file_path=audio_file_path,
                      audio_format=audio_format_msg,
-                     audio_push_chunk_size_bytes=audio_chunk_size))
+                     audio_push_chunk_size_bytes=audio_chunk_size,
+                     audio_cache=shared_audio_cache))
     interaction_data_2.grammar_messages = [grammar_2]
     interaction_data_2.audio_consume_settings = audio_consume_settings_2
     interaction_data_2.vad_settings = vad_settings
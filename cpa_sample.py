@@ -52,6 +52,9 @@ class CpaInteractionData:
     audio_format_msg = None
     audio_handler: AudioHandler = None
 
+    # If True, audio stops being pushed once the final result arrives, rather than streaming the rest of the file.
+    cancel_audio_push_on_final_result: bool = True
+
     correlation_id: str = None
 
 
@@ -126,6 +129,14 @@ async def cpa(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient, cpa_i
     response = await lumenvox_api_client.get_session_general_response(session_stream=session_stream)
     interaction_id = response.interaction_create_cpa.interaction_id
 
+    ####### Early AudioPush Cancellation #######
+    # CPA only needs as much audio as it takes to reach a decision, so the audio push can be stopped as soon as the
+    # final result arrives.
+    if cpa_interaction_data.cancel_audio_push_on_final_result:
+        lumenvox_api_client.cancel_audio_push_on_final_result(
+            session_stream=session_stream, interaction_id=interaction_id,
+            audio_push_cancel_event=cpa_interaction_data.audio_handler.audio_push_cancel_event)
+
     ####### AudioPush (if using STREAM_START_LOCATION_INTERACTION_CREATED) #######
     # Using STREAM_START_LOCATION_INTERACTION_CREATED, we send audio after the interaction has been created.
     if cpa_interaction_data.audio_consume_settings.stream_start_location == \
@@ -149,13 +160,17 @@ async def cpa(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient, cpa_i
     # If batch processing is used, the final result can be checked after creating the interaction.
     if cpa_interaction_data.audio_consume_settings.audio_consume_mode == \
             settings_msg.AudioConsumeSettings.AudioConsumeMode.AUDIO_CONSUME_MODE_BATCH:
-        final_result = await lumenvox_api_client.get_session_final_result(session_stream=session_stream)
+        # The final result is waited for by interaction ID, since the early audio push cancellation above may already
+        # be waiting for it (a final result is delivered to either its waiters or the session's result queue).
+        final_result = await lumenvox_api_client.wait_for_final_result(
+            session_stream=session_stream, interaction_id=interaction_id, timeout=3)
     else:
-        # Call get_streaming_response which runs a loop attempting to receive the final result message as audio is being
+        # Call get_streaming_response which waits for the final result message of the interaction as audio is being
         # pushed and processed.
         final_result = \
             await lumenvox_api_client.get_streaming_response(
-                session_stream=session_stream, audio_push_finish_event=audio_push_finish_event)
+                session_stream=session_stream, audio_push_finish_event=audio_push_finish_event,
+                interaction_id=interaction_id)
 
     ####### InteractionClose #######
     # Once we receive the result and there's nothing left to do, we close the interaction.
@@ -198,9 +213,9 @@ def cpa_interaction_data_setup(lumenvox_api_client: lumenvox_api_handler.LumenVo
     # Set this to True to view messages on AudioPush status.
     interaction_data.audio_handler.print_audio_push_messages = True
 
-    # Store full audio bytes from file specified in the path above for Batch.
-    interaction_data.audio_handler.init_full_audio_bytes()
-    # For non-batch operations, load audio data into a buffer.
+    # The full audio is read from the file specified in the path above only when it is pushed all at once
+    # (push_all_audio), so no copy of it is kept here.
+    # For non-batch operations, the audio buffer reads chunks from the file as they are pushed.
     interaction_data.audio_handler.init_audio_buffer()
 
     ####### Define Settings #######
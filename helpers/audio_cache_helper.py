@@ -0,0 +1,110 @@
+"""
+Audio Cache Helper file
+This file contains a process-wide cache of audio file contents, so that AudioHandlers created for the same file (such
+as the two channels of a stereo file, or prompts replayed many times in a regression run) share a single read-only copy
+of its bytes instead of each reading the file from disk.
+"""
+import os
+import threading
+
+from collections import OrderedDict
+
+DEFAULT_AUDIO_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+
+class AudioCache:
+    """
+    Least-recently-used cache of audio file contents, limited by the total number of bytes held. Entries are keyed by
+    the file's real path along with its modification time and size, so a file that changes on disk is read again.
+    Cached audio is returned as bytes, which cannot be modified, so it can be shared by any number of handlers.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_AUDIO_CACHE_MAX_BYTES):
+        """
+        :param max_bytes: Maximum total size of the cached audio. Files larger than this are read but not cached.
+        """
+        if max_bytes < 0:
+            raise ValueError("Audio cache size cannot be negative.")
+
+        self.max_bytes = max_bytes
+        self.cached_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.entries = OrderedDict()  # Audio data by cache key, least recently used first.
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_cache_key(audio_file_path: str) -> tuple:
+        """
+        :param audio_file_path: Path of the audio file.
+        :return: Key identifying the current contents of the file (real path, modification time and size).
+        """
+        file_stat = os.stat(audio_file_path)
+        return os.path.realpath(audio_file_path), file_stat.st_mtime_ns, file_stat.st_size
+
+    def read_audio_file(self, audio_file_path: str) -> bytes:
+        """
+        Return the contents of the audio file, from the cache if the file has not changed since it was cached.
+        :param audio_file_path: Path of the audio file.
+        :return: Audio data (bytes)
+        """
+        cache_key = self.get_cache_key(audio_file_path)
+
+        with self.lock:
+            audio_data = self.entries.get(cache_key)
+            if audio_data is not None:
+                self.entries.move_to_end(cache_key)
+                self.hits += 1
+                return audio_data
+
+            self.misses += 1
+
+        with open(audio_file_path, 'rb') as audio_file:
+            audio_data = audio_file.read()
+
+        if len(audio_data) <= self.max_bytes:
+            with self.lock:
+                # Another thread may have cached the file while it was being read.
+                if cache_key not in self.entries:
+                    self.entries[cache_key] = audio_data
+                    self.cached_bytes += len(audio_data)
+                    self.evict()
+
+        return audio_data
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is within self.max_bytes. Called with self.lock held.
+        """
+        while self.cached_bytes > self.max_bytes and self.entries:
+            _, audio_data = self.entries.popitem(last=False)
+            self.cached_bytes -= len(audio_data)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Remove every entry from the cache. The hit and miss counters are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.cached_bytes = 0
+
+    def get_stats(self) -> dict:
+        """
+        :return: Dictionary of the cache's counters and size.
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'cached_bytes': self.cached_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# Cache shared by every AudioHandler in the process that is given audio_cache=shared_audio_cache.
+shared_audio_cache = AudioCache()
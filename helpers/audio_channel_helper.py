@@ -0,0 +1,45 @@
+"""
+Audio Channel Helper file
+This file contains functions to split interleaved multi-channel audio (such as a stereo WAV file) into its channels on
+the client, for example to send only one channel of a call recording. Channels are taken as strided NumPy views over the
+interleaved data, so nothing is copied until a channel's samples are needed as bytes.
+"""
+import numpy as np
+
+# NumPy sample types for interleaved audio, by bytes per sample (8-bit G.711 or PCM, and 16-bit little-endian PCM).
+SAMPLE_WIDTH_DTYPES = {
+    1: np.uint8,
+    2: np.dtype('<i2'),
+}
+
+
+def deinterleave_channels(audio_data, channels: int, sample_width: int) -> list:
+    """
+    Split interleaved audio data into its channels, without copying it.
+    :param audio_data: Interleaved audio data (bytes-like). A trailing incomplete sample frame is ignored.
+    :param channels: Number of interleaved channels.
+    :param sample_width: Bytes per sample, per channel (1 or 2).
+    :return: List of NumPy arrays, one per channel, each a strided view over audio_data.
+    """
+    if sample_width not in SAMPLE_WIDTH_DTYPES:
+        raise ValueError("De-interleaving is not supported for " + str(sample_width) + "-byte samples.")
+
+    frame_count = len(audio_data) // (channels * sample_width)
+    samples = np.frombuffer(audio_data, dtype=SAMPLE_WIDTH_DTYPES[sample_width], count=frame_count * channels)
+    samples = samples.reshape(frame_count, channels)
+
+    return [samples[:, channel] for channel in range(channels)]
+
+
+def extract_channel(audio_data, channel: int, channels: int, sample_width: int) -> bytes:
+    """
+    :param audio_data: Interleaved audio data (bytes-like).
+    :param channel: Index of the channel to extract (0 being the first).
+    :param channels: Number of interleaved channels.
+    :param sample_width: Bytes per sample, per channel (1 or 2).
+    :return: Audio data of the given channel alone.
+    """
+    if not 0 <= channel < channels:
+        raise ValueError("Audio channel " + str(channel) + " is out of range for " + str(channels) + "-channel audio.")
+
+    return deinterleave_channels(audio_data, channels=channels, sample_width=sample_width)[channel].tobytes()
@@ -0,0 +1,207 @@
+"""
+Audio Codec Helper file
+This file contains functions to transcode audio between the G.711 formats (ULAW, ALAW) and LINEAR16 (16-bit
+little-endian PCM). Conversion uses lookup tables computed once when the module is loaded, applied to whole chunks of
+audio at a time with NumPy (or bytes.translate between ULAW and ALAW), rather than converting one sample at a time.
+"""
+import numpy as np
+
+# audio_formats.proto messages
+import lumenvox.api.audio_formats_pb2 as audio_formats
+
+ULAW = audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_ULAW
+ALAW = audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_ALAW
+LINEAR16 = audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_LINEAR16
+
+# Number of bytes per sample for each format that can be transcoded.
+CODEC_BYTES_PER_SAMPLE = {
+    ULAW: 1,
+    ALAW: 1,
+    LINEAR16: 2,
+}
+
+# Segment end points used when encoding G.711 (see ITU-T G.711).
+ULAW_SEGMENT_ENDS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+ALAW_SEGMENT_ENDS = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+ULAW_BIAS = 0x84
+ULAW_CLIP = 8159
+
+
+def build_ulaw_decode_table() -> np.ndarray:
+    """
+    :return: Table of the LINEAR16 sample for each of the 256 ULAW values.
+    """
+    ulaw_values = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((ulaw_values & 0x0F) << 3) + ULAW_BIAS) << ((ulaw_values & 0x70) >> 4)
+
+    return np.where(ulaw_values & 0x80, ULAW_BIAS - magnitude, magnitude - ULAW_BIAS).astype('<i2')
+
+
+def build_alaw_decode_table() -> np.ndarray:
+    """
+    :return: Table of the LINEAR16 sample for each of the 256 ALAW values.
+    """
+    alaw_values = np.arange(256, dtype=np.int32) ^ 0x55
+    segment = (alaw_values & 0x70) >> 4
+    magnitude = (alaw_values & 0x0F) << 4
+    magnitude = np.where(segment == 0, magnitude + 8, (magnitude + 0x108) << np.maximum(segment - 1, 0))
+
+    return np.where(alaw_values & 0x80, magnitude, -magnitude).astype('<i2')
+
+
+def build_ulaw_encode_table() -> np.ndarray:
+    """
+    :return: Table of the ULAW value for each of the 65536 LINEAR16 samples, indexed by the sample as unsigned 16-bit.
+    """
+    samples = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(samples < 0, 0x7F, 0xFF)
+    samples = np.minimum(np.abs(samples), ULAW_CLIP) + (ULAW_BIAS >> 2)
+
+    segment = np.searchsorted(ULAW_SEGMENT_ENDS, samples)
+    ulaw_values = (segment << 4) | ((samples >> (segment + 1)) & 0x0F)
+
+    return (np.where(segment >= 8, 0x7F, ulaw_values) ^ mask).astype(np.uint8)
+
+
+def build_alaw_encode_table() -> np.ndarray:
+    """
+    :return: Table of the ALAW value for each of the 65536 LINEAR16 samples, indexed by the sample as unsigned 16-bit.
+    """
+    samples = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 3
+    mask = np.where(samples >= 0, 0xD5, 0x55)
+    samples = np.where(samples >= 0, samples, -samples - 1)
+
+    segment = np.searchsorted(ALAW_SEGMENT_ENDS, samples)
+    alaw_values = (segment << 4) | (np.where(segment < 2, samples >> 1, samples >> np.maximum(segment, 1)) & 0x0F)
+
+    return (np.where(segment >= 8, 0x7F, alaw_values) ^ mask).astype(np.uint8)
+
+
+ULAW_TO_LINEAR16 = build_ulaw_decode_table()
+ALAW_TO_LINEAR16 = build_alaw_decode_table()
+LINEAR16_TO_ULAW = build_ulaw_encode_table()
+LINEAR16_TO_ALAW = build_alaw_encode_table()
+
+# ULAW <-> ALAW conversions map one byte to one byte, so they can be done with bytes.translate.
+ULAW_TO_ALAW = LINEAR16_TO_ALAW[ULAW_TO_LINEAR16.view(np.uint16)].tobytes()
+ALAW_TO_ULAW = LINEAR16_TO_ULAW[ALAW_TO_LINEAR16.view(np.uint16)].tobytes()
+
+
+def ulaw_to_linear16(audio_data) -> bytes:
+    """
+    :param audio_data: ULAW audio data (bytes-like).
+    :return: LINEAR16 audio data.
+    """
+    return ULAW_TO_LINEAR16[np.frombuffer(audio_data, dtype=np.uint8)].tobytes()
+
+
+def alaw_to_linear16(audio_data) -> bytes:
+    """
+    :param audio_data: ALAW audio data (bytes-like).
+    :return: LINEAR16 audio data.
+    """
+    return ALAW_TO_LINEAR16[np.frombuffer(audio_data, dtype=np.uint8)].tobytes()
+
+
+def linear16_to_ulaw(audio_data) -> bytes:
+    """
+    :param audio_data: LINEAR16 audio data (bytes-like, an even number of bytes).
+    :return: ULAW audio data.
+    """
+    return LINEAR16_TO_ULAW[np.frombuffer(audio_data, dtype='<u2')].tobytes()
+
+
+def linear16_to_alaw(audio_data) -> bytes:
+    """
+    :param audio_data: LINEAR16 audio data (bytes-like, an even number of bytes).
+    :return: ALAW audio data.
+    """
+    return LINEAR16_TO_ALAW[np.frombuffer(audio_data, dtype='<u2')].tobytes()
+
+
+def ulaw_to_alaw(audio_data) -> bytes:
+    """
+    :param audio_data: ULAW audio data (bytes-like).
+    :return: ALAW audio data.
+    """
+    return bytes(audio_data).translate(ULAW_TO_ALAW)
+
+
+def alaw_to_ulaw(audio_data) -> bytes:
+    """
+    :param audio_data: ALAW audio data (bytes-like).
+    :return: ULAW audio data.
+    """
+    return bytes(audio_data).translate(ALAW_TO_ULAW)
+
+
+# Conversion functions, by (source format, target format).
+TRANSCODE_FUNCTIONS = {
+    (ULAW, LINEAR16): ulaw_to_linear16,
+    (ALAW, LINEAR16): alaw_to_linear16,
+    (LINEAR16, ULAW): linear16_to_ulaw,
+    (LINEAR16, ALAW): linear16_to_alaw,
+    (ULAW, ALAW): ulaw_to_alaw,
+    (ALAW, ULAW): alaw_to_ulaw,
+}
+
+
+def transcode(audio_data, source_format, target_format) -> bytes:
+    """
+    Transcode audio data between ULAW, ALAW and LINEAR16.
+    :param audio_data: Audio data (bytes-like) in the source format.
+    :param source_format: StandardAudioFormat value of audio_data (see audio_formats.proto).
+    :param target_format: StandardAudioFormat value to convert to.
+    :return: Audio data in the target format.
+    """
+    if source_format == target_format:
+        return bytes(audio_data)
+
+    transcode_function = TRANSCODE_FUNCTIONS.get((source_format, target_format))
+    if not transcode_function:
+        raise ValueError("Transcoding from audio format " + str(source_format) + " to " + str(target_format) +
+                         " is not supported.")
+
+    return transcode_function(audio_data)
+
+
+class AudioTranscoder:
+    """
+    Audio push stage that transcodes each chunk of audio from one format to another (see AudioHandler). Incomplete
+    samples at the end of a chunk are held until the next chunk, so chunks may be any number of bytes.
+    """
+    def __init__(self, source_format, target_format):
+        """
+        :param source_format: StandardAudioFormat value of the audio being pushed.
+        :param target_format: StandardAudioFormat value to convert the audio to.
+        """
+        if source_format not in CODEC_BYTES_PER_SAMPLE or target_format not in CODEC_BYTES_PER_SAMPLE:
+            raise ValueError("Transcoding from audio format " + str(source_format) + " to " + str(target_format) +
+                             " is not supported.")
+
+        self.source_format = source_format
+        self.target_format = target_format
+        self.source_bytes_per_sample = CODEC_BYTES_PER_SAMPLE[source_format]
+
+        self.remaining_data = b''  # Bytes of an incomplete sample from the previous chunk.
+
+    def process(self, audio_data) -> bytes:
+        """
+        :param audio_data: Chunk of audio data (bytes-like) in the source format.
+        :return: Transcoded audio data.
+        """
+        if self.remaining_data:
+            audio_data = self.remaining_data + bytes(audio_data)
+
+        complete_bytes = len(audio_data) - (len(audio_data) % self.source_bytes_per_sample)
+        self.remaining_data = bytes(audio_data[complete_bytes:])
+
+        return transcode(audio_data[:complete_bytes], self.source_format, self.target_format)
+
+    def flush(self) -> bytes:
+        """
+        Called once all audio has been processed. An incomplete final sample is dropped.
+        :return: Any remaining transcoded audio data (none for this stage).
+        """
+        self.remaining_data = b''
+        return b''
@@ -0,0 +1,405 @@
+"""
+Audio Header Helper file
+This file contains functions to read the headers of audio files, so that audio can be paced and pushed based on the
+format information the file itself contains.
+"""
+import struct
+
+# audio_formats.proto messages
+import lumenvox.api.audio_formats_pb2 as audio_formats
+
+# WAV format tags (from the fmt chunk) used by the LumenVox API audio formats.
+WAV_FORMAT_PCM = 1
+WAV_FORMAT_ALAW = 6
+WAV_FORMAT_ULAW = 7
+WAV_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Size of a RIFF chunk header (4-byte chunk ID followed by a 4-byte little-endian chunk size).
+RIFF_CHUNK_HEADER_SIZE = 8
+
+# MPEG audio frame header tables, indexed by the version bits of the header (0: MPEG 2.5, 2: MPEG 2, 3: MPEG 1).
+MP3_SAMPLE_RATES = {
+    0: [11025, 12000, 8000],
+    2: [22050, 24000, 16000],
+    3: [44100, 48000, 32000],
+}
+# Bitrates (kbps), indexed by (MPEG 1 or not, layer) and then the bitrate index of the header.
+MP3_BITRATES_KBPS = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# Number of bytes searched for the first MP3 frame, and read from the end of Ogg streams to find the last page.
+PROBE_SEARCH_BYTES = 65536
+
+# Opus granule positions always count samples at 48kHz.
+OPUS_GRANULE_RATE = 48000
+
+
+class WavHeaderInfo:
+    """
+    Class containing the format information read from the header of a WAV (RIFF/WAVE) file.
+    """
+    audio_format: int = None  # WAV format tag (e.g. WAV_FORMAT_PCM); resolved from the sub-format if extensible.
+    channels: int = None
+    sample_rate: int = None
+    sample_width: int = None  # Bytes per sample, per channel.
+    block_align: int = None  # Bytes per sample frame (all channels).
+    bits_per_sample: int = None
+
+    data_offset: int = None  # Byte offset at which the audio samples (the data chunk contents) begin.
+    data_length: int = None  # Number of bytes of audio samples.
+
+    def bytes_per_ms(self) -> float:
+        """
+        :return: Number of bytes of audio data per millisecond of audio.
+        """
+        return (self.channels * self.sample_width * self.sample_rate) / 1000
+
+    def duration_ms(self) -> float:
+        """
+        :return: Duration of the audio data in milliseconds.
+        """
+        return self.data_length / self.bytes_per_ms()
+
+
+def parse_wav_header(audio_buffer) -> WavHeaderInfo:
+    """
+    Walk the RIFF chunks at the start of a WAV file and return its format information.
+    Chunks other than fmt and data (such as LIST or fact) are skipped, so the data offset is exact regardless of what
+    precedes the audio samples.
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the WAV file. Only its peek function is used, so
+    the read location is unchanged.
+    :return: WavHeaderInfo object with the format, channels, sample width, sample rate and data offset/length.
+    """
+    total_bytes = audio_buffer.total_audio_bytes
+
+    riff_header = bytes(audio_buffer.peek(size=12, location=0))
+    if len(riff_header) < 12 or riff_header[0:4] != b'RIFF' or riff_header[8:12] != b'WAVE':
+        raise ValueError("Audio is not a RIFF/WAVE file.")
+
+    wav_header_info = WavHeaderInfo()
+    chunk_location = 12
+
+    while chunk_location + RIFF_CHUNK_HEADER_SIZE <= total_bytes:
+        chunk_header = bytes(audio_buffer.peek(size=RIFF_CHUNK_HEADER_SIZE, location=chunk_location))
+        chunk_id = chunk_header[0:4]
+        chunk_size = struct.unpack('<I', chunk_header[4:8])[0]
+        chunk_data_location = chunk_location + RIFF_CHUNK_HEADER_SIZE
+
+        if chunk_id == b'fmt ':
+            fmt_chunk = bytes(audio_buffer.peek(size=min(chunk_size, 40), location=chunk_data_location))
+            if len(fmt_chunk) < 16:
+                raise ValueError("WAV fmt chunk is too short.")
+
+            (audio_format, channels, sample_rate, byte_rate, block_align, bits_per_sample) = \
+                struct.unpack('<HHIIHH', fmt_chunk[0:16])
+
+            # WAVE_FORMAT_EXTENSIBLE stores the actual format tag in the first two bytes of the sub-format GUID.
+            if audio_format == WAV_FORMAT_EXTENSIBLE and len(fmt_chunk) >= 26:
+                audio_format = struct.unpack('<H', fmt_chunk[24:26])[0]
+
+            wav_header_info.audio_format = audio_format
+            wav_header_info.channels = channels
+            wav_header_info.sample_rate = sample_rate
+            wav_header_info.block_align = block_align
+            wav_header_info.bits_per_sample = bits_per_sample
+            wav_header_info.sample_width = (bits_per_sample + 7) // 8 if bits_per_sample else block_align // channels
+
+        elif chunk_id == b'data':
+            if wav_header_info.audio_format is None:
+                raise ValueError("WAV data chunk found before fmt chunk.")
+
+            wav_header_info.data_offset = chunk_data_location
+
+            # Streamed WAV files may leave the data size unset (0 or 0xFFFFFFFF), so it is limited to the audio size.
+            data_available = total_bytes - chunk_data_location
+            wav_header_info.data_length = \
+                chunk_size if 0 < chunk_size <= data_available else data_available
+
+            return wav_header_info
+
+        # Chunks are padded to an even number of bytes.
+        chunk_location = chunk_data_location + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV data chunk not found.")
+
+
+def set_wav_header_data_length(header_data, data_length: int) -> bytes:
+    """
+    Update the RIFF and data chunk sizes of a WAV header for a different amount of audio samples, such as after the
+    audio was trimmed. The header must end where the samples begin (see WavHeaderInfo.data_offset), and the data chunk
+    becomes the last chunk of the file.
+    :param header_data: WAV header, from the start of the file up to the audio samples.
+    :param data_length: Number of bytes of audio samples that follow the header.
+    :return: Updated WAV header (bytes).
+    """
+    header = bytearray(header_data)
+
+    # The RIFF size counts everything after its own chunk header; the data chunk size field directly precedes the
+    # samples.
+    struct.pack_into('<I', header, 4, len(header) - RIFF_CHUNK_HEADER_SIZE + data_length)
+    struct.pack_into('<I', header, len(header) - 4, data_length)
+
+    return bytes(header)
+
+
+def get_wav_standard_audio_format(wav_header_info: WavHeaderInfo):
+    """
+    :param wav_header_info: WavHeaderInfo read from a WAV header.
+    :return: StandardAudioFormat value matching the encoding of the WAV samples (ULAW, ALAW or LINEAR16), or None if
+             there is no matching headerless format.
+    """
+    if wav_header_info.audio_format == WAV_FORMAT_ULAW:
+        return audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_ULAW
+    if wav_header_info.audio_format == WAV_FORMAT_ALAW:
+        return audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_ALAW
+    if wav_header_info.audio_format == WAV_FORMAT_PCM and wav_header_info.sample_width == 2:
+        return audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_LINEAR16
+
+    return None
+
+
+def get_id3v2_tag_size(audio_buffer) -> int:
+    """
+    Return the size of an ID3v2 tag at the start of the audio (as found before MP3 or FLAC data), or 0 if there is none.
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the audio file.
+    :return: Size of the tag in bytes.
+    """
+    id3_header = bytes(audio_buffer.peek(size=10, location=0))
+    if len(id3_header) < 10 or id3_header[0:3] != b'ID3':
+        return 0
+
+    # The tag size is stored as a 28-bit "synchsafe" integer (7 bits per byte).
+    tag_size = (id3_header[6] << 21) | (id3_header[7] << 14) | (id3_header[8] << 7) | id3_header[9]
+    footer_size = 10 if id3_header[5] & 0x10 else 0
+
+    return 10 + tag_size + footer_size
+
+
+def probe_mp3_duration_ms(audio_buffer) -> float:
+    """
+    Determine the duration of MP3 audio from its first frame header. The frame count of a Xing/Info or VBRI header is
+    used if present (variable bitrate); otherwise the stream is treated as constant bitrate.
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the MP3 file.
+    :return: Duration in milliseconds, or None if no frame header was found.
+    """
+    audio_start = get_id3v2_tag_size(audio_buffer)
+    search_data = bytes(audio_buffer.peek(size=PROBE_SEARCH_BYTES, location=audio_start))
+
+    for frame_location in range(len(search_data) - 4):
+        if search_data[frame_location] != 0xFF or (search_data[frame_location + 1] & 0xE0) != 0xE0:
+            continue
+
+        header = search_data[frame_location:frame_location + 4]
+        version = (header[1] >> 3) & 0x03
+        layer = 4 - ((header[1] >> 1) & 0x03)
+        bitrate_index = header[2] >> 4
+        sample_rate_index = (header[2] >> 2) & 0x03
+        channel_mode = header[3] >> 6
+
+        # Skip false syncs (reserved version, layer, bitrate or sample rate values).
+        if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+            continue
+
+        mpeg1 = version == 3
+        sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+        bitrate = MP3_BITRATES_KBPS[(mpeg1, layer)][bitrate_index] * 1000
+        samples_per_frame = 384 if layer == 1 else (1152 if (layer == 2 or mpeg1) else 576)
+
+        # A Xing/Info header follows the side information of the first frame.
+        side_info_size = (32 if channel_mode != 3 else 17) if mpeg1 else (17 if channel_mode != 3 else 9)
+        xing_location = frame_location + 4 + side_info_size
+        if search_data[xing_location:xing_location + 4] in (b'Xing', b'Info'):
+            flags = struct.unpack('>I', search_data[xing_location + 4:xing_location + 8])[0]
+            if flags & 0x01:
+                frame_count = struct.unpack('>I', search_data[xing_location + 8:xing_location + 12])[0]
+                return frame_count * samples_per_frame * 1000 / sample_rate
+
+        # A VBRI header is always 32 bytes after the frame header.
+        vbri_location = frame_location + 36
+        if search_data[vbri_location:vbri_location + 4] == b'VBRI':
+            frame_count = struct.unpack('>I', search_data[vbri_location + 14:vbri_location + 18])[0]
+            return frame_count * samples_per_frame * 1000 / sample_rate
+
+        audio_bytes = audio_buffer.total_audio_bytes - (audio_start + frame_location)
+        return audio_bytes * 8 * 1000 / bitrate
+
+    return None
+
+
+def probe_flac_duration_ms(audio_buffer) -> float:
+    """
+    Determine the duration of FLAC audio from its STREAMINFO metadata block.
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the FLAC file.
+    :return: Duration in milliseconds, or None if STREAMINFO was not found or does not give the total sample count.
+    """
+    flac_start = get_id3v2_tag_size(audio_buffer)
+
+    # STREAMINFO is always the first metadata block after the "fLaC" marker.
+    stream_info = bytes(audio_buffer.peek(size=4 + 4 + 34, location=flac_start))
+    if len(stream_info) < 42 or stream_info[0:4] != b'fLaC' or (stream_info[4] & 0x7F) != 0:
+        return None
+
+    # Bytes 10-17 of STREAMINFO: sample rate (20 bits), channels (3), bits per sample (5), total samples (36).
+    packed_info = struct.unpack('>Q', stream_info[8 + 10:8 + 18])[0]
+    sample_rate = packed_info >> 44
+    total_samples = packed_info & 0xFFFFFFFFF
+
+    if not sample_rate or not total_samples:
+        return None
+
+    return total_samples * 1000 / sample_rate
+
+
+def probe_ogg_duration_ms(audio_buffer) -> float:
+    """
+    Determine the duration of Ogg audio (Opus or Vorbis) from the granule position of its last page.
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the Ogg file.
+    :return: Duration in milliseconds, or None if the stream could not be read.
+    """
+    first_page = bytes(audio_buffer.peek(size=27 + 255 + 30, location=0))
+    if len(first_page) < 28 or first_page[0:4] != b'OggS':
+        return None
+
+    # The first packet (after the segment table) identifies the codec and gives the granule rate.
+    packet_location = 27 + first_page[26]
+    packet = first_page[packet_location:packet_location + 30]
+
+    if packet[0:8] == b'OpusHead':
+        granule_rate = OPUS_GRANULE_RATE
+        pre_skip = struct.unpack('<H', packet[10:12])[0]
+    elif packet[0:7] == b'\x01vorbis':
+        granule_rate = struct.unpack('<I', packet[12:16])[0]
+        pre_skip = 0
+    else:
+        return None
+
+    # Find the last page, whose granule position is the total number of samples in the stream.
+    tail_location = max(0, audio_buffer.total_audio_bytes - PROBE_SEARCH_BYTES)
+    tail_data = bytes(audio_buffer.peek(size=PROBE_SEARCH_BYTES, location=tail_location))
+    page_location = tail_data.rfind(b'OggS')
+
+    while page_location >= 0:
+        granule_position = struct.unpack('<q', tail_data[page_location + 6:page_location + 14])[0] \
+            if page_location + 14 <= len(tail_data) else -1
+        if granule_position >= 0:
+            return max(granule_position - pre_skip, 0) * 1000 / granule_rate
+        page_location = tail_data.rfind(b'OggS', 0, page_location)
+
+    return None
+
+
+def find_mp4_boxes(audio_buffer, start: int, end: int) -> list:
+    """
+    List the MP4 boxes (atoms) between the given byte offsets.
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the MP4 file.
+    :param start: Byte offset of the first box.
+    :param end: Byte offset at which the boxes end.
+    :return: List of (box type, box contents offset, box end offset) tuples.
+    """
+    boxes = []
+    box_location = start
+
+    while box_location + 8 <= end:
+        box_header = bytes(audio_buffer.peek(size=16, location=box_location))
+        box_size, box_type = struct.unpack('>I4s', box_header[0:8])
+        header_size = 8
+
+        if box_size == 1:  # 64-bit box size follows the type.
+            box_size = struct.unpack('>Q', box_header[8:16])[0]
+            header_size = 16
+        elif box_size == 0:  # Box extends to the end of the file.
+            box_size = end - box_location
+
+        if box_size < header_size:
+            break
+
+        boxes.append((box_type, box_location + header_size, min(box_location + box_size, end)))
+        box_location += box_size
+
+    return boxes
+
+
+def read_mp4_duration_box(audio_buffer, box_location: int) -> float:
+    """
+    Read the time scale and duration of an mdhd or mvhd box.
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the MP4 file.
+    :param box_location: Byte offset of the box contents.
+    :return: Duration in milliseconds, or None if the duration is not set.
+    """
+    box_data = bytes(audio_buffer.peek(size=32, location=box_location))
+
+    # Version 1 boxes use 64-bit creation/modification times and duration.
+    if box_data[0] == 1:
+        time_scale, duration = struct.unpack('>IQ', box_data[20:32])
+    else:
+        time_scale, duration = struct.unpack('>II', box_data[12:20])
+
+    if not time_scale or duration in (0, 0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF):
+        return None
+
+    return duration * 1000 / time_scale
+
+
+def probe_mp4_duration_ms(audio_buffer) -> float:
+    """
+    Determine the duration of MP4/M4A audio from the mdhd box of its audio track (falling back to the mvhd box).
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the MP4 file.
+    :return: Duration in milliseconds, or None if the moov box was not found.
+    """
+    def child_boxes(parent_box):
+        return find_mp4_boxes(audio_buffer, start=parent_box[1], end=parent_box[2])
+
+    moov_boxes = [box for box in find_mp4_boxes(audio_buffer, start=0, end=audio_buffer.total_audio_bytes)
+                  if box[0] == b'moov']
+    if not moov_boxes:
+        return None
+
+    movie_duration_ms = None
+
+    for box in child_boxes(moov_boxes[0]):
+        if box[0] == b'mvhd':
+            movie_duration_ms = read_mp4_duration_box(audio_buffer, box_location=box[1])
+        elif box[0] == b'trak':
+            for mdia_box in [trak_box for trak_box in child_boxes(box) if trak_box[0] == b'mdia']:
+                mdia_children = child_boxes(mdia_box)
+
+                # The hdlr box identifies audio tracks with a handler type of "soun".
+                hdlr_boxes = [mdia_child for mdia_child in mdia_children if mdia_child[0] == b'hdlr']
+                if not hdlr_boxes or bytes(audio_buffer.peek(size=4, location=hdlr_boxes[0][1] + 8)) != b'soun':
+                    continue
+
+                for mdia_child in mdia_children:
+                    if mdia_child[0] == b'mdhd':
+                        track_duration_ms = read_mp4_duration_box(audio_buffer, box_location=mdia_child[1])
+                        if track_duration_ms:
+                            return track_duration_ms
+
+    return movie_duration_ms
+
+
+def probe_audio_duration_ms(audio_buffer, standard_audio_format) -> float:
+    """
+    Determine the duration of compressed audio (MP3, FLAC, Opus, M4A or MP4) from its headers.
+    :param audio_buffer: AudioBuffer (or FileAudioBuffer) containing the audio file.
+    :param standard_audio_format: StandardAudioFormat value of the audio (see audio_formats.proto).
+    :return: Duration in milliseconds, or None if the format is not supported or the duration could not be found.
+    """
+    standard_audio_formats = audio_formats.AudioFormat.StandardAudioFormat
+
+    if standard_audio_format == standard_audio_formats.STANDARD_AUDIO_FORMAT_MP3:
+        return probe_mp3_duration_ms(audio_buffer)
+    elif standard_audio_format == standard_audio_formats.STANDARD_AUDIO_FORMAT_FLAC:
+        return probe_flac_duration_ms(audio_buffer)
+    elif standard_audio_format == standard_audio_formats.STANDARD_AUDIO_FORMAT_OPUS:
+        return probe_ogg_duration_ms(audio_buffer)
+    elif standard_audio_format in (standard_audio_formats.STANDARD_AUDIO_FORMAT_M4A,
+                                   standard_audio_formats.STANDARD_AUDIO_FORMAT_MP4):
+        return probe_mp4_duration_ms(audio_buffer)
+
+    return None
@@ -5,13 +5,29 @@ Transcription call flows.
 """
 import asyncio
 import os
-import time
 
 # audio_formats.proto messages
 import lumenvox.api.audio_formats_pb2 as audio_formats
 # Import code/data needed to interaction with the API
 from lumenvox_api_handler import LumenVoxApiClient
 
+from helpers.audio_cache_helper import AudioCache
+from helpers.audio_channel_helper import deinterleave_channels
+from helpers.audio_channel_helper import extract_channel
+from helpers.audio_codec_helper import ALAW
+from helpers.audio_codec_helper import AudioTranscoder
+from helpers.audio_codec_helper import LINEAR16
+from helpers.audio_codec_helper import ULAW
+from helpers.audio_header_helper import get_wav_standard_audio_format
+from helpers.audio_header_helper import parse_wav_header
+from helpers.audio_header_helper import probe_audio_duration_ms
+from helpers.audio_header_helper import set_wav_header_data_length
+from helpers.audio_header_helper import WavHeaderInfo
+from helpers.audio_resample_helper import AudioResampler
+from helpers.audio_source_helper import AudioSource
+from helpers.audio_vad_helper import DEFAULT_SILENCE_PADDING_MS
+from helpers.audio_vad_helper import DEFAULT_SILENCE_THRESHOLD_DBFS
+from helpers.audio_vad_helper import find_speech_byte_range
 from helpers.common_helper import optional_int32
 
 # Common sample rate values.
@@ -75,6 +91,7 @@ AUDIO_FORMAT_M4A_8KHZ = audio_formats.AudioFormat(
 class AudioBuffer:
     """
     Class to contain an audio buffer or rather audio data (bytes) split up into chunks.
+    Chunks are handed out as memoryview slices over the audio data, so no audio is copied while reading the buffer.
     """
     def __init__(self, audio_data, chunk_bytes=200):
         """
@@ -84,6 +101,8 @@ class AudioBuffer:
         """
         # Initialize the entire audio data.
         self.audio_data = audio_data
+        # View over the audio data that chunks are sliced from without copying.
+        self.audio_view = memoryview(audio_data)
 
         # During creation, users can specify a different chunk size, or use the default.
         self.chunk_bytes = chunk_bytes
@@ -94,26 +113,334 @@ class AudioBuffer:
         # Note bytes remaining cannot easily be converted to milliseconds here, since we don't know audio format!
         self.total_audio_bytes = len(audio_data)
 
-    def get_next_chunk(self):
+    def read_audio(self, location: int, size: int):
         """
-        Depending on the provided chunk size, return a portion of audio data (bytes).
-        :return: Audio data chunk (bytes)
+        Return audio data from the given location, without moving the read location.
+        :param location: Byte offset into the audio data.
+        :param size: Number of bytes to return.
+        :return: Audio data (memoryview slice of the audio data)
         """
+        return self.audio_view[location:location + size]
+
+    def get_next_chunk(self, chunk_bytes: int = None):
+        """
+        Depending on the provided chunk size, return a portion of audio data.
+        :param chunk_bytes: Optional number of bytes to return, instead of the buffer's chunk size.
+        :return: Audio data chunk (bytes-like), or None once the buffer has been read entirely.
+        """
+        chunk_bytes = chunk_bytes if chunk_bytes else self.chunk_bytes
+
         self.bytes_remaining = self.total_audio_bytes - self.read_location
         if self.bytes_remaining < 0:
             self.bytes_remaining = 0
         if self.bytes_remaining > 0:
-            if self.bytes_remaining >= self.chunk_bytes:
-                bytes_to_send = self.chunk_bytes
+            if self.bytes_remaining >= chunk_bytes:
+                bytes_to_send = chunk_bytes
             else:
                 bytes_to_send = self.bytes_remaining
 
-            result_chunk = self.audio_data[self.read_location:self.read_location + bytes_to_send]
+            result_chunk = self.read_audio(location=self.read_location, size=bytes_to_send)
             self.read_location += bytes_to_send
             return result_chunk
         else:
+            self.close()
             return None
 
+    def peek(self, size: int, location: int = None):
+        """
+        Return audio data without moving the read location (e.g. to inspect a file header).
+        :param size: Number of bytes to return.
+        :param location: Byte offset to read from. Defaults to the current read location.
+        :return: Audio data (bytes-like)
+        """
+        return self.read_audio(location=self.read_location if location is None else location, size=size)
+
+    def limit(self, end_location: int):
+        """
+        Stop reading the buffer at the given byte offset, as if the audio data ended there.
+        :param end_location: Byte offset into the audio data.
+        """
+        self.total_audio_bytes = min(max(end_location, 0), self.total_audio_bytes)
+
+    def seek(self, location: int):
+        """
+        Move the read location, so that the next chunk starts at the given byte offset.
+        :param location: Byte offset into the audio data.
+        """
+        self.read_location = min(max(location, 0), self.total_audio_bytes)
+
+    def close(self):
+        """
+        Release any resources held by the buffer. Nothing needs releasing for in-memory audio data.
+        """
+        pass
+
+
+class FileAudioBuffer(AudioBuffer):
+    """
+    AudioBuffer that reads chunks lazily from the audio file as they are requested, instead of holding the whole file in
+    memory. Only the file's read buffer (a few KB) is held per stream, regardless of the length of the audio.
+    """
+    def __init__(self, audio_file_path: str, chunk_bytes=200):
+        """
+        Initialize the audio buffer.
+        :param audio_file_path: Path of the audio file to read from.
+        :param chunk_bytes: Integer value pertaining to how big each individual audio chunk size should be.
+        """
+        if not os.path.isfile(audio_file_path):
+            raise FileNotFoundError(audio_file_path + " not found")
+
+        self.audio_file_path = audio_file_path
+        self.audio_file = None  # Opened on the first read.
+        self.file_location = 0  # Current position of self.audio_file, to avoid seeking between consecutive reads.
+
+        # The audio data is not held in memory.
+        self.audio_data = None
+        self.audio_view = None
+
+        self.chunk_bytes = chunk_bytes
+
+        self.read_location = 0
+        self.bytes_remaining = 0
+
+        self.total_audio_bytes = os.path.getsize(audio_file_path)
+
+    def read_audio(self, location: int, size: int):
+        """
+        Read audio data from the file at the given location, without moving the read location.
+        :param location: Byte offset into the audio file.
+        :param size: Number of bytes to return.
+        :return: Audio data (bytes)
+        """
+        if not self.audio_file:
+            self.audio_file = open(self.audio_file_path, 'rb')
+            self.file_location = 0
+
+        if location != self.file_location:
+            self.audio_file.seek(location)
+
+        audio_data = self.audio_file.read(size)
+        self.file_location = location + len(audio_data)
+
+        return audio_data
+
+    def close(self):
+        """
+        Close the audio file. It will be reopened if the buffer is read again.
+        """
+        if self.audio_file:
+            self.audio_file.close()
+            self.audio_file = None
+
+
+class ChannelAudioBuffer(AudioBuffer):
+    """
+    AudioBuffer holding one channel of interleaved multi-channel audio (such as a stereo WAV file), read from another
+    AudioBuffer. Each chunk is de-interleaved as it is requested, so neither the whole file nor a copy of the whole
+    channel is held in memory. Locations and sizes are in bytes of the single channel.
+    """
+    def __init__(self, source_buffer: AudioBuffer, channel: int, channels: int, sample_width: int,
+                 data_offset: int = 0, data_length: int = None, chunk_bytes=200):
+        """
+        Initialize the audio buffer.
+        :param source_buffer: AudioBuffer holding the interleaved audio (e.g. a FileAudioBuffer).
+        :param channel: Index of the channel to read (0 being the first).
+        :param channels: Number of interleaved channels.
+        :param sample_width: Bytes per sample, per channel (1 or 2).
+        :param data_offset: Byte offset of the interleaved samples in the source buffer (e.g. after a WAV header).
+        :param data_length: Number of bytes of interleaved samples. Defaults to the rest of the source buffer.
+        :param chunk_bytes: Integer value pertaining to how big each individual audio chunk size should be.
+        """
+        if not 0 <= channel < channels:
+            raise ValueError("Audio channel " + str(channel) + " is out of range for " + str(channels) +
+                             "-channel audio.")
+
+        self.source_buffer = source_buffer
+        self.channel = channel
+        self.channels = channels
+        self.sample_width = sample_width
+        self.data_offset = data_offset
+
+        # The channel's audio data is not held in memory.
+        self.audio_data = None
+        self.audio_view = None
+
+        self.chunk_bytes = chunk_bytes
+
+        self.read_location = 0
+        self.bytes_remaining = 0
+
+        if data_length is None:
+            data_length = source_buffer.total_audio_bytes - data_offset
+
+        # Only whole sample frames (one sample of every channel) are read.
+        self.total_audio_bytes = (data_length // (channels * sample_width)) * sample_width
+
+    def read_audio(self, location: int, size: int):
+        """
+        Read and de-interleave the channel's audio data at the given location, without moving the read location.
+        :param location: Byte offset into the channel's audio data.
+        :param size: Number of bytes to return.
+        :return: Audio data (bytes)
+        """
+        size = max(min(size, self.total_audio_bytes - location), 0)
+
+        # Read whole sample frames covering the requested bytes, then trim to the exact range.
+        first_sample = location // self.sample_width
+        sample_count = -(-(location + size) // self.sample_width) - first_sample
+        frame_bytes = self.channels * self.sample_width
+
+        source_data = self.source_buffer.read_audio(location=self.data_offset + first_sample * frame_bytes,
+                                                    size=sample_count * frame_bytes)
+        channel_samples = deinterleave_channels(source_data, channels=self.channels,
+                                                sample_width=self.sample_width)[self.channel]
+
+        start = location - first_sample * self.sample_width
+        return channel_samples.tobytes()[start:start + size]
+
+    def close(self):
+        """
+        Release any resources held by the source buffer.
+        """
+        self.source_buffer.close()
+
+
+class AudioPushStream:
+    """
+    Class containing the pacing state of an AudioHandler registered with an AudioPushScheduler.
+    """
+    def __init__(self, audio_handler, chunk_duration_ms: float, start_time: float):
+        """
+        :param audio_handler: AudioHandler pushing the audio.
+        :param chunk_duration_ms: Duration of audio in each chunk (milliseconds).
+        :param start_time: Event loop time (loop.time()) at which the first chunk is due.
+        """
+        self.audio_handler = audio_handler
+        self.chunk_duration_ms = chunk_duration_ms
+        self.start_time = start_time
+
+        # Set by the scheduler when chunks are due, to wake the task pushing this stream's audio.
+        self.wake_event = asyncio.Event()
+
+    def next_due_time(self) -> float:
+        """
+        :return: Event loop time at which the next chunk is due.
+        """
+        return self.start_time + (self.audio_handler.num_audio_chunks_sent * self.chunk_duration_ms) / 1000
+
+
+class AudioPushScheduler:
+    """
+    Paces the audio pushes of many AudioHandlers from a single task, instead of each handler sleeping between its own
+    chunks. On every tick (a fixed interval of the event loop's monotonic clock), each stream with chunks due is woken
+    to push all of them. This keeps the number of timers at one per tick no matter how many streams are pushing.
+
+    Chunk due times are fixed offsets from each stream's start, and the ticks stay on a fixed grid, so lateness doesn't
+    accumulate. Streams start on a tick, so chunks whose duration is a multiple of the tick are due exactly on ticks;
+    other chunks are pushed at most one tick after they are due, unless the event loop itself is running late. The
+    lateness of each stream is recorded on its AudioHandler and can be checked with get_stream_lateness_ms.
+    """
+    def __init__(self, tick_ms: float = 20):
+        """
+        :param tick_ms: Interval between ticks (milliseconds).
+        """
+        if tick_ms <= 0:
+            raise ValueError("AudioPushScheduler tick must be greater than 0 ms.")
+
+        self.tick_ms = tick_ms
+        self.streams: list = []  # AudioPushStream objects currently registered.
+        self.scheduler_task: asyncio.Task = None
+        self.tick_start_time: float = 0  # Event loop time of the first tick of the running tick task.
+        self.missed_ticks = 0  # Number of ticks skipped because the event loop was running late.
+
+    def start_scheduler_task(self):
+        """
+        Start the tick task in the running event loop, if it isn't already running.
+        """
+        loop = asyncio.get_running_loop()
+        if self.scheduler_task and not self.scheduler_task.done() and self.scheduler_task.get_loop() is loop:
+            return
+
+        self.tick_start_time = loop.time()
+        self.scheduler_task = loop.create_task(self.run_ticks())
+
+    def get_last_tick_time(self) -> float:
+        """
+        :return: Event loop time of the most recent tick on the scheduler's grid.
+        """
+        tick_seconds = self.tick_ms / 1000
+        ticks_elapsed = (asyncio.get_running_loop().time() - self.tick_start_time) // tick_seconds
+        return self.tick_start_time + ticks_elapsed * tick_seconds
+
+    async def run_ticks(self):
+        """
+        Wake every stream with chunks due on each tick, for as long as streams are registered.
+        """
+        loop = asyncio.get_running_loop()
+        tick_seconds = self.tick_ms / 1000
+        next_tick_time = self.tick_start_time
+
+        while self.streams:
+            now = loop.time()
+
+            for stream in self.streams:
+                if stream.audio_handler.audio_push_cancel_event.is_set() or stream.next_due_time() <= now:
+                    stream.wake_event.set()
+
+            # Keep ticks on a fixed grid; if the event loop ran late, skip the ticks that were missed.
+            next_tick_time += tick_seconds
+            if next_tick_time <= now:
+                ticks_behind = int((now - next_tick_time) // tick_seconds) + 1
+                self.missed_ticks += ticks_behind
+                next_tick_time += ticks_behind * tick_seconds
+
+            await asyncio.sleep(next_tick_time - loop.time())
+
+    async def push_audio_chunks(self, audio_handler, chunk_duration_ms: float):
+        """
+        Register the AudioHandler with the scheduler and push its audio buffer as its chunks become due. This returns
+        once the buffer has been pushed entirely, or the handler's audio_push_cancel_event is set.
+        :param audio_handler: AudioHandler with the audio buffer to push.
+        :param chunk_duration_ms: Duration of audio in each chunk (milliseconds).
+        """
+        loop = asyncio.get_running_loop()
+        self.start_scheduler_task()
+
+        # The stream starts on the most recent tick, so that due times fall on ticks when the chunk duration is a
+        # multiple of the tick. The first chunk is then due immediately.
+        stream = AudioPushStream(audio_handler=audio_handler, chunk_duration_ms=chunk_duration_ms,
+                                 start_time=self.get_last_tick_time())
+
+        self.streams.append(stream)
+        stream.wake_event.set()
+
+        try:
+            more_bytes = True
+            while more_bytes:
+                await stream.wake_event.wait()
+                stream.wake_event.clear()
+
+                # Push every chunk that is due (more than one if this stream has fallen behind).
+                while more_bytes and stream.next_due_time() <= loop.time():
+                    if audio_handler.audio_push_cancel_event.is_set():
+                        return
+
+                    more_bytes = await audio_handler.push_next_chunk(due_time=stream.next_due_time())
+
+                if audio_handler.audio_push_cancel_event.is_set():
+                    return
+        finally:
+            self.streams.remove(stream)
+
+    def get_stream_lateness_ms(self) -> dict:
+        """
+        :return: Map of session ID to (lateness of the most recent push, maximum lateness) in milliseconds, for each
+        registered stream.
+        """
+        return {stream.audio_handler.session_id: (stream.audio_handler.audio_push_lateness_ms,
+                                                  stream.audio_handler.audio_push_max_lateness_ms)
+                for stream in self.streams}
+
 
 class AudioHandler:
     """
@@ -127,13 +454,68 @@ class AudioHandler:
 
     audio_file_path: str = None
     audio_format: audio_formats.AudioFormat = None
+    # Format to send the audio in, if different from audio_format (e.g. AUDIO_FORMAT_PCM_8KHZ for ULAW audio, or for
+    # LINEAR16 audio recorded at 22.05 kHz). Pacing is still based on audio_format, while this is the format given in
+    # SessionSetInboundAudioFormat.
+    push_audio_format: audio_formats.AudioFormat = None
+
+    # Stages that each chunk of audio passes through before it is pushed (such as AudioTranscoder). Each stage has a
+    # process(audio_data) function returning the audio to push, and a flush() function returning any audio it still
+    # holds once the end of the audio is reached.
+    audio_push_stages: list = None
 
     audio_push_sleep_override: float = 0  # Use this variable to change the rate at which we push audio.
+    # Rate at which audio is pushed relative to real time (e.g. 10 pushes 10 seconds of audio per second). A value of 0
+    # pushes audio as fast as possible, each push waiting for its write to the stream (and so for gRPC's flow control)
+    # before the next, and yielding to other tasks after every audio_push_yield_interval_bytes.
+    audio_push_speed_factor: float = 1
+    # Bytes pushed before yielding to other tasks, when unthrottled. This keeps responses read while pushing; it does
+    # not limit the bytes in flight, which gRPC's flow control does.
+    audio_push_yield_interval_bytes: int = 64000
+    audio_push_real_time_factor: float = 0  # Real-time factor achieved by the most recent push (audio time / time).
+
+    # When a push falls more than audio_push_coalesce_threshold_ms behind schedule, the overdue chunks are merged into
+    # a single AudioPush request of up to audio_push_coalesce_max_bytes. A threshold of 0 disables this.
+    audio_push_coalesce_threshold_ms: float = 100
+    audio_push_coalesce_max_bytes: int = 16000
+    num_audio_chunks_coalesced: int = 0  # Chunks that were merged into the AudioPush request of an earlier chunk.
+    audio_push_chunk_interval_ms: float = 0  # Interval between chunks in the current push (milliseconds).
     audio_push_chunk_size_bytes: int = 0  # Size of audio chunks to send.
     num_audio_chunks_sent: int = 0  # Used to keep track of how much audio is sent.
+    total_audio_push_request_time: float = 0  # Time spent in audio push requests (seconds).
+    audio_push_lateness_ms: float = 0  # How late the most recent chunk was pushed compared to when it was due.
+    audio_push_max_lateness_ms: float = 0  # Largest lateness of any chunk in the current push.
+
+    # If True, leading and trailing silence beyond silence_trim_padding_ms is dropped before the audio is pushed. Frames
+    # quieter than silence_threshold_dbfs (relative to full scale) are treated as silence.
+    trim_silence: bool = False
+    silence_trim_padding_ms: float = DEFAULT_SILENCE_PADDING_MS
+    silence_threshold_dbfs: float = DEFAULT_SILENCE_THRESHOLD_DBFS
+    audio_trimmed_bytes: int = 0  # Bytes of silence dropped from the most recent push.
+    audio_trimmed_ms: float = 0  # Duration of silence dropped from the most recent push (milliseconds).
+
+    # If set, only this channel (0 being the first) of multi-channel WAV audio is pushed. The channel is split out on
+    # the client and pushed without the WAV header, so audio_format becomes the encoding of the WAV samples.
+    audio_channel: int = None
+
+    # Optional scheduler shared by many AudioHandlers to pace their pushes (see AudioPushScheduler).
+    audio_push_scheduler = None
 
     audio_data_buffer: AudioBuffer = None
     audio_data = None
+    wav_header_info: WavHeaderInfo = None  # Format information read from the header of WAV audio.
+
+    # If True, chunks are read from the audio file as they are pushed (FileAudioBuffer) rather than reading the whole
+    # file into memory first.
+    stream_audio_from_file: bool = True
+
+    # Optional source to read audio from as it arrives (such as a pipe, socket or async iterator), instead of an audio
+    # file (see audio_source_helper.py).
+    audio_source: AudioSource = None
+
+    # Optional cache of audio file contents (see audio_cache_helper.py). If set, the audio file is read through the
+    # cache and held in memory, sharing one copy with every other handler using the cache for the same file.
+    audio_cache: AudioCache = None
 
     # These next events are used for sending audio in chunks.
     audio_push_cancel_event = asyncio.Event()  # Set this to cancel audio push prematurely (if using buffers/chunks).
@@ -148,22 +530,70 @@ class AudioHandler:
                  audio_format: audio_formats.AudioFormat = None, chunk_audio: bool = True,
                  audio_push_sleep_override: float = 0, audio_push_chunk_size_bytes: int = 0,
                  audio_push_cancel_event: asyncio.Event = None, audio_push_finish_event: asyncio.Event = None,
-                 session_stream=None, session_id: str = None):
+                 session_stream=None, session_id: str = None, stream_audio_from_file: bool = True,
+                 audio_push_scheduler=None, audio_push_speed_factor: float = 1,
+                 audio_push_yield_interval_bytes: int = 64000, audio_push_coalesce_threshold_ms: float = 100,
+                 audio_push_coalesce_max_bytes: int = 16000, push_audio_format: audio_formats.AudioFormat = None,
+                 trim_silence: bool = False, silence_trim_padding_ms: float = DEFAULT_SILENCE_PADDING_MS,
+                 silence_threshold_dbfs: float = DEFAULT_SILENCE_THRESHOLD_DBFS, audio_channel: int = None,
+                 audio_cache: AudioCache = None, audio_source: AudioSource = None):
 
         self.lumenvox_api_client = lumenvox_api_client
         self.audio_file_path = audio_file_path
+        self.audio_source = audio_source
 
-        if not self.audio_file_path:
-            raise ValueError("No audio file path given.")
+        if not self.audio_file_path and not self.audio_source:
+            raise ValueError("No audio file path or audio source given.")
+
+        if self.audio_source and (trim_silence or audio_channel is not None):
+            raise ValueError("AudioHandler Error: trim_silence and audio_channel require an audio file, not an audio "
+                             "source.")
 
         self.audio_format = audio_format
 
+        # Push a single channel of multi-channel audio, if requested.
+        self.audio_channel = audio_channel
+        if audio_channel is not None:
+            self.init_channel_audio_format()
+
         self.audio_push_sleep_override = audio_push_sleep_override
         self.audio_push_chunk_size_bytes = audio_push_chunk_size_bytes
         self.audio_push_cancel_event = audio_push_cancel_event if audio_push_cancel_event else asyncio.Event()
         self.audio_push_finish_event = audio_push_finish_event if audio_push_finish_event else asyncio.Event()
 
-        if chunk_audio:
+        self.stream_audio_from_file = stream_audio_from_file
+        self.audio_cache = audio_cache
+        self.audio_push_scheduler = audio_push_scheduler
+
+        if audio_push_speed_factor < 0:
+            raise ValueError("Audio push speed factor cannot be negative.")
+
+        self.audio_push_speed_factor = audio_push_speed_factor
+        self.audio_push_yield_interval_bytes = audio_push_yield_interval_bytes
+        self.audio_push_coalesce_threshold_ms = audio_push_coalesce_threshold_ms
+        self.audio_push_coalesce_max_bytes = audio_push_coalesce_max_bytes
+
+        if trim_silence and audio_format.standard_audio_format not in \
+                (ULAW, ALAW, LINEAR16, audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_WAV):
+            raise ValueError("AudioHandler Error: Silence trimming is only supported for ULAW, ALAW, LINEAR16 and WAV "
+                             "audio.")
+
+        self.trim_silence = trim_silence
+        self.silence_trim_padding_ms = silence_trim_padding_ms
+        self.silence_threshold_dbfs = silence_threshold_dbfs
+
+        self.push_audio_format = push_audio_format
+        self.audio_push_stages = []
+
+        # Convert the audio to the push format on the fly, if a different format is to be sent.
+        if push_audio_format:
+            self.init_audio_push_stages()
+
+        if self.audio_source:
+            # Audio is read from the source as it is pushed.
+            if chunk_audio and not self.audio_push_chunk_size_bytes:
+                raise ValueError("Invalid audio chunk size")
+        elif chunk_audio:
             self.init_audio_buffer()  # Set audio data buffer.
             self.audio_data = self.audio_data_buffer.audio_data
         else:
@@ -172,19 +602,84 @@ class AudioHandler:
         self.session_stream = session_stream
         self.session_id = session_id
 
+    def init_audio_push_stages(self):
+        """
+        Add the audio push stages that convert audio from self.audio_format to self.push_audio_format. Resampling is
+        done on LINEAR16 audio, so G.711 audio is transcoded to LINEAR16 before it is resampled.
+        """
+        source_format = self.audio_format.standard_audio_format
+        target_format = self.push_audio_format.standard_audio_format
+        source_sample_rate = self.audio_format.sample_rate_hertz.value
+        target_sample_rate = self.push_audio_format.sample_rate_hertz.value
+
+        if source_sample_rate != target_sample_rate:
+            if source_format != LINEAR16:
+                self.audio_push_stages.append(AudioTranscoder(source_format=source_format, target_format=LINEAR16))
+                source_format = LINEAR16
+
+            self.audio_push_stages.append(AudioResampler(source_sample_rate=source_sample_rate,
+                                                         target_sample_rate=target_sample_rate))
+
+        if source_format != target_format:
+            self.audio_push_stages.append(AudioTranscoder(source_format=source_format, target_format=target_format))
+
+    def init_channel_audio_format(self):
+        """
+        Read the WAV header of the audio file and set self.audio_format to the format of a single channel of its
+        samples (ULAW, ALAW or LINEAR16 at the WAV sample rate), since self.audio_channel is pushed without the header.
+        """
+        if self.audio_format.standard_audio_format != \
+                audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_WAV:
+            raise ValueError("AudioHandler Error: audio_channel can only be used with WAV audio.")
+
+        header_buffer = FileAudioBuffer(audio_file_path=self.audio_file_path)
+        try:
+            self.wav_header_info = parse_wav_header(header_buffer)
+        finally:
+            header_buffer.close()
+
+        sample_format = get_wav_standard_audio_format(self.wav_header_info)
+        if not sample_format:
+            raise ValueError("AudioHandler Error: audio_channel is not supported for WAV format " +
+                             str(self.wav_header_info.audio_format) + ".")
+
+        if not 0 <= self.audio_channel < self.wav_header_info.channels:
+            raise ValueError("AudioHandler Error: audio_channel " + str(self.audio_channel) + " is out of range for " +
+                             str(self.wav_header_info.channels) + "-channel audio.")
+
+        self.audio_format = audio_formats.AudioFormat(
+            sample_rate_hertz=optional_int32(value=self.wav_header_info.sample_rate),
+            standard_audio_format=sample_format)
+
     def init_audio_buffer(self):
         """
-        Reads the specified audio file from disk into an AudioBuffer object and returns it.
+        Creates an AudioBuffer object for the specified audio file. If self.stream_audio_from_file is set, the buffer
+        reads chunks from disk as they are pushed; otherwise the audio file is read into memory (through
+        self.audio_cache, if set).
         """
         if not self.audio_push_chunk_size_bytes:
             raise ValueError("Invalid audio chunk size")
         if not os.path.isfile(self.audio_file_path):
             raise FileNotFoundError(self.audio_file_path + " not found")
 
-        with open(self.audio_file_path, 'rb') as audio_file:
-            audio_data = audio_file.read()
+        # Cached audio is already in memory, so it is read from the cache rather than streamed from the file.
+        if self.stream_audio_from_file and not self.audio_cache:
+            audio_buffer = FileAudioBuffer(audio_file_path=self.audio_file_path,
+                                           chunk_bytes=self.audio_push_chunk_size_bytes)
+        else:
+            audio_buffer = AudioBuffer(audio_data=self.read_audio_file_data(),
+                                       chunk_bytes=self.audio_push_chunk_size_bytes)
+
+        # Split the selected channel out of the interleaved audio as chunks are read.
+        if self.audio_channel is not None:
+            audio_buffer = ChannelAudioBuffer(source_buffer=audio_buffer, channel=self.audio_channel,
+                                              channels=self.wav_header_info.channels,
+                                              sample_width=self.wav_header_info.sample_width,
+                                              data_offset=self.wav_header_info.data_offset,
+                                              data_length=self.wav_header_info.data_length,
+                                              chunk_bytes=self.audio_push_chunk_size_bytes)
 
-        self.audio_data_buffer = AudioBuffer(audio_data=audio_data, chunk_bytes=self.audio_push_chunk_size_bytes)
+        self.audio_data_buffer = audio_buffer
 
     def init_full_audio_bytes(self, audio_file_path: str = None):
         """
@@ -200,8 +695,34 @@ class AudioHandler:
         if not os.path.isfile(self.audio_file_path):
             raise FileNotFoundError(self.audio_file_path + " not found")
 
+        self.audio_data = self.read_audio_file()
+
+    def read_audio_file_data(self) -> bytes:
+        """
+        Read the contents of the audio file, through self.audio_cache if set.
+        :return: Audio file data (bytes)
+        """
+        if self.audio_cache:
+            return self.audio_cache.read_audio_file(self.audio_file_path)
+
         with open(self.audio_file_path, 'rb') as audio_file:
-            self.audio_data = audio_file.read()
+            return audio_file.read()
+
+    def read_audio_file(self) -> bytes:
+        """
+        Read the full audio file. If self.audio_channel is set, only the samples of that channel are returned.
+        :return: Audio data (bytes)
+        """
+        audio_data = self.read_audio_file_data()
+
+        if self.audio_channel is not None:
+            data_offset = self.wav_header_info.data_offset
+            samples_data = memoryview(audio_data)[data_offset:data_offset + self.wav_header_info.data_length]
+            audio_data = extract_channel(samples_data, channel=self.audio_channel,
+                                         channels=self.wav_header_info.channels,
+                                         sample_width=self.wav_header_info.sample_width)
+
+        return audio_data
 
     async def set_inbound_audio_format(self):
         """
@@ -216,43 +737,317 @@ class AudioHandler:
 
         await self.lumenvox_api_client.session_set_inbound_audio_format(
             session_stream=self.session_stream,
-            audio_format_msg=self.audio_format,
+            audio_format_msg=self.push_audio_format if self.push_audio_format else self.audio_format,
             correlation_id=self.correlation_id)
 
+    def process_audio(self, audio_data):
+        """
+        Pass audio data through the audio push stages (if any).
+        :param audio_data: Audio data (bytes-like) read from the audio file.
+        :return: Audio data to push.
+        """
+        for stage in self.audio_push_stages:
+            audio_data = stage.process(audio_data)
+
+        return audio_data
+
+    def flush_audio_push_stages(self):
+        """
+        Flush the audio push stages once the end of the audio is reached. The audio each stage still holds is passed
+        through the stages after it.
+        :return: Audio data left to push (may be empty).
+        """
+        audio_data = b''
+
+        for stage in self.audio_push_stages:
+            audio_data = stage.process(audio_data) if audio_data else b''
+            audio_data += stage.flush()
+
+        return audio_data
+
+    def trim_audio_silence(self, audio_buffer: AudioBuffer):
+        """
+        Restrict the audio buffer to the speech in the audio, dropping leading and trailing silence beyond
+        self.silence_trim_padding_ms. The silence dropped is recorded in self.audio_trimmed_bytes and
+        self.audio_trimmed_ms. For WAV audio, the header is left out of the range (see push_audio_chunk).
+        :param audio_buffer: AudioBuffer holding the audio.
+        """
+        sample_format = self.audio_format.standard_audio_format
+        sample_rate = self.audio_format.sample_rate_hertz.value
+        sample_bytes = 2 if sample_format == LINEAR16 else 1
+        start_location = 0
+        end_location = audio_buffer.total_audio_bytes
+
+        if sample_format == audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_WAV:
+            if not self.wav_header_info:
+                self.wav_header_info = parse_wav_header(audio_buffer)
+
+            sample_format = get_wav_standard_audio_format(self.wav_header_info)
+            if not sample_format:
+                raise ValueError("AudioHandler Error: Silence trimming is not supported for WAV format " +
+                                 str(self.wav_header_info.audio_format) + ".")
+
+            sample_rate = self.wav_header_info.sample_rate
+            sample_bytes = self.wav_header_info.block_align
+            start_location = self.wav_header_info.data_offset
+            end_location = min(start_location + self.wav_header_info.data_length, end_location)
+
+        speech_start, speech_end = find_speech_byte_range(
+            audio_buffer=audio_buffer, start_location=start_location, end_location=end_location,
+            sample_format=sample_format, sample_bytes=sample_bytes, sample_rate=sample_rate,
+            silence_threshold_dbfs=self.silence_threshold_dbfs, padding_ms=self.silence_trim_padding_ms)
+
+        audio_buffer.seek(speech_start)
+        audio_buffer.limit(speech_end)
+
+        self.audio_trimmed_bytes = (end_location - start_location) - (speech_end - speech_start)
+        self.audio_trimmed_ms = self.audio_trimmed_bytes / (sample_bytes * sample_rate / 1000)
+
     async def push_all_audio(self):
         """
         This function will push the entirety of the audio data (self.audio_data) at once.
+        If self.audio_data has not been read, the audio file is read for this push only and not kept in memory.
         Unlike self.push_audio_chunks, this does not need to be run as a task.
         """
-        if not self.audio_data:
+        audio_data = self.audio_data
+
+        if not audio_data and self.audio_source:
+            audio_data = await self.audio_source.read_all()
+            self.audio_source.close()
+        elif not audio_data and self.audio_file_path and os.path.isfile(self.audio_file_path):
+            audio_data = self.read_audio_file()
+
+        if not audio_data:
             raise ValueError("Cannot not push audio without self.audio_data")
 
         if not self.lumenvox_api_client:
             raise ValueError("AudioHandler Error: Set lumenvox_api_client before running audio functions.")
 
+        if self.trim_silence:
+            audio_buffer = AudioBuffer(audio_data)
+            self.trim_audio_silence(audio_buffer)
+
+            trimmed_data = audio_data[audio_buffer.read_location:audio_buffer.total_audio_bytes]
+
+            # Keep the WAV header, if any, ahead of the trimmed audio, with its sizes matching the trimmed audio.
+            header_data = b''
+            if self.audio_format.standard_audio_format == \
+                    audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_WAV:
+                header_data = set_wav_header_data_length(header_data=audio_data[:self.wav_header_info.data_offset],
+                                                         data_length=len(trimmed_data))
+            audio_data = header_data + trimmed_data
+
+        if self.audio_push_stages:
+            audio_data = bytes(self.process_audio(audio_data)) + self.flush_audio_push_stages()
+
         await self.lumenvox_api_client.session_audio_push(
             session_stream=self.session_stream,
-            audio_data=self.audio_data,
+            audio_data=audio_data,
             correlation_id=self.correlation_id)
 
+    def get_wav_header_info(self) -> WavHeaderInfo:
+        """
+        Read the WAV header of the audio (once) and return its format information.
+        :return: WavHeaderInfo object for the audio.
+        """
+        if not self.wav_header_info:
+            audio_buffer = self.audio_data_buffer if self.audio_data_buffer else AudioBuffer(self.audio_data)
+            self.wav_header_info = parse_wav_header(audio_buffer)
+
+        return self.wav_header_info
+
     async def push_audio_chunk(self):
         """
-        Push single audio chunk. Useful for cases like .WAV format audio where the first chunk needs to be pushed before
-        InteractionCreate.
+        Push single audio chunk. Useful for cases like .WAV format audio where the header needs to be pushed before
+        InteractionCreate. For WAV audio, the pushed chunk is the whole header, up to the start of the audio samples.
+        With an audio source, the next chunk read from the source is pushed. Either way, the chunk is passed through the
+        audio push stages, like every other pushed chunk.
         """
+        if self.audio_source:
+            audio_data = await self.audio_source.read(self.audio_push_chunk_size_bytes)
+            if audio_data:
+                await self.lumenvox_api_client.session_audio_push(
+                    session_stream=self.session_stream,
+                    correlation_id=self.correlation_id,
+                    audio_data=self.process_audio(audio_data))
+            return
+
+        audio_buffer = self.audio_data_buffer if self.audio_data_buffer else AudioBuffer(self.audio_data)
+
+        chunk_size = self.audio_push_chunk_size_bytes
+        if self.audio_format.standard_audio_format == \
+                audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_WAV:
+            chunk_size = self.get_wav_header_info().data_offset
+
         await self.lumenvox_api_client.session_audio_push(
             session_stream=self.session_stream,
             correlation_id=self.correlation_id,
-            audio_data=self.audio_data[:self.audio_push_chunk_size_bytes])
+            audio_data=self.process_audio(audio_buffer.peek(size=chunk_size, location=0)))
+
+    async def push_next_chunk(self, due_time: float) -> bool:
+        """
+        Push the next chunk of the audio buffer, recording how late the push is compared to when it was due.
+        If the push is further behind than self.audio_push_coalesce_threshold_ms, every chunk that is already due is
+        sent in this one request (up to self.audio_push_coalesce_max_bytes).
+        :param due_time: Event loop time (loop.time()) at which the chunk was due to be pushed.
+        :return: False once the audio buffer has been pushed entirely.
+        """
+        loop = asyncio.get_running_loop()
+        request_start_time = loop.time()  # seconds
+
+        self.audio_push_lateness_ms = max(request_start_time - due_time, 0) * 1000
+        self.audio_push_max_lateness_ms = max(self.audio_push_max_lateness_ms, self.audio_push_lateness_ms)
+
+        chunk_count = 1
+        if self.audio_push_coalesce_threshold_ms and self.audio_push_chunk_interval_ms and \
+                self.audio_push_lateness_ms > self.audio_push_coalesce_threshold_ms:
+            overdue_chunks = int(self.audio_push_lateness_ms // self.audio_push_chunk_interval_ms) + 1
+            max_chunks = max(self.audio_push_coalesce_max_bytes // self.audio_push_chunk_size_bytes, 1)
+            chunk_count = min(overdue_chunks, max_chunks)
+
+        audio_data = self.audio_data_buffer.get_next_chunk(chunk_bytes=chunk_count * self.audio_push_chunk_size_bytes)
+        more_bytes = audio_data is not None
+
+        # At the end of the audio, push anything the audio push stages still hold.
+        audio_data = self.process_audio(audio_data) if more_bytes else self.flush_audio_push_stages()
+
+        if audio_data:
+            await self.lumenvox_api_client.session_audio_push(
+                session_stream=self.session_stream,
+                audio_data=audio_data,
+                correlation_id=self.correlation_id)
+
+        # Merged chunks are counted individually, since the due time of the next chunk depends on this count.
+        self.num_audio_chunks_sent += chunk_count
+        self.num_audio_chunks_coalesced += chunk_count - 1
+
+        if self.print_audio_push_messages:
+            print("Sending audio chunk ", self.num_audio_chunks_sent)
+
+        self.total_audio_push_request_time += loop.time() - request_start_time
+
+        return more_bytes
+
+    def get_raw_audio_bytes_per_ms(self) -> float:
+        """
+        :return: Bytes per millisecond of self.audio_format for headerless ULAW, ALAW and LINEAR16 audio, or None for
+                 formats whose rate cannot be known without reading the audio.
+        """
+        bytes_per_sample = {ULAW: 1, ALAW: 1, LINEAR16: 2}.get(self.audio_format.standard_audio_format)
+        if not bytes_per_sample:
+            return None
+
+        return (bytes_per_sample * self.audio_format.sample_rate_hertz.value) / 1000
+
+    async def read_audio_source_chunk(self):
+        """
+        Read the next chunk of audio from self.audio_source, stopping early if self.audio_push_cancel_event is set
+        while waiting for live audio to arrive.
+        :return: Audio data (b'' once the source has ended), or None if the push was cancelled.
+        """
+        read_task = asyncio.ensure_future(self.audio_source.read(self.audio_push_chunk_size_bytes))
+        cancel_task = asyncio.ensure_future(self.audio_push_cancel_event.wait())
+
+        await asyncio.wait({read_task, cancel_task}, return_when=asyncio.FIRST_COMPLETED)
+
+        cancel_task.cancel()
+        if not read_task.done():
+            read_task.cancel()
+            return None
+
+        return read_task.result()
+
+    async def push_audio_source(self):
+        """
+        Push audio from self.audio_source as it is read. Audio from a live source is pushed as soon as it arrives, so
+        the rate of the pushes follows the sender; while pushes are slower than the sender, the source's bounded buffer
+        fills and reading from the sender is paused. Audio from a paced source (such as a regular file) is pushed in
+        real time, scaled by self.audio_push_speed_factor, for formats whose byte rate is known.
+        """
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+
+        bytes_per_ms = self.get_raw_audio_bytes_per_ms()
+
+        chunk_duration_ms = 0
+        if self.audio_source.paced:
+            if self.audio_push_sleep_override:
+                chunk_duration_ms = self.audio_push_sleep_override * 1000
+            elif self.audio_push_speed_factor and bytes_per_ms:
+                chunk_duration_ms = self.audio_push_chunk_size_bytes / bytes_per_ms / self.audio_push_speed_factor
+
+        self.audio_push_chunk_interval_ms = chunk_duration_ms
+        self.num_audio_chunks_sent = 0
+        self.num_audio_chunks_coalesced = 0
+        self.total_audio_push_request_time = 0
+        self.audio_push_lateness_ms = 0
+        self.audio_push_max_lateness_ms = 0
+        start_bytes_read = self.audio_source.bytes_read
+
+        more_bytes = True
+        while more_bytes:
+            audio_data = await self.read_audio_source_chunk()
+            if audio_data is None:
+                break
+
+            request_start_time = loop.time()
+            more_bytes = bool(audio_data)
+
+            # At the end of the audio, push anything the audio push stages still hold.
+            audio_data = self.process_audio(audio_data) if more_bytes else self.flush_audio_push_stages()
+
+            if audio_data:
+                await self.lumenvox_api_client.session_audio_push(
+                    session_stream=self.session_stream,
+                    audio_data=audio_data,
+                    correlation_id=self.correlation_id)
+
+            self.total_audio_push_request_time += loop.time() - request_start_time
+
+            if not more_bytes:
+                break
+
+            self.num_audio_chunks_sent += 1
+            if self.print_audio_push_messages:
+                print("Sending audio chunk ", self.num_audio_chunks_sent)
+
+            if chunk_duration_ms:
+                due_time = start_time + (self.num_audio_chunks_sent * chunk_duration_ms) / 1000
+                await asyncio.sleep(due_time - loop.time())
+
+        self.audio_source.close()
+
+        total_stream_time = loop.time() - start_time
+        audio_pushed_bytes = self.audio_source.bytes_read - start_bytes_read
+
+        self.audio_push_real_time_factor = 0
+        if bytes_per_ms and total_stream_time:
+            self.audio_push_real_time_factor = (audio_pushed_bytes / bytes_per_ms) / (total_stream_time * 1000)
+
+        print("AUDIO SOURCE STREAM COMPLETED. ",
+              ", TotalAudioStreamDuration (ms):", total_stream_time * 1000,
+              ", TotalTimeSpentOnAllRequests (ms): ", self.total_audio_push_request_time * 1000,
+              ", AudioBytesRead: ", audio_pushed_bytes,
+              ", RealTimeFactor: ", self.audio_push_real_time_factor,
+              ", TotalNumberOfStreamingRequests (Chunk counter): ", self.num_audio_chunks_sent)
+
+        if self.audio_push_finish_event:
+            self.audio_push_finish_event.set()
 
     async def push_audio_chunks(self):
         """
-        Push audio data chunks into the LumenVox API.
+        Push audio data chunks into the LumenVox API, paced in real time. If self.audio_push_scheduler is set, the
+        pushes are paced by that (shared) scheduler instead of by this task alone.
         """
+        if self.audio_source:
+            await self.push_audio_source()
+            return
+
         sample_rate: int = self.audio_format.sample_rate_hertz.value
         audio_format = self.audio_format.standard_audio_format
 
         bytes_per_sample = 1
+        channels = 1
 
         # The format of the audio is crucial to determine the rate at which the audio is sent, so the bytes_per_sample
         # is set based on the format.
@@ -266,63 +1061,104 @@ class AudioHandler:
             bytes_per_sample = 2
         elif audio_format == audio_formats.AudioFormat.StandardAudioFormat.STANDARD_AUDIO_FORMAT_WAV:
             # here, we need to grab information from the WAV header
+            wav_header_info = self.get_wav_header_info()
 
-            wav_format = self.audio_data_buffer.audio_data[20]  # Get WAV format from header.
-            if (wav_format == 7) or (wav_format == 6):  # Handle ULAW/ALAW.
-                bytes_per_sample = 1
-            elif wav_format == 1:  # Handle PCM.
-                bytes_per_sample = 2
-
-            sample_rate = (self.audio_data_buffer.audio_data[29] << 8) + self.audio_data_buffer.audio_data[28]
+            bytes_per_sample = wav_header_info.sample_width
+            channels = wav_header_info.channels
+            sample_rate = wav_header_info.sample_rate
 
-            self.audio_data_buffer.get_next_chunk()  # Get rid of the first chunk since it should already be sent.
+            # Start from the audio samples, since the header should already be sent (see push_audio_chunk), and stop at
+            # the end of the data chunk, so that trailing chunks (such as LIST or id3 metadata) aren't pushed as audio.
+            self.audio_data_buffer.seek(wav_header_info.data_offset)
+            self.audio_data_buffer.limit(wav_header_info.data_offset + wav_header_info.data_length)
 
         # We calculate the rate of time at which audio is sent into the API. Bytes/millisecond needs to be determined
         # beforehand.
-        bytes_per_ms = (bytes_per_sample * sample_rate) / 1000
+        bytes_per_ms = (channels * bytes_per_sample * sample_rate) / 1000
+
+        # Compressed formats (MP3, FLAC, Opus, M4A, MP4) have no fixed number of bytes per sample, so the duration is
+        # read from the file's headers and the audio is paced at its average number of bytes per millisecond.
+        audio_duration_ms = probe_audio_duration_ms(self.audio_data_buffer, audio_format)
+        if audio_duration_ms:
+            bytes_per_ms = self.audio_data_buffer.total_audio_bytes / audio_duration_ms
         chunk_duration_ms = self.audio_push_chunk_size_bytes / bytes_per_ms
 
-        start_time = time.time()
-        total_request_time = 0  # seconds
+        # A fixed interval between pushes may be used instead of the real-time chunk duration. Otherwise, the chunk
+        # interval is scaled by the speed factor.
+        if self.audio_push_sleep_override:
+            chunk_duration_ms = self.audio_push_sleep_override * 1000
+        elif self.audio_push_speed_factor:
+            chunk_duration_ms /= self.audio_push_speed_factor
 
-        # Execute a while loop wherein audio chunks are sent to the API. The rate of time at which the chunks are sent
-        # factors in the chunk_duration_ms calculated above.
-        more_bytes = True
-        self.num_audio_chunks_sent = 0
-        while more_bytes:
-            request_start_time = time.time()  # seconds
+        # Drop leading and trailing silence, so that it is neither sent nor waited for.
+        if self.trim_silence:
+            self.trim_audio_silence(self.audio_data_buffer)
 
-            if self.audio_push_cancel_event or self.audio_push_finish_event:
+        # Pacing uses the event loop's monotonic clock, so changes to the system clock don't affect it.
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        start_read_location = self.audio_data_buffer.read_location
+
+        self.audio_push_chunk_interval_ms = chunk_duration_ms
+        self.num_audio_chunks_sent = 0
+        self.num_audio_chunks_coalesced = 0
+        self.total_audio_push_request_time = 0
+        self.audio_push_lateness_ms = 0
+        self.audio_push_max_lateness_ms = 0
+
+        if not self.audio_push_sleep_override and not self.audio_push_speed_factor:
+            # Unthrottled: push chunks back-to-back (in order). Each push waits for its write to the stream to
+            # complete, so the pushes are held back by gRPC's flow control rather than queued without limit. Writes
+            # that complete without suspending don't let other tasks run, so the task also yields to the event loop at
+            # regular intervals, letting responses such as partial results be read while the audio is pushed.
+            more_bytes = True
+            bytes_since_yield = 0
+            while more_bytes:
                 if self.audio_push_cancel_event.is_set():
-                    self.audio_push_finish_event.set()
                     break
 
-            more_bytes = \
-                await self.lumenvox_api_client.audio_push_from_buffer(
-                    session_stream=self.session_stream,
-                    audio_buffer=self.audio_data_buffer,
-                    correlation_id=self.correlation_id)
+                more_bytes = await self.push_next_chunk(due_time=loop.time())
 
-            self.num_audio_chunks_sent += 1
+                bytes_since_yield += self.audio_push_chunk_size_bytes
+                if bytes_since_yield >= self.audio_push_yield_interval_bytes:
+                    bytes_since_yield = 0
+                    await asyncio.sleep(0)
+        elif self.audio_push_scheduler:
+            # The shared scheduler wakes this task whenever chunks are due, along with every other registered stream.
+            await self.audio_push_scheduler.push_audio_chunks(audio_handler=self, chunk_duration_ms=chunk_duration_ms)
+        else:
+            # Execute a while loop wherein audio chunks are sent to the API. Each chunk is due at a fixed offset from
+            # the start time (rather than after the previous sleep), so that delays don't accumulate.
+            more_bytes = True
+            while more_bytes:
+                if self.audio_push_cancel_event.is_set():
+                    break
 
-            if self.print_audio_push_messages:
-                print("Sending audio chunk ", self.num_audio_chunks_sent)
+                more_bytes = await self.push_next_chunk(
+                    due_time=start_time + (self.num_audio_chunks_sent * chunk_duration_ms) / 1000)
 
-            request_time = time.time() - request_start_time  # seconds
-            total_request_time += request_time
+                sleep_duration = start_time + (self.num_audio_chunks_sent * chunk_duration_ms) / 1000 - loop.time()
+                await asyncio.sleep(sleep_duration)
 
-            sleep_duration = ((self.num_audio_chunks_sent * chunk_duration_ms) / 1000) - (time.time() - start_time)
-            await \
-                asyncio.sleep(sleep_duration if not self.audio_push_sleep_override else self.audio_push_sleep_override)
+        # Release the audio file (if reading from disk) now that pushing has stopped.
+        self.audio_data_buffer.close()
 
-        total_stream_time = time.time() - start_time
-        sleep_time = total_stream_time - total_request_time
+        total_stream_time = loop.time() - start_time
+        sleep_time = total_stream_time - self.total_audio_push_request_time
+
+        # Real-time factor: the duration of the audio pushed, relative to the time taken to push it.
+        audio_pushed_ms = (self.audio_data_buffer.read_location - start_read_location) / bytes_per_ms
+        self.audio_push_real_time_factor = audio_pushed_ms / (total_stream_time * 1000) if total_stream_time else 0
 
         print("AUDIO STREAM COMPLETED. ",
               ", TotalAudioStreamDuration (ms):", total_stream_time * 1000,
-              ", TotalTimeSpentOnAllRequests (ms): ", total_request_time * 1000,
+              ", TotalTimeSpentOnAllRequests (ms): ", self.total_audio_push_request_time * 1000,
               ", SleepingTime (ms): ", sleep_time * 1000,
-              ", TotalNumberOfStreamingRequests (Chunk counter): ", self.num_audio_chunks_sent)
+              ", MaxPushLateness (ms): ", self.audio_push_max_lateness_ms,
+              ", RealTimeFactor: ", self.audio_push_real_time_factor,
+              ", CoalescedChunks: ", self.num_audio_chunks_coalesced,
+              ", TotalNumberOfStreamingRequests (Chunk counter): ",
+              self.num_audio_chunks_sent - self.num_audio_chunks_coalesced)
 
         # Set the finish event defined above so that any function waiting for audio to be sent knows that the process
         # has been finished.
@@ -0,0 +1,152 @@
+"""
+Audio Resample Helper file
+This file contains a streaming resampler for LINEAR16 (16-bit little-endian PCM) audio, used to convert between the
+sample rates in audio_helper.py (8 kHz, 16 kHz, 22.05 kHz) before pushing audio. It uses a polyphase windowed-sinc
+filter applied with NumPy, keeping the filter history between chunks so audio can be resampled as it is streamed.
+"""
+import math
+
+import numpy as np
+
+# Number of filter taps applied per output sample. More taps give a sharper low-pass filter at a higher CPU cost.
+DEFAULT_TAPS_PER_PHASE = 32
+
+# Kaiser window shape parameter for the filter (about 80 dB of stop-band attenuation).
+KAISER_BETA = 8.6
+
+# Cutoff of the low-pass filter as a fraction of the lower of the two Nyquist frequencies, leaving room for the
+# transition band below it.
+CUTOFF_RATIO = 0.92
+
+
+def build_polyphase_filter(up: int, down: int, taps_per_phase: int) -> np.ndarray:
+    """
+    Design the low-pass filter for resampling by up / down, split into its polyphase components.
+    :param up: Upsampling factor.
+    :param down: Downsampling factor.
+    :param taps_per_phase: Number of filter taps per phase.
+    :return: Array of shape (up, taps_per_phase), where row p holds the taps applied to output samples falling on
+             phase p of the upsampled signal, ordered from the most recent input sample to the oldest.
+    """
+    num_taps = up * taps_per_phase
+    cutoff = CUTOFF_RATIO * 0.5 / max(up, down)  # In cycles per upsampled sample.
+
+    # Center the filter on a whole upsampled sample, so its delay is exactly taps_per_phase // 2 input samples.
+    center = (taps_per_phase // 2) * up
+    tap_times = np.arange(num_taps) - center
+    window = np.kaiser(2 * center + 1, KAISER_BETA)[:num_taps]
+    prototype = 2 * cutoff * np.sinc(2 * cutoff * tap_times) * window
+
+    # Scale by the upsampling factor, since only one in every `up` upsampled samples is nonzero.
+    prototype *= up / prototype.sum()
+
+    return prototype.reshape(taps_per_phase, up).T.copy()
+
+
+class AudioResampler:
+    """
+    Audio push stage that resamples LINEAR16 audio from one sample rate to another (see AudioHandler). The filter
+    history and the position of the next output sample are carried between chunks, so chunks may be any number of
+    bytes and the output is the same as resampling the whole audio at once.
+    """
+    def __init__(self, source_sample_rate: int, target_sample_rate: int,
+                 taps_per_phase: int = DEFAULT_TAPS_PER_PHASE):
+        """
+        :param source_sample_rate: Sample rate of the audio being pushed (Hz).
+        :param target_sample_rate: Sample rate to convert the audio to (Hz).
+        :param taps_per_phase: Number of filter taps applied per output sample.
+        """
+        if source_sample_rate <= 0 or target_sample_rate <= 0:
+            raise ValueError("Sample rates must be positive (got " + str(source_sample_rate) + " and " +
+                             str(target_sample_rate) + ").")
+
+        self.source_sample_rate = source_sample_rate
+        self.target_sample_rate = target_sample_rate
+
+        rate_divisor = math.gcd(source_sample_rate, target_sample_rate)
+        self.up = target_sample_rate // rate_divisor
+        self.down = source_sample_rate // rate_divisor
+        self.taps_per_phase = taps_per_phase
+
+        self.filter_phases = build_polyphase_filter(up=self.up, down=self.down, taps_per_phase=taps_per_phase)
+
+        # Input samples from previous chunks still needed by the filter (starts as silence).
+        self.history = np.zeros(taps_per_phase - 1, dtype=np.float64)
+        # Position of the next output sample, in upsampled samples from the start of the next chunk. Starting half the
+        # filter length in compensates for the filter delay, so the output lines up with the input.
+        self.next_output_position = (taps_per_phase // 2) * self.up
+
+        self.remaining_data = b''  # Byte of an incomplete sample from the previous chunk.
+
+    def resample_samples(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resample the next block of input samples.
+        :param samples: Input samples (float64).
+        :return: Output samples (float64).
+        """
+        buffer = np.concatenate((self.history, samples))
+        history_length = len(self.history)
+
+        # Output samples whose newest input sample is in this block.
+        available_positions = len(samples) * self.up - self.next_output_position
+        output_count = max(-(-available_positions // self.down), 0)
+
+        output_positions = self.next_output_position + self.down * np.arange(output_count)
+        input_indexes = output_positions // self.up + history_length
+        phases = output_positions % self.up
+
+        # Gather the input samples for each output (newest first) and apply the taps of its phase.
+        sample_indexes = input_indexes[:, np.newaxis] - np.arange(self.taps_per_phase)
+        output = np.einsum('ij,ij->i', buffer[sample_indexes], self.filter_phases[phases])
+
+        self.next_output_position += output_count * self.down - len(samples) * self.up
+        self.history = buffer[len(buffer) - history_length:]
+
+        return output
+
+    def process(self, audio_data) -> bytes:
+        """
+        :param audio_data: Chunk of LINEAR16 audio data (bytes-like) at the source sample rate.
+        :return: LINEAR16 audio data at the target sample rate.
+        """
+        if self.remaining_data:
+            audio_data = self.remaining_data + bytes(audio_data)
+
+        complete_bytes = len(audio_data) - (len(audio_data) % 2)
+        self.remaining_data = bytes(audio_data[complete_bytes:])
+
+        samples = np.frombuffer(audio_data[:complete_bytes], dtype='<i2').astype(np.float64)
+
+        return self.to_linear16(self.resample_samples(samples))
+
+    def flush(self) -> bytes:
+        """
+        Called once all audio has been processed. Pushes silence through the filter to output the last samples still
+        held in the filter history.
+        :return: Remaining LINEAR16 audio data at the target sample rate.
+        """
+        self.remaining_data = b''
+        return self.to_linear16(self.resample_samples(np.zeros(self.taps_per_phase // 2, dtype=np.float64)))
+
+    @staticmethod
+    def to_linear16(samples: np.ndarray) -> bytes:
+        """
+        :param samples: Audio samples (float64).
+        :return: LINEAR16 audio data, rounded and clipped to the 16-bit range.
+        """
+        return np.clip(np.rint(samples), -32768, 32767).astype('<i2').tobytes()
+
+
+def resample(audio_data, source_sample_rate: int, target_sample_rate: int) -> bytes:
+    """
+    Resample LINEAR16 audio data in one call.
+    :param audio_data: LINEAR16 audio data (bytes-like) at the source sample rate.
+    :param source_sample_rate: Sample rate of audio_data (Hz).
+    :param target_sample_rate: Sample rate to convert to (Hz).
+    :return: LINEAR16 audio data at the target sample rate.
+    """
+    if source_sample_rate == target_sample_rate:
+        return bytes(audio_data)
+
+    resampler = AudioResampler(source_sample_rate=source_sample_rate, target_sample_rate=target_sample_rate)
+    return resampler.process(audio_data) + resampler.flush()
@@ -0,0 +1,278 @@
+"""
+Audio RTP Helper file
+This file contains an audio source receiving G.711 audio over RTP (RFC 3550), so that calls from a telephony edge can be
+pushed through AudioHandler directly instead of being depacketized to files first. Packets pass through a small jitter
+buffer that puts them back in sequence order, and the payloads are read as audio by AudioHandler (see
+AudioHandler.audio_source).
+"""
+import collections
+import struct
+
+from helpers.audio_source_helper import DEFAULT_UDP_END_TIMEOUT_S
+from helpers.audio_source_helper import DEFAULT_UDP_MAX_DATAGRAMS
+from helpers.audio_source_helper import UdpAudioSource
+
+RTP_VERSION = 2
+RTP_HEADER_SIZE = 12
+
+# Static RTP payload types for G.711 audio (RFC 3551).
+RTP_PAYLOAD_TYPE_PCMU = 0
+RTP_PAYLOAD_TYPE_PCMA = 8
+
+# Byte value of a silent sample for each payload type, used to fill in lost packets.
+RTP_SILENCE_BYTES = {
+    RTP_PAYLOAD_TYPE_PCMU: b'\xff',
+    RTP_PAYLOAD_TYPE_PCMA: b'\xd5',
+}
+
+DEFAULT_JITTER_BUFFER_PACKETS = 5  # Packets held while waiting for a missing packet, before it is treated as lost.
+RELEASED_PACKETS_WINDOW = 64  # Sequence numbers of recently released packets, kept to recognize re-delivered packets.
+
+SEQUENCE_NUMBER_MODULO = 0x10000
+
+
+class RtpPacket:
+    """
+    Class containing the fields of an RTP packet used for audio.
+    """
+    marker: bool = False
+    payload_type: int = None
+    sequence_number: int = None
+    timestamp: int = None
+    ssrc: int = None
+    payload: bytes = None
+
+
+def parse_rtp_packet(data: bytes):
+    """
+    :param data: Datagram holding an RTP packet.
+    :return: RtpPacket, or None if the datagram is not a valid RTP packet.
+    """
+    if len(data) < RTP_HEADER_SIZE:
+        return None
+
+    first_byte, second_byte, sequence_number, timestamp, ssrc = struct.unpack('!BBHII', data[:RTP_HEADER_SIZE])
+    if first_byte >> 6 != RTP_VERSION:
+        return None
+
+    # Skip the CSRC list and header extension, if present.
+    payload_start = RTP_HEADER_SIZE + (first_byte & 0x0F) * 4
+    if first_byte & 0x10:
+        if len(data) < payload_start + 4:
+            return None
+        extension_words, = struct.unpack('!H', data[payload_start + 2:payload_start + 4])
+        payload_start += 4 + extension_words * 4
+
+    # With the padding bit set, the last byte holds the number of padding bytes.
+    payload_end = len(data)
+    if first_byte & 0x20 and len(data) > payload_start:
+        payload_end -= data[-1]
+
+    if payload_end < payload_start:
+        return None
+
+    packet = RtpPacket()
+    packet.marker = bool(second_byte & 0x80)
+    packet.payload_type = second_byte & 0x7F
+    packet.sequence_number = sequence_number
+    packet.timestamp = timestamp
+    packet.ssrc = ssrc
+    packet.payload = data[payload_start:payload_end]
+
+    return packet
+
+
+class RtpJitterBuffer:
+    """
+    Reorder buffer for the packets of one RTP stream. Packets are released in sequence order as soon as the next
+    expected packet is present. While a packet is missing, up to max_packets later packets are held for it to arrive;
+    once that many are held, the missing packets are counted as lost (and replaced with silence if conceal_loss is set)
+    so that the audio keeps moving. The first packet received starts the stream, so packets sent before it are late.
+    """
+    def __init__(self, max_packets: int = DEFAULT_JITTER_BUFFER_PACKETS, conceal_loss: bool = True):
+        """
+        :param max_packets: Packets held while waiting for a missing packet.
+        :param conceal_loss: If True, lost packets are replaced with silence of the same length, keeping the audio's
+                             timing intact.
+        """
+        self.max_packets = max_packets
+        self.conceal_loss = conceal_loss
+
+        self.packets = {}  # Packets waiting to be released, by sequence number.
+        self.released_sequence_numbers = collections.deque(maxlen=RELEASED_PACKETS_WINDOW)
+        self.next_sequence_number = None
+        self.highest_sequence_number = None
+        self.last_payload_length = 0
+        self.silence_byte = RTP_SILENCE_BYTES[RTP_PAYLOAD_TYPE_PCMU]
+
+        self.packets_received = 0
+        self.packets_lost = 0  # Packets never received before their turn was skipped.
+        self.packets_reordered = 0  # Packets received after a packet with a higher sequence number.
+        self.packets_late = 0  # Packets received after their turn was skipped (dropped).
+        self.packets_duplicate = 0  # Packets received more than once (dropped).
+
+    def add_packet(self, packet: RtpPacket) -> list:
+        """
+        Add a received packet to the buffer.
+        :param packet: RtpPacket of this stream.
+        :return: List of payloads (bytes) that are ready to be pushed, in order.
+        """
+        self.packets_received += 1
+        self.silence_byte = RTP_SILENCE_BYTES.get(packet.payload_type, self.silence_byte)
+
+        if self.next_sequence_number is None:
+            self.next_sequence_number = packet.sequence_number
+            self.highest_sequence_number = packet.sequence_number
+
+        # A packet that was already released is a duplicate rather than late, even though it is behind the stream.
+        if packet.sequence_number in self.packets or packet.sequence_number in self.released_sequence_numbers:
+            self.packets_duplicate += 1
+            return []
+
+        # Offsets are taken modulo 2^16, so that sequence numbers can wrap around.
+        if (packet.sequence_number - self.next_sequence_number) % SEQUENCE_NUMBER_MODULO >= SEQUENCE_NUMBER_MODULO // 2:
+            self.packets_late += 1
+            return []
+
+        highest_offset = (self.highest_sequence_number - packet.sequence_number) % SEQUENCE_NUMBER_MODULO
+        if 0 < highest_offset < SEQUENCE_NUMBER_MODULO // 2:
+            self.packets_reordered += 1
+        else:
+            self.highest_sequence_number = packet.sequence_number
+
+        self.packets[packet.sequence_number] = packet
+
+        return self.release_payloads()
+
+    def release_payloads(self, force: bool = False) -> list:
+        """
+        Release the payloads of the packets that are next in sequence.
+        :param force: If True, skip over missing packets to release every held packet (e.g. when the stream ends).
+        :return: List of payloads (bytes), in order.
+        """
+        payloads = []
+
+        while self.packets:
+            packet = self.packets.pop(self.next_sequence_number, None)
+            if packet:
+                payloads.append(packet.payload)
+                self.released_sequence_numbers.append(packet.sequence_number)
+                self.last_payload_length = len(packet.payload)
+                self.next_sequence_number = (self.next_sequence_number + 1) % SEQUENCE_NUMBER_MODULO
+                continue
+
+            if not force and len(self.packets) < self.max_packets:
+                break
+
+            # The next packet is lost: skip ahead to the earliest packet held.
+            lost_count = min((sequence_number - self.next_sequence_number) % SEQUENCE_NUMBER_MODULO
+                             for sequence_number in self.packets)
+            self.packets_lost += lost_count
+            self.next_sequence_number = (self.next_sequence_number + lost_count) % SEQUENCE_NUMBER_MODULO
+
+            if self.conceal_loss:
+                payload_length = self.last_payload_length or len(self.packets[self.next_sequence_number].payload)
+                payloads.append(self.silence_byte * (payload_length * lost_count))
+
+        return payloads
+
+    def reset(self) -> list:
+        """
+        Release every held packet and start over, such as when the sender starts a new stream (SSRC).
+        :return: List of payloads (bytes) that were held, in order.
+        """
+        payloads = self.release_payloads(force=True)
+        self.next_sequence_number = None
+        self.highest_sequence_number = None
+        self.released_sequence_numbers.clear()
+
+        return payloads
+
+    def get_stats(self) -> dict:
+        """
+        :return: Dictionary of the jitter buffer's counters.
+        """
+        return {
+            'packets_received': self.packets_received,
+            'packets_lost': self.packets_lost,
+            'packets_reordered': self.packets_reordered,
+            'packets_late': self.packets_late,
+            'packets_duplicate': self.packets_duplicate,
+        }
+
+
+class RtpAudioSource(UdpAudioSource):
+    """
+    Audio source receiving G.711 audio over RTP on a local UDP port. Payloads are released through an RtpJitterBuffer
+    and read by AudioHandler as they become ready, so audio_format should be the matching G.711 format (e.g.
+    AUDIO_FORMAT_ULAW_8KHZ for PCMU). Packets of other payload types (such as DTMF events) and invalid packets are
+    ignored. The audio ends once no packet arrives for end_timeout_s seconds.
+    """
+    def __init__(self, host: str, port: int, payload_types: tuple = (RTP_PAYLOAD_TYPE_PCMU, RTP_PAYLOAD_TYPE_PCMA),
+                 jitter_buffer_packets: int = DEFAULT_JITTER_BUFFER_PACKETS, conceal_loss: bool = True,
+                 max_buffered_datagrams: int = DEFAULT_UDP_MAX_DATAGRAMS,
+                 end_timeout_s: float = DEFAULT_UDP_END_TIMEOUT_S):
+        """
+        :param host: Local address to receive RTP on (e.g. '0.0.0.0').
+        :param port: Local port to receive RTP on.
+        :param payload_types: RTP payload types to accept.
+        :param jitter_buffer_packets: Packets held while waiting for a missing packet.
+        :param conceal_loss: If True, lost packets are replaced with silence of the same length.
+        :param max_buffered_datagrams: Payloads held for AudioHandler before the oldest is dropped.
+        :param end_timeout_s: Seconds without a packet after which the audio has ended.
+        """
+        super().__init__(host=host, port=port, max_buffered_datagrams=max_buffered_datagrams,
+                         end_timeout_s=end_timeout_s)
+
+        self.payload_types = payload_types
+        self.jitter_buffer = RtpJitterBuffer(max_packets=jitter_buffer_packets, conceal_loss=conceal_loss)
+        self.ssrc = None
+
+        self.packets_ignored = 0  # Invalid packets, or packets of other payload types.
+
+    def receive_datagram(self, data: bytes):
+        """
+        Pass a received RTP packet through the jitter buffer, queueing the payloads that are ready.
+        :param data: Datagram payload (b'' once the endpoint is closed).
+        """
+        if not data:
+            self.queue_payloads(self.jitter_buffer.reset())
+            super().receive_datagram(data)
+            return
+
+        packet = parse_rtp_packet(data)
+        if not packet or packet.payload_type not in self.payload_types:
+            self.packets_ignored += 1
+            return
+
+        # A new SSRC means the sender started a new stream, with its own sequence numbers.
+        if packet.ssrc != self.ssrc:
+            self.queue_payloads(self.jitter_buffer.reset())
+            self.ssrc = packet.ssrc
+
+        self.queue_payloads(self.jitter_buffer.add_packet(packet))
+
+    def queue_payloads(self, payloads: list):
+        """
+        :param payloads: Payloads (bytes) to queue for reading.
+        """
+        for payload in payloads:
+            if payload:
+                super().receive_datagram(payload)
+
+    def get_end_data(self) -> bytes:
+        """
+        Release any packets still held in the jitter buffer once packets have stopped arriving.
+        :return: Remaining audio data, or b'' to end the audio.
+        """
+        return b''.join(self.jitter_buffer.reset())
+
+    def get_stats(self) -> dict:
+        """
+        :return: Dictionary of the source's packet counters.
+        """
+        stats = self.jitter_buffer.get_stats()
+        stats['packets_ignored'] = self.packets_ignored
+        stats['payloads_dropped'] = self.dropped_datagrams
+
+        return stats
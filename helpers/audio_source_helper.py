@@ -0,0 +1,421 @@
+"""
+Audio Source Helper file
+This file contains audio sources that AudioHandler can push audio from as it is read, instead of from an audio file
+(see AudioHandler.audio_source). This allows live audio, such as a call arriving from a media server over a pipe or
+socket, to be streamed without writing it to disk first.
+
+Each source implements an async read(size) function returning up to `size` bytes of audio as soon as any are
+available, and b'' once the audio has ended. Buffering in each source is bounded: stream sources (pipes, stdin and TCP)
+stop reading from the sender while their buffer is full, and the UDP source drops its oldest datagrams.
+"""
+import abc
+import asyncio
+import os
+import stat
+
+DEFAULT_SOURCE_BUFFER_BYTES = 64 * 1024  # Bytes a stream source buffers before it stops reading from the sender.
+DEFAULT_UDP_MAX_DATAGRAMS = 500  # Datagrams the UDP source buffers before it drops the oldest.
+DEFAULT_UDP_END_TIMEOUT_S = 2.0  # Seconds without a datagram after which UDP audio is considered to have ended.
+
+
+class AudioSource(abc.ABC):
+    """
+    Base class for audio sources read by AudioHandler. Subclasses implement read().
+    """
+    # If True, all the audio is available up front (such as a regular file), so AudioHandler paces its pushes in real
+    # time. Otherwise, the source is live and its audio is pushed as it arrives.
+    paced: bool = False
+
+    bytes_read: int = 0  # Total bytes of audio returned by read().
+
+    @abc.abstractmethod
+    async def read(self, size: int) -> bytes:
+        """
+        :param size: Maximum number of bytes to return.
+        :return: Up to `size` bytes of audio, waiting until some are available, or b'' once the audio has ended.
+        """
+
+    async def read_all(self) -> bytes:
+        """
+        :return: All remaining audio from the source, once it has ended.
+        """
+        audio_chunks = []
+
+        audio_data = await self.read(DEFAULT_SOURCE_BUFFER_BYTES)
+        while audio_data:
+            audio_chunks.append(audio_data)
+            audio_data = await self.read(DEFAULT_SOURCE_BUFFER_BYTES)
+
+        return b''.join(audio_chunks)
+
+    def close(self):
+        """
+        Release any resources held by the source.
+        """
+        pass
+
+
+class FileAudioSource(AudioSource):
+    """
+    Audio source reading from a file path. Regular files are read in the event loop's default executor and paced in
+    real time. A FIFO (named pipe) is treated as live: it is opened in the executor, since opening blocks until a writer
+    sends audio, and is then read through the event loop (as PipeAudioSource does), so reads from it never hold up an
+    executor thread.
+    """
+    def __init__(self, audio_file_path: str, paced: bool = None, max_buffer_bytes: int = DEFAULT_SOURCE_BUFFER_BYTES):
+        """
+        :param audio_file_path: Path of the audio file or FIFO to read from.
+        :param paced: Whether AudioHandler should pace the pushes in real time. Defaults to True for regular files.
+        :param max_buffer_bytes: Bytes buffered from a FIFO before reading from it is paused.
+        """
+        if not os.path.exists(audio_file_path):
+            raise FileNotFoundError(audio_file_path + " not found")
+
+        self.audio_file_path = audio_file_path
+        self.is_fifo = stat.S_ISFIFO(os.stat(audio_file_path).st_mode)
+        self.max_buffer_bytes = max_buffer_bytes
+        self.audio_file = None  # Opened on the first read.
+        self.reader = None  # StreamReader of a FIFO, once opened.
+        self.transport = None
+        self.pending_future = None  # Open or read running in the executor, if any.
+        self.closed = False
+        self.paced = os.path.isfile(audio_file_path) if paced is None else paced
+        self.bytes_read = 0
+
+    async def read(self, size: int) -> bytes:
+        """
+        :param size: Maximum number of bytes to return.
+        :return: Up to `size` bytes of audio, or b'' once the end of the file is reached (or the source is closed).
+        """
+        loop = asyncio.get_running_loop()
+
+        if self.closed:
+            return b''
+
+        if not self.audio_file:
+            # Opening a FIFO blocks until a writer opens it too.
+            audio_file = await self.run_in_executor(open, self.audio_file_path, 'rb', 0)
+            if self.closed:
+                return b''
+
+            self.audio_file = audio_file
+            if self.is_fifo:
+                self.reader = asyncio.StreamReader(limit=self.max_buffer_bytes)
+                self.transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(self.reader),
+                                                                 self.audio_file)
+
+        if self.reader:
+            audio_data = await self.reader.read(size)
+        else:
+            audio_data = await self.run_in_executor(self.audio_file.read, size)
+            if self.closed:
+                return b''
+
+        self.bytes_read += len(audio_data)
+
+        return audio_data
+
+    async def run_in_executor(self, function, *args):
+        """
+        Run a blocking call in the event loop's default executor, keeping it in self.pending_future until it finishes.
+        The call is shielded, since cancelling the caller can't stop the executor thread; close() waits for it instead.
+        :param function: Function to call.
+        :param args: Arguments of the function.
+        :return: Value returned by the function.
+        """
+        self.pending_future = asyncio.get_running_loop().run_in_executor(None, function, *args)
+        try:
+            return await asyncio.shield(self.pending_future)
+        finally:
+            if self.pending_future and self.pending_future.done():
+                self.pending_future = None
+
+    def close(self):
+        """
+        Close the file. If an open or read is still running in the executor, the file is closed once it finishes
+        (an open waiting for a FIFO writer is released first).
+        """
+        self.closed = True
+
+        if self.transport:
+            # Closing the transport closes the FIFO as well.
+            self.transport.close()
+            self.transport = None
+            self.reader = None
+            self.audio_file = None
+
+        audio_file = self.audio_file
+        self.audio_file = None
+        pending_future = self.pending_future
+        self.pending_future = None
+
+        if pending_future and not pending_future.done():
+            if not audio_file:
+                self.release_fifo_open()
+            pending_future.add_done_callback(lambda future: self.close_pending_file(future, audio_file))
+        elif audio_file:
+            audio_file.close()
+
+    def release_fifo_open(self):
+        """
+        Release an open of the FIFO that is waiting for a writer, by briefly opening the FIFO for writing. The source
+        then reads the end of the audio.
+        """
+        if not self.is_fifo:
+            return
+
+        try:
+            os.close(os.open(self.audio_file_path, os.O_WRONLY | os.O_NONBLOCK))
+        except OSError:
+            # The open already finished, or the FIFO is gone.
+            pass
+
+    @staticmethod
+    def close_pending_file(pending_future: asyncio.Future, audio_file):
+        """
+        Close the file of an open or read that finished after the source was closed.
+        :param pending_future: Future of the open or read.
+        :param audio_file: File being read, or None if the future was opening it.
+        """
+        if not audio_file and not pending_future.cancelled() and not pending_future.exception():
+            audio_file = pending_future.result()
+
+        if audio_file:
+            audio_file.close()
+
+
+class StreamAudioSource(AudioSource):
+    """
+    Audio source reading from an asyncio.StreamReader, such as one given to an asyncio.start_server callback when a
+    media server connects to this client. The StreamReader's limit bounds how much audio is buffered.
+    """
+    def __init__(self, reader: asyncio.StreamReader = None, writer: asyncio.StreamWriter = None):
+        """
+        :param reader: StreamReader to read audio from.
+        :param writer: StreamWriter of the same connection, if any. It is closed along with the source.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.bytes_read = 0
+
+    async def open(self):
+        """
+        Create self.reader (and self.writer), for sources that connect on the first read.
+        """
+        pass
+
+    async def read(self, size: int) -> bytes:
+        """
+        :param size: Maximum number of bytes to return.
+        :return: Up to `size` bytes of audio, waiting until some are available, or b'' once the stream has ended.
+        """
+        if not self.reader:
+            await self.open()
+
+        audio_data = await self.reader.read(size)
+        self.bytes_read += len(audio_data)
+
+        return audio_data
+
+    def close(self):
+        """
+        Close the connection, if there is a writer for it.
+        """
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+
+class PipeAudioSource(StreamAudioSource):
+    """
+    Audio source reading from a pipe, such as sys.stdin.buffer or an opened FIFO, without blocking the event loop.
+    """
+    def __init__(self, pipe, max_buffer_bytes: int = DEFAULT_SOURCE_BUFFER_BYTES):
+        """
+        :param pipe: File object of the pipe to read from (e.g. sys.stdin.buffer).
+        :param max_buffer_bytes: Bytes buffered before reading from the pipe is paused.
+        """
+        super().__init__()
+        self.pipe = pipe
+        self.max_buffer_bytes = max_buffer_bytes
+        self.transport = None
+
+    async def open(self):
+        """
+        Connect the pipe to the event loop.
+        """
+        loop = asyncio.get_running_loop()
+
+        self.reader = asyncio.StreamReader(limit=self.max_buffer_bytes)
+        self.transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(self.reader), self.pipe)
+
+    def close(self):
+        """
+        Stop reading from the pipe.
+        """
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+
+class TcpAudioSource(StreamAudioSource):
+    """
+    Audio source that connects to a TCP server (such as a media server streaming a call) and reads audio from it.
+    """
+    def __init__(self, host: str, port: int, max_buffer_bytes: int = DEFAULT_SOURCE_BUFFER_BYTES):
+        """
+        :param host: Host of the server sending the audio.
+        :param port: Port of the server sending the audio.
+        :param max_buffer_bytes: Bytes buffered before reading from the socket is paused.
+        """
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.max_buffer_bytes = max_buffer_bytes
+
+    async def open(self):
+        """
+        Connect to the server.
+        """
+        self.reader, self.writer = await asyncio.open_connection(host=self.host, port=self.port,
+                                                                 limit=self.max_buffer_bytes)
+
+
+class UdpAudioProtocol(asyncio.DatagramProtocol):
+    """
+    Datagram protocol passing received datagrams to a UdpAudioSource.
+    """
+    def __init__(self, audio_source):
+        """
+        :param audio_source: UdpAudioSource to pass datagrams to.
+        """
+        self.audio_source = audio_source
+
+    def datagram_received(self, data, addr):
+        # Empty datagrams carry no audio, and b'' marks the end of the audio.
+        if data:
+            self.audio_source.receive_datagram(data)
+
+    def connection_lost(self, exc):
+        self.audio_source.receive_datagram(b'')
+
+
+class UdpAudioSource(AudioSource):
+    """
+    Audio source reading raw audio datagrams sent to a local UDP port. UDP cannot slow the sender down, so at most
+    max_buffered_datagrams are held; when full, the oldest datagram is dropped and counted in dropped_datagrams. The
+    audio is considered to have ended once no datagram arrives for end_timeout_s seconds.
+    """
+    def __init__(self, host: str, port: int, max_buffered_datagrams: int = DEFAULT_UDP_MAX_DATAGRAMS,
+                 end_timeout_s: float = DEFAULT_UDP_END_TIMEOUT_S):
+        """
+        :param host: Local address to receive datagrams on (e.g. '0.0.0.0').
+        :param port: Local port to receive datagrams on.
+        :param max_buffered_datagrams: Datagrams held before the oldest is dropped.
+        :param end_timeout_s: Seconds without a datagram after which the audio has ended.
+        """
+        self.host = host
+        self.port = port
+        self.end_timeout_s = end_timeout_s
+        self.bytes_read = 0
+        self.dropped_datagrams = 0
+
+        self.datagram_queue = asyncio.Queue(maxsize=max_buffered_datagrams)
+        self.remaining_data = b''  # Part of the last datagram not yet returned by read().
+        self.transport = None
+        self.ended = False
+
+    async def open(self):
+        """
+        Start receiving datagrams on the local port.
+        """
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(lambda: UdpAudioProtocol(self),
+                                                                local_addr=(self.host, self.port))
+
+    def receive_datagram(self, data: bytes):
+        """
+        Queue a received datagram, dropping the oldest queued datagram if the queue is full.
+        :param data: Datagram payload (b'' once the endpoint is closed).
+        """
+        if self.datagram_queue.full():
+            self.datagram_queue.get_nowait()
+            self.dropped_datagrams += 1
+
+        self.datagram_queue.put_nowait(data)
+
+    def get_end_data(self) -> bytes:
+        """
+        Called when no datagram has arrived for end_timeout_s seconds, to return any audio still held before the audio
+        ends (none for raw datagrams).
+        :return: Remaining audio data, or b'' to end the audio.
+        """
+        return b''
+
+    async def read(self, size: int) -> bytes:
+        """
+        :param size: Maximum number of bytes to return.
+        :return: Up to `size` bytes of audio, waiting until a datagram arrives, or b'' once the audio has ended.
+        """
+        if not self.transport and not self.ended:
+            await self.open()
+
+        if not self.remaining_data and not self.ended:
+            try:
+                self.remaining_data = await asyncio.wait_for(self.datagram_queue.get(), timeout=self.end_timeout_s)
+            except asyncio.TimeoutError:
+                self.remaining_data = self.get_end_data()
+
+            self.ended = not self.remaining_data
+
+        audio_data = self.remaining_data[:size]
+        self.remaining_data = self.remaining_data[size:]
+        self.bytes_read += len(audio_data)
+
+        return audio_data
+
+    def close(self):
+        """
+        Stop receiving datagrams.
+        """
+        self.ended = True
+
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+
+class AsyncIteratorAudioSource(AudioSource):
+    """
+    Audio source reading from any async iterator (or async generator) of audio bytes. The next item is only requested
+    once the previous one has been read, so the iterator is never read ahead of the pushes.
+    """
+    def __init__(self, audio_iterator, paced: bool = False):
+        """
+        :param audio_iterator: Async iterable yielding chunks of audio (bytes-like).
+        :param paced: Whether AudioHandler should pace the pushes in real time (if the iterator yields audio faster
+                      than real time).
+        """
+        self.audio_iterator = audio_iterator.__aiter__()
+        self.paced = paced
+        self.bytes_read = 0
+
+        self.remaining_data = b''  # Part of the last item not yet returned by read().
+        self.ended = False
+
+    async def read(self, size: int) -> bytes:
+        """
+        :param size: Maximum number of bytes to return.
+        :return: Up to `size` bytes of audio, or b'' once the iterator is exhausted.
+        """
+        while not self.remaining_data and not self.ended:
+            try:
+                self.remaining_data = bytes(await self.audio_iterator.__anext__())
+            except StopAsyncIteration:
+                self.ended = True
+
+        audio_data = self.remaining_data[:size]
+        self.remaining_data = self.remaining_data[size:]
+        self.bytes_read += len(audio_data)
+
+        return audio_data
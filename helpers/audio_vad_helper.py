@@ -0,0 +1,103 @@
+"""
+Audio VAD Helper file
+This file contains an energy-based voice activity detector, used to find where speech starts and ends in an audio file
+so that leading and trailing silence can be trimmed before the audio is pushed (see AudioHandler). Samples are decoded
+to LINEAR16 and the energy of each frame is computed with NumPy, a block of frames at a time.
+"""
+import numpy as np
+
+from helpers.audio_codec_helper import ALAW
+from helpers.audio_codec_helper import ALAW_TO_LINEAR16
+from helpers.audio_codec_helper import LINEAR16
+from helpers.audio_codec_helper import ULAW
+from helpers.audio_codec_helper import ULAW_TO_LINEAR16
+
+DEFAULT_VAD_FRAME_MS = 20  # Duration of each frame whose energy is measured.
+DEFAULT_SILENCE_THRESHOLD_DBFS = -40  # Frames quieter than this (relative to full scale) are treated as silence.
+DEFAULT_SILENCE_PADDING_MS = 200  # Silence kept before the first and after the last speech frame.
+
+VAD_BLOCK_FRAMES = 500  # Number of frames read and measured at a time, to bound memory use on long files.
+
+
+def decode_linear16_samples(audio_data, sample_format) -> np.ndarray:
+    """
+    :param audio_data: Audio data (bytes-like) in the given format.
+    :param sample_format: StandardAudioFormat value of audio_data (ULAW, ALAW or LINEAR16).
+    :return: LINEAR16 samples (int16 array).
+    """
+    if sample_format == ULAW:
+        return ULAW_TO_LINEAR16[np.frombuffer(audio_data, dtype=np.uint8)]
+    if sample_format == ALAW:
+        return ALAW_TO_LINEAR16[np.frombuffer(audio_data, dtype=np.uint8)]
+    if sample_format == LINEAR16:
+        return np.frombuffer(audio_data, dtype='<i2', count=len(audio_data) // 2)
+
+    raise ValueError("Silence detection is not supported for audio format " + str(sample_format) + ".")
+
+
+def frame_energies_dbfs(samples: np.ndarray, frame_samples: int) -> np.ndarray:
+    """
+    :param samples: LINEAR16 samples (all channels).
+    :param frame_samples: Number of samples per frame. A final partial frame is measured on its own.
+    :return: Energy of each frame, in dB relative to full scale.
+    """
+    frame_count = -(-len(samples) // frame_samples)
+    padded_samples = np.zeros(frame_count * frame_samples, dtype=np.float64)
+    padded_samples[:len(samples)] = samples
+
+    frame_sample_counts = np.full(frame_count, frame_samples)
+    if frame_count and len(samples) % frame_samples:
+        frame_sample_counts[-1] = len(samples) % frame_samples
+
+    frame_power = np.square(padded_samples).reshape(frame_count, frame_samples).sum(axis=1) / frame_sample_counts
+
+    return 10 * np.log10(frame_power / (32768.0 ** 2) + 1e-12)
+
+
+def find_speech_byte_range(audio_buffer, start_location: int, end_location: int, sample_format, sample_bytes: int,
+                           sample_rate: int, frame_ms: float = DEFAULT_VAD_FRAME_MS,
+                           silence_threshold_dbfs: float = DEFAULT_SILENCE_THRESHOLD_DBFS,
+                           padding_ms: float = DEFAULT_SILENCE_PADDING_MS) -> tuple:
+    """
+    Find the range of the audio that holds speech, with padding_ms of silence kept on either side.
+    :param audio_buffer: AudioBuffer to read the audio from. Its read location is not changed.
+    :param start_location: Byte offset of the first audio sample (e.g. after a WAV header).
+    :param end_location: Byte offset of the end of the audio samples.
+    :param sample_format: StandardAudioFormat value of the samples (ULAW, ALAW or LINEAR16).
+    :param sample_bytes: Bytes per sample frame (all channels).
+    :param sample_rate: Sample rate of the audio (Hz).
+    :param frame_ms: Duration of each frame whose energy is measured.
+    :param silence_threshold_dbfs: Frames quieter than this are treated as silence.
+    :param padding_ms: Silence kept before the first and after the last speech frame.
+    :return: Tuple of (start byte offset, end byte offset) to push. If no speech is found, the whole range is returned.
+    """
+    frame_bytes = max(int(sample_rate * frame_ms / 1000), 1) * sample_bytes
+    samples_per_frame = frame_bytes // (2 if sample_format == LINEAR16 else 1)
+
+    first_speech_frame = None
+    last_speech_frame = None
+
+    block_bytes = VAD_BLOCK_FRAMES * frame_bytes
+    for block_location in range(start_location, end_location, block_bytes):
+        audio_data = audio_buffer.read_audio(location=block_location,
+                                             size=min(block_bytes, end_location - block_location))
+        speech_frames = np.flatnonzero(frame_energies_dbfs(decode_linear16_samples(audio_data, sample_format),
+                                                           samples_per_frame) > silence_threshold_dbfs)
+        if not len(speech_frames):
+            continue
+
+        block_first_frame = (block_location - start_location) // frame_bytes
+        if first_speech_frame is None:
+            first_speech_frame = block_first_frame + speech_frames[0]
+        last_speech_frame = block_first_frame + speech_frames[-1]
+
+    if first_speech_frame is None:
+        return start_location, end_location
+
+    # Round the padding to whole sample frames, so that samples are never split.
+    padding_bytes = int(sample_rate * padding_ms / 1000) * sample_bytes
+
+    speech_start = max(start_location + int(first_speech_frame) * frame_bytes - padding_bytes, start_location)
+    speech_end = min(start_location + (int(last_speech_frame) + 1) * frame_bytes + padding_bytes, end_location)
+
+    return speech_start, speech_end
@@ -0,0 +1,180 @@
+"""
+Global Grammar Helper file
+This file contains a registry of grammars loaded globally (for the whole deployment) over a Global stream, so that
+interactions can reference a grammar by its label instead of sending the full grammar text to be compiled again in
+every InteractionCreateAsrRequest.
+"""
+import asyncio
+import hashlib
+
+# results.proto messages
+import lumenvox.api.results_pb2 as results_msg
+
+# Our custom helper functions.
+from helpers import grammar_helper
+
+DEFAULT_GLOBAL_GRAMMAR_LOAD_WAIT_S = 30  # Seconds to wait for the response to a grammar load.
+
+
+class GlobalGrammarRegistry:
+    """
+    Registry of globally loaded grammars. Each distinct grammar (by language and content) is loaded once, under a label
+    derived from its content, and referenced by that label afterwards. Since the label only depends on the grammar,
+    every process loading the same grammar into a deployment uses the same label.
+
+    If the server no longer has a grammar (for instance after it was restarted), interactions referencing the label fail
+    with an error final result naming the label; reload_missing_grammars loads such grammars again.
+    """
+    def __init__(self, lumenvox_api_client, deployment_uuid: str, operator_uuid: str = None,
+                 wait: float = DEFAULT_GLOBAL_GRAMMAR_LOAD_WAIT_S):
+        """
+        :param lumenvox_api_client: LumenVoxApiClient used to send the grammar loads.
+        :param deployment_uuid: Unique UUID of the deployment to load grammars into.
+        :param operator_uuid: Optional unique UUID can be used to track who is making API calls.
+        :param wait: Time (seconds) to wait for the response to each grammar load.
+        """
+        self.lumenvox_api_client = lumenvox_api_client
+        self.deployment_uuid = deployment_uuid
+        self.operator_uuid = operator_uuid
+        self.wait = wait
+
+        self.global_stream = None  # Opened on the first grammar load.
+        self.grammar_load_args = {}  # Map of grammar labels to the arguments of their loads (to reload them).
+        self.grammar_load_counts = {}  # Map of grammar labels to the number of times they have been loaded.
+        self.load_lock = asyncio.Lock()
+
+        self.grammars_loaded = 0
+        self.grammars_reloaded = 0
+
+    @staticmethod
+    def get_grammar_label(language: str, grammar_url: str = None, inline_grammar_text: str = None,
+                          grammar_settings=None) -> str:
+        """
+        :param language: Language of the grammar (e.g. 'en-US').
+        :param grammar_url: A grammar URL.
+        :param inline_grammar_text: A string containing the raw grammar text.
+        :param grammar_settings: Optional grammar settings (settings.proto GrammarSettings).
+        :return: Label identifying the grammar, derived from its language, content and settings.
+        """
+        grammar_hash = hashlib.sha256()
+        for value in (language.lower(), grammar_url or '', inline_grammar_text or ''):
+            grammar_hash.update(value.encode('utf-8'))
+            grammar_hash.update(b'\0')
+
+        # The same grammar loaded with different settings gets its own label.
+        if grammar_settings:
+            grammar_hash.update(grammar_settings.SerializeToString(deterministic=True))
+
+        return 'grammar_' + grammar_hash.hexdigest()[:32]
+
+    async def load_grammar(self, language: str, grammar_url: str = None, inline_grammar_text: str = None,
+                           grammar_settings=None, label: str = None):
+        """
+        Load the grammar globally, unless it has already been loaded.
+        :param language: Language of the grammar (e.g. 'en-US').
+        :param grammar_url: A grammar URL to be loaded.
+        :param inline_grammar_text: A string containing the raw grammar text.
+        :param grammar_settings: Optional grammar settings (settings.proto GrammarSettings).
+        :param label: Optional label assigned to the returned grammar message, used for error reporting.
+        :return: Grammar message (common.proto) referencing the loaded grammar by its global label.
+        """
+        if not grammar_url and not inline_grammar_text:
+            raise ValueError("A grammar URL or inline grammar text is required to load a global grammar.")
+
+        grammar_label = self.get_grammar_label(language=language, grammar_url=grammar_url,
+                                               inline_grammar_text=inline_grammar_text,
+                                               grammar_settings=grammar_settings)
+
+        if grammar_label not in self.grammar_load_counts:
+            self.grammar_load_args[grammar_label] = {
+                'language': language,
+                'grammar_url': grammar_url,
+                'inline_grammar_text': inline_grammar_text,
+                'grammar_settings': grammar_settings,
+            }
+            await self.send_grammar_load(grammar_label=grammar_label)
+
+        return grammar_helper.define_grammar(global_grammar_label=grammar_label, label=label)
+
+    async def load_grammar_file(self, language: str, grammar_reference: str, grammar_settings=None,
+                                label: str = None):
+        """
+        Load the contents of a grammar file globally, unless it has already been loaded.
+        :param language: Language of the grammar (e.g. 'en-US').
+        :param grammar_reference: File path reference to a grammar file (see grammar_helper.get_grammar_file_by_ref).
+        :param grammar_settings: Optional grammar settings (settings.proto GrammarSettings).
+        :param label: Optional label assigned to the returned grammar message, used for error reporting.
+        :return: Grammar message (common.proto) referencing the loaded grammar by its global label.
+        """
+        return await self.load_grammar(
+            language=language, inline_grammar_text=grammar_helper.get_grammar_file_by_ref(grammar_reference),
+            grammar_settings=grammar_settings, label=label)
+
+    async def send_grammar_load(self, grammar_label: str, reload: bool = False):
+        """
+        Send the GlobalLoadGrammarRequest of a registered grammar and wait for it to be loaded.
+        :param grammar_label: Label of the grammar, registered by load_grammar.
+        :param reload: If True, the grammar is loaded again even if it was loaded before.
+        """
+        load_count = self.grammar_load_counts.get(grammar_label, 0)
+
+        # Loads are serialized, so that concurrent callers of the same grammar wait for a single load (or reload).
+        async with self.load_lock:
+            if (load_count and not reload) or self.grammar_load_counts.get(grammar_label, 0) != load_count:
+                return
+
+            if not self.global_stream:
+                self.global_stream = await self.lumenvox_api_client.global_init()
+
+            response = await self.lumenvox_api_client.global_load_grammar(
+                global_stream=self.global_stream, deployment_uuid=self.deployment_uuid,
+                operator_uuid=self.operator_uuid, grammar_label=grammar_label, wait=self.wait,
+                **self.grammar_load_args[grammar_label])
+
+            if not response:
+                raise RuntimeError("No response received for the global load of grammar " + grammar_label + ".")
+
+            response_type = response.WhichOneof("response")
+            status = response.global_event.status_message if response_type == 'global_event' else \
+                response.global_grammar.status
+            if status.code:
+                raise Exception(status.code, status.message)
+
+            self.grammar_load_counts[grammar_label] = load_count + 1
+            if reload:
+                self.grammars_reloaded += 1
+            else:
+                self.grammars_loaded += 1
+
+    def get_missing_grammar_labels(self, final_result) -> list:
+        """
+        :param final_result: FinalResult message (results.proto) of an interaction.
+        :return: Labels of the registered grammars that the final result reports as missing (an error final result
+        naming the label).
+        """
+        if not final_result or final_result.final_result_status != results_msg.FINAL_RESULT_STATUS_ERROR:
+            return []
+
+        return [grammar_label for grammar_label in self.grammar_load_args
+                if grammar_label in final_result.status.message]
+
+    async def reload_missing_grammars(self, final_result) -> bool:
+        """
+        Reload any registered grammars that the final result of an interaction reports as missing.
+        :param final_result: FinalResult message (results.proto) of an interaction.
+        :return: True if any grammars were reloaded (so the interaction can be run again).
+        """
+        missing_grammar_labels = self.get_missing_grammar_labels(final_result)
+
+        for grammar_label in missing_grammar_labels:
+            await self.send_grammar_load(grammar_label=grammar_label, reload=True)
+
+        return bool(missing_grammar_labels)
+
+    async def close(self):
+        """
+        Close the global stream. Grammars that were loaded remain available to the deployment.
+        """
+        if self.global_stream:
+            await self.lumenvox_api_client.global_stream_close(self.global_stream)
+            self.global_stream = None
@@ -10,9 +10,27 @@ import os
 import lumenvox.api.common_pb2 as common_msg
 
 
+def get_session_grammar_key(language: str, grammar_url: str = None, inline_grammar_text: str = None,
+                            grammar_settings=None) -> tuple:
+    """
+    Build the key a grammar loaded on a session is tracked by (see LumenVoxApiClient.get_session_grammar_labels). The
+    same grammar loaded with a different language or different settings is a different session grammar.
+
+    :param language: Language of the grammar (e.g. 'en-US').
+    :param grammar_url: A grammar URL.
+    :param inline_grammar_text: A string containing the raw grammar text.
+    :param grammar_settings: Optional grammar settings (settings.proto GrammarSettings).
+    """
+    serialized_settings = grammar_settings.SerializeToString(deterministic=True) if grammar_settings else b''
+
+    return (language or '').lower(), grammar_url or inline_grammar_text, serialized_settings
+
+
 def define_grammar(grammar_url: str = None, inline_grammar_text: str = None, global_grammar_label: str = None,
                    session_grammar_label: str = None, builtin_voice_grammar: int = None,
-                   builtin_dtmf_grammar: int = None, label: str = None) -> common_msg.Grammar:
+                   builtin_dtmf_grammar: int = None, label: str = None,
+                   session_grammar_labels: dict = None, language: str = None,
+                   grammar_settings=None) -> common_msg.Grammar:
     """
     Build a grammar message (defined in common.proto).
     Returns grammar message.
@@ -24,8 +42,23 @@ def define_grammar(grammar_url: str = None, inline_grammar_text: str = None, glo
     :param builtin_voice_grammar: Reference to a "builtin" voice grammar.
     :param builtin_dtmf_grammar: Reference to a "builtin" DTMF grammar.
     :param label: Optional label assigned to grammar, used for error reporting.
+    :param session_grammar_labels: Optional map of the grammars already loaded on the session to their session
+    grammar labels (see LumenVoxApiClient.get_session_grammar_labels). If the grammar is loaded with the given language
+    and settings, the message references its session grammar label instead of carrying the grammar.
+    :param language: Language of the interaction, used to look the grammar up in session_grammar_labels.
+    :param grammar_settings: Grammar settings the grammar was loaded with, used to look the grammar up in
+    session_grammar_labels.
     """
 
+    # Reference a grammar already loaded on the session by its label, so it isn't sent and compiled again.
+    session_grammar_key = get_session_grammar_key(language=language, grammar_url=grammar_url,
+                                                  inline_grammar_text=inline_grammar_text,
+                                                  grammar_settings=grammar_settings)
+    if session_grammar_labels and session_grammar_key in session_grammar_labels:
+        session_grammar_label = session_grammar_labels[session_grammar_key]
+        grammar_url = None
+        inline_grammar_text = None
+
     grammar_msg = common_msg.Grammar()
 
     if grammar_url:
@@ -47,12 +80,16 @@ def define_grammar(grammar_url: str = None, inline_grammar_text: str = None, glo
     return grammar_msg
 
 
-def inline_grammar_by_file_ref(grammar_reference) -> common_msg.Grammar:
+def inline_grammar_by_file_ref(grammar_reference, session_grammar_labels: dict = None, language: str = None,
+                               grammar_settings=None) -> common_msg.Grammar:
     """
     Load text contents of grammar file into grammar message (common.proto) and return grammar message
+    If session_grammar_labels is given and the grammar is already loaded on the session with the given language and
+    settings, the message references its session grammar label instead (see define_grammar).
     """
-    return common_msg.Grammar(
-        inline_grammar_text=get_grammar_file_by_ref(grammar_reference=grammar_reference))
+    return define_grammar(inline_grammar_text=get_grammar_file_by_ref(grammar_reference=grammar_reference),
+                          session_grammar_labels=session_grammar_labels, language=language,
+                          grammar_settings=grammar_settings)
 
 
 def get_grammar_file_by_ref(grammar_reference) -> str:
@@ -28,6 +28,7 @@ import lumenvox.api.optional_values_pb2 as optional_values
 from lumenvox.api.lumenvox_pb2_grpc import LumenVoxStub
 
 from helpers import common_helper
+from helpers import grammar_helper
 
 # Import essential user connection data for gRPC/LumenVox API.
 from lumenvox_api_user_connection_data import LUMENVOX_API_SERVICE_CONNECTION
@@ -47,6 +48,132 @@ class StreamType(IntEnum):
     STREAM_TYPE_BATCH = 2
 
 
+class ChannelSelection(IntEnum):
+    """
+    Used to determine how the channel pool picks a channel for each new stream
+    """
+    CHANNEL_SELECTION_ROUND_ROBIN = 0
+    CHANNEL_SELECTION_LEAST_IN_FLIGHT = 1
+
+
+class ChannelPool:
+    """
+    Holds a fixed number of long-lived gRPC channels that session and global streams are spread across.
+    Channels are created on first use and then reused, so TCP setup (and with ENABLE_TLS, the TLS handshake and the
+    certificate read) happen once per channel instead of once per stream.
+    """
+    def __init__(self, pool_size: int = 4,
+                 channel_selection: int = ChannelSelection.CHANNEL_SELECTION_ROUND_ROBIN,
+                 max_message_mb: int = 4):
+        """
+        :param pool_size: Number of gRPC channels to keep open.
+        :param channel_selection: How to pick a channel for a new stream (see ChannelSelection).
+        :param max_message_mb: Maximum number of megabytes to allow for gRPC messages.
+        """
+        if pool_size < 1:
+            raise ValueError("ChannelPool: pool_size must be at least 1.")
+
+        self.pool_size = pool_size
+        self.channel_selection = channel_selection
+        self.max_message_mb = max_message_mb
+
+        self.channels = []  # gRPC (asyncio) channels.
+        self.stubs = []  # LumenVox stubs, one per channel.
+        self.stream_counts = []  # Number of open streams carried by each channel.
+        self.stream_channel_map = {}  # Map of streams to the index of the channel carrying them.
+        self.next_channel_index = 0
+        self.channel_loop = None  # Event loop the channels were created in.
+        self.credentials = None
+
+    async def init_channels(self):
+        """
+        Create the pool's channels. grpc.aio channels are bound to the event loop they are created in, so the pool is
+        rebuilt if it is used from a different loop than before, closing the channels of the previous loop first.
+        """
+        loop = asyncio.get_running_loop()
+        if self.channels and self.channel_loop is loop:
+            return
+
+        if self.channels:
+            await self.close_stale_channels()
+
+        if ENABLE_TLS and not self.credentials:
+            with open(CERT_FILE, 'rb') as f:
+                self.credentials = grpc.ssl_channel_credentials(root_certificates=f.read())
+
+        self.channels = [LumenVoxApiClient.get_grpc_channel_for_service(max_message_mb=self.max_message_mb,
+                                                                        is_async=True,
+                                                                        credentials=self.credentials)
+                         for _ in range(self.pool_size)]
+        self.stubs = [LumenVoxStub(channel=channel) for channel in self.channels]
+        self.stream_counts = [0] * self.pool_size
+        self.stream_channel_map = {}
+        self.next_channel_index = 0
+        self.channel_loop = loop
+
+    async def close_stale_channels(self):
+        """
+        Close the channels created in a previous event loop. A channel whose loop has already been closed cannot be
+        closed anymore, so it is only dropped.
+        """
+        for channel in self.channels:
+            try:
+                await channel.close(grace=None)
+            except RuntimeError:
+                pass
+
+        self.channels = []
+
+    async def acquire_channel(self) -> int:
+        """
+        Pick a channel for a new stream based on the channel selection mode.
+        :return: Index of the selected channel.
+        """
+        await self.init_channels()
+
+        if self.channel_selection == ChannelSelection.CHANNEL_SELECTION_LEAST_IN_FLIGHT:
+            return self.stream_counts.index(min(self.stream_counts))
+
+        channel_index = self.next_channel_index
+        self.next_channel_index = (self.next_channel_index + 1) % self.pool_size
+        return channel_index
+
+    def register_stream(self, stream, channel_index: int):
+        """
+        Record that the given stream is carried by the channel at channel_index.
+        """
+        self.stream_channel_map[stream] = channel_index
+        self.stream_counts[channel_index] += 1
+
+    def release_stream(self, stream):
+        """
+        Stop counting the given stream against its channel. Releasing a stream more than once has no effect.
+        """
+        channel_index = self.stream_channel_map.pop(stream, None)
+        if channel_index is not None:
+            self.stream_counts[channel_index] -= 1
+
+    def get_stream_counts(self) -> list:
+        """
+        :return: List containing the number of open streams carried by each channel.
+        """
+        return list(self.stream_counts)
+
+    async def close(self, grace: float = None):
+        """
+        Close every channel in the pool. The pool can be used again afterwards, and will create new channels.
+        :param grace: Optional time (seconds) to allow active RPCs to finish before they are cancelled.
+        """
+        for channel in self.channels:
+            await channel.close(grace=grace)
+
+        self.channels = []
+        self.stubs = []
+        self.stream_counts = []
+        self.stream_channel_map = {}
+        self.channel_loop = None
+
+
 class ResponseQueues:
     """
     Provides a set of queues to store SessionResponse messages in
@@ -70,7 +197,6 @@ class GlobalResponseQueues:
 
 class NotificationEvents:
     def __init__(self):
-        self.result_event = asyncio.Event()
         self.partial_result_event = asyncio.Event()
         self.audio_complete_event = asyncio.Event()
 
@@ -90,30 +216,55 @@ class LumenVoxApiClient:
     Sample code of each type of interaction is in its own file.
     """
 
-    session_stream_set = set()  # Store references to session streams.
-    global_stream_set = set()  # Store references to global streams.
-    queue_map = {}  # Map of session streams to queues.
-    event_map = {}  # Map of session streams to events.
-    session_id_map = {}  # Map of session streams to session IDs.
-    session_id_queue = None
-    stream_reader_task = None
-    global_reader_task = None
-    session_reader_task_cancel = asyncio.Event()
-    global_reader_task_cancel = asyncio.Event()
-    loop = None
+    def __init__(self, channel_pool_size: int = 4,
+                 channel_selection: int = ChannelSelection.CHANNEL_SELECTION_ROUND_ROBIN,
+                 leak_check: bool = False):
+        """
+        :param channel_pool_size: Number of long-lived gRPC channels to spread session and global streams across.
+        :param channel_selection: How streams are assigned to channels (see ChannelSelection).
+        :param leak_check: If True, report any streams that are still registered when run_user_coroutine finishes.
+        """
+        super().__init__()
 
-    response_handler_queue = None  # Queue of callback ResponseHandler objects.
+        # All stream bookkeeping belongs to this client instance. Entries for a session stream are removed when the
+        # session is closed (see release_session_stream).
+        self.session_stream_set = set()  # Store references to session streams.
+        self.global_stream_set = set()  # Store references to global streams.
+        self.queue_map = {}  # Map of session streams to queues.
+        self.event_map = {}  # Map of session streams to events.
+        self.session_id_map = {}  # Map of session streams to session IDs.
+        self.session_id_future_map = {}  # Map of session streams to futures resolved with the ID from SessionCreate.
+        self.final_result_future_map = {}  # Map of session streams to {interaction ID: future resolved with result}.
+        self.global_response_future_map = {}  # Map of global request correlation IDs to futures resolved with response.
+        self.session_response_future_map = {}  # Map of session request correlation IDs to futures of their responses.
+        self.session_grammar_label_map = {}  # Map of session streams to {grammar key: session grammar label}.
+        self.stream_write_lock_map = {}  # Map of session streams to locks that serialize writes.
+        self.session_reader_task_map = {}  # Map of session streams to the tasks reading their responses.
+        self.session_reader_exception_map = {}  # Map of session streams to the exceptions their reader tasks raised.
+        self.global_reader_task_map = {}  # Map of global streams to the tasks reading their responses.
+        self.stream_reader_task = None
+        self.global_reader_task = None
+        self.session_reader_task_cancel = asyncio.Event()
+        self.global_reader_task_cancel = asyncio.Event()
+        self.loop = None
 
-    def __init__(self):
-        super().__init__()
+        self.response_handler_queue = None  # Queue of callback ResponseHandler objects.
+
+        self.leak_check = leak_check
+        self.print_session_responses = False  # Set to True to print every response read from the session streams.
+        self.persistent_loop = False  # Set while the client is used as a context manager (see __enter__).
+
+        self.channel_pool = ChannelPool(pool_size=channel_pool_size, channel_selection=channel_selection)
 
     @staticmethod
-    def get_grpc_channel_for_service(max_message_mb=4, is_async=False):
+    def get_grpc_channel_for_service(max_message_mb=4, is_async=False, credentials=None):
         """
         Establish a gRPC channel. This process is required to obtain a stream with which the user can interact with the
         LumenVox API using the sample scripts provided in this project.
         :param max_message_mb: Maximum number of megabytes to allow for gRPC messages.
         :param is_async: Determines whether to use a gRPC channel for asyncio or not.
+        :param credentials: Optional channel credentials to reuse when ENABLE_TLS is set. If not provided, CERT_FILE is
+        read to create them.
         :return: gRPC channel.
         """
 
@@ -121,8 +272,9 @@ class LumenVoxApiClient:
 
         # Initialize and return the channel (using defined service endpoint)
         if ENABLE_TLS:
-            with open(CERT_FILE, 'rb') as f:
-                credentials = grpc.ssl_channel_credentials(root_certificates=f.read())
+            if not credentials:
+                with open(CERT_FILE, 'rb') as f:
+                    credentials = grpc.ssl_channel_credentials(root_certificates=f.read())
 
             return grpc.secure_channel(service_address_and_port,
                                        options=[
@@ -148,7 +300,7 @@ class LumenVoxApiClient:
 
     async def create_channel_and_init_stream(self, stream_type: int = StreamType.STREAM_TYPE_SESSION):
         """
-        Initializes gRPC channel and returns a newly created stream.
+        Picks a gRPC channel from the client's channel pool and returns a newly created stream.
         The LumenVox API utilizes a bidirectional stream to perform user interactions. The stream created in this
         function is used to carry out the tasks seen in the sample files.
 
@@ -158,11 +310,12 @@ class LumenVoxApiClient:
         :return: A gRPC stream for bidirectional API functionality.
         """
 
-        # A gRPC channel must first be established to reach the stub.
-        grpc_channel = self.get_grpc_channel_for_service(is_async=True)
+        # A gRPC channel must first be established to reach the stub. Channels are kept open in the pool and shared
+        # between streams.
+        channel_index = await self.channel_pool.acquire_channel()
         # Python files generated from the protocol buffer files (such lumenvox_pb2_grpc.py) have stub with which the
         # user can access the functions of the API.
-        stub = LumenVoxStub(channel=grpc_channel)
+        stub = self.channel_pool.stubs[channel_index]
 
         # Depending on the type of stream desired, the Session() RPC (see lumenvox.proto) is called to receive a stream,
         # which will facilitate bidirectional interactivity between the user and the API.
@@ -173,15 +326,104 @@ class LumenVoxApiClient:
         else:
             stream = stub.Session()
 
+        self.channel_pool.register_stream(stream, channel_index)
+
         return stream
 
+    def get_channel_stream_counts(self) -> list:
+        """
+        :return: List containing the number of open streams carried by each channel in the channel pool.
+        """
+        return self.channel_pool.get_stream_counts()
+
+    async def channel_pool_close(self, grace: float = None):
+        """
+        Close all gRPC channels held by the channel pool.
+        :param grace: Optional time (seconds) to allow active RPCs to finish before they are cancelled.
+        """
+        await self.channel_pool.close(grace=grace)
+
     def init_session_stream_maps(self, session_stream):
         self.queue_map[session_stream] = ResponseQueues()
         self.event_map[session_stream] = NotificationEvents()
+        self.stream_write_lock_map[session_stream] = asyncio.Lock()
+        self.session_grammar_label_map[session_stream] = {}
 
     def init_global_stream_maps(self, global_stream):
         self.queue_map[global_stream] = GlobalResponseQueues()
 
+    def release_session_stream(self, session_stream):
+        """
+        Remove every entry the client holds for the given session stream, so that closed sessions do not accumulate in
+        memory. Any task still waiting for the session ID or a final result of the stream is cancelled.
+        :param session_stream: Session stream to release.
+        """
+        reader_task = self.session_reader_task_map.pop(session_stream, None)
+        if reader_task:
+            reader_task.cancel()
+
+        session_id_future = self.session_id_future_map.pop(session_stream, None)
+        if session_id_future:
+            session_id_future.cancel()
+
+        for final_result_future in self.final_result_future_map.pop(session_stream, {}).values():
+            final_result_future.cancel()
+
+        self.queue_map.pop(session_stream, None)
+        self.event_map.pop(session_stream, None)
+        self.session_id_map.pop(session_stream, None)
+        self.stream_write_lock_map.pop(session_stream, None)
+        self.session_grammar_label_map.pop(session_stream, None)
+        self.session_reader_exception_map.pop(session_stream, None)
+        if self.session_stream_set:
+            self.session_stream_set.discard(session_stream)
+
+        self.channel_pool.release_stream(session_stream)
+
+    def release_global_stream(self, global_stream):
+        """
+        Remove every entry the client holds for the given global stream.
+        :param global_stream: Global stream to release.
+        """
+        reader_task = self.global_reader_task_map.pop(global_stream, None)
+        if reader_task:
+            reader_task.cancel()
+
+        self.queue_map.pop(global_stream, None)
+        if self.global_stream_set:
+            self.global_stream_set.discard(global_stream)
+
+        self.channel_pool.release_stream(global_stream)
+
+    def get_registered_streams(self) -> set:
+        """
+        :return: Set of all session and global streams the client still holds entries for.
+        """
+        registered_streams = set(self.queue_map)
+        for stream_map in (self.event_map, self.session_id_map, self.session_id_future_map,
+                           self.final_result_future_map, self.stream_write_lock_map, self.session_reader_task_map,
+                           self.session_grammar_label_map, self.session_reader_exception_map,
+                           self.global_reader_task_map):
+            registered_streams.update(stream_map)
+        registered_streams.update(self.session_stream_set or ())
+        registered_streams.update(self.global_stream_set or ())
+
+        return registered_streams
+
+    def report_leaked_streams(self) -> set:
+        """
+        Print any streams the client still holds entries for, e.g. sessions that were never closed.
+        :return: Set of the leaked streams.
+        """
+        leaked_streams = self.get_registered_streams()
+        for stream in leaked_streams:
+            print("Leak check: stream still registered, session ID:", self.session_id_map.get(stream))
+
+        if leaked_streams:
+            print("Leak check:", len(leaked_streams), "stream(s) still registered.")
+
+        return leaked_streams
+
     async def get_global_event_callback(self, global_stream, wait: int = 1):
         """
         Given global stream, attempt to receive a global_event response from the respective queue
@@ -191,80 +433,216 @@ class LumenVoxApiClient:
 
         return await self.get_from_queue(aio_queue=self.queue_map[global_stream].global_event_queue, wait=wait)
 
-    async def task_read_session_streams(self):
+    async def task_read_session_stream(self, session_stream):
         """
-        Iterates through set of session streams and process responses.
+        Reads responses from a single session stream until the stream ends, and dispatches them to the stream's queues.
+        One of these tasks runs for every session stream (see start_session_stream_reader), so a quiet stream never
+        holds up responses for other sessions.
+        :param session_stream: Session stream to read responses from.
         """
-        while not self.session_reader_task_cancel.is_set():
-            if self.session_stream_set is None:
-                return
-            for stream in self.session_stream_set:
-                # For each stream in the set, check for certain response types to put into their own queues.
-                if 'terminated' not in str(stream):  # Don't attempt to read if the stream's been terminated.
-                    r = await stream.read()
+        try:
+            while True:
+                r = await session_stream.read()
+                if r is grpc.aio.EOF:
+                    return
+
+                if self.print_session_responses:
                     print(r)
-                    if r:
-                        if r.session_id.value:
-                            self.session_id_queue.put_nowait(r.session_id.value)
-                            self.session_id_map[stream] = r.session_id.value
-                        response_type = r.WhichOneof("response_type")
-
-                        # handle notification responses
-                        if response_type == 'session_event':
-                            # if we receive a status_message with an error code, raise exception here to be handled
-                            # later
-                            if r.session_event.status_message.code:
-                                raise Exception(r.session_event.status_message.code,
-                                                r.session_event.status_message.message)
-
-                            self.queue_map[stream].session_event_queue.put_nowait(r.session_event)
-                        elif response_type == 'vad_event':
-                            self.queue_map[stream].vad_event_queue.put_nowait(r.vad_event)
-                        elif response_type == 'partial_result':
-                            # put partial result message into queue and set event
-                            print('>> task_read_session_streams: partial_result\n', r)
-                            self.queue_map[stream].partial_result_queue.put_nowait(r.partial_result)
-                            self.event_map[stream].partial_result_event.set()
-                        elif response_type == 'final_result':
-                            # put final result message into queue and set event
-                            print('>> task_read_session_streams: final_result received')
-                            self.queue_map[stream].result_queue.put_nowait(r.final_result)
-                            self.event_map[stream].result_event.set()
-                        else:
-                            self.queue_map[stream].general_response_queue.put_nowait(r)
-
-            await asyncio.sleep(0)
-        if self.session_reader_task_cancel.is_set():
+                if r:
+                    self.handle_session_response(session_stream=session_stream, r=r)
+        except Exception as reader_exception:
+            # Kept for this stream only, and raised to whoever waits on it (see get_from_session_queue).
+            self.session_reader_exception_map[session_stream] = reader_exception
+            raise
+        finally:
+            # However the reader ends (EOF, error or cancellation), the stream no longer counts against its channel.
+            self.channel_pool.release_stream(session_stream)
+
+    def handle_session_response(self, session_stream, r: session_msg.SessionResponse):
+        """
+        Check the response for certain response types and put it into the matching queue of the session stream.
+        :param session_stream: Session stream the response was read from.
+        :param r: SessionResponse message read from the stream.
+        """
+        if r.session_id.value:
+            self.session_id_map[session_stream] = r.session_id.value
+            # The first response carrying a session ID resolves the SessionCreate of this stream.
+            session_id_future = self.session_id_future_map.get(session_stream)
+            if session_id_future and not session_id_future.done():
+                session_id_future.set_result(r.session_id.value)
+
+        # A response to a request that is being waited on (see load_session_grammar) is passed to the waiter as is,
+        # including error events, instead of being queued.
+        session_response_future = self.session_response_future_map.pop(r.correlation_id.value, None)
+        if session_response_future:
+            if not session_response_future.done():
+                session_response_future.set_result(r)
             return
 
+        response_type = r.WhichOneof("response_type")
+
+        # handle notification responses
+        if response_type == 'session_event':
+            # if we receive a status_message with an error code, raise exception here to be handled
+            # later
+            if r.session_event.status_message.code:
+                raise Exception(r.session_event.status_message.code,
+                                r.session_event.status_message.message)
+
+            self.queue_map[session_stream].session_event_queue.put_nowait(r.session_event)
+        elif response_type == 'vad_event':
+            self.queue_map[session_stream].vad_event_queue.put_nowait(r.vad_event)
+        elif response_type == 'partial_result':
+            # put partial result message into queue and set event
+            if self.print_session_responses:
+                print('>> task_read_session_stream: partial_result\n', r)
+            self.queue_map[session_stream].partial_result_queue.put_nowait(r.partial_result)
+            self.event_map[session_stream].partial_result_event.set()
+        elif response_type == 'final_result':
+            # resolve the future of the interaction if anything is waiting for it; otherwise queue the final result,
+            # so that each result is delivered exactly once (a later waiter claims it from the queue)
+            if self.print_session_responses:
+                print('>> task_read_session_stream: final_result received')
+            final_result_future = \
+                self.final_result_future_map.get(session_stream, {}).get(r.final_result.interaction_id)
+            if not final_result_future:
+                self.queue_map[session_stream].result_queue.put_nowait(r.final_result)
+            elif not final_result_future.done():
+                final_result_future.set_result(r.final_result)
+        else:
+            self.queue_map[session_stream].general_response_queue.put_nowait(r)
+
+    def start_session_stream_reader(self, session_stream):
+        """
+        Create the task that reads responses from the given session stream.
+        :param session_stream: Session stream to start reading from.
+        """
+        reader_task = asyncio.get_running_loop().create_task(self.task_read_session_stream(session_stream))
+        reader_task.add_done_callback(lambda task: self.session_stream_reader_done(reader_task=task,
+                                                                                   session_stream=session_stream))
+        self.session_reader_task_map[session_stream] = reader_task
+
+    def session_stream_reader_done(self, reader_task: asyncio.Task, session_stream):
+        """
+        Callback for finished session stream reader tasks. However the reader ended (EOF, error or cancellation),
+        nothing can resolve the stream's pending futures anymore, so a session_init still waiting for the session ID and
+        any waits for final results of the stream are failed, instead of waiting forever.
+        A failed reader (such as on an error session_event) only fails the futures of its own stream; other sessions
+        keep running.
+        :param reader_task: Reader task that finished.
+        :param session_stream: Session stream the task was reading from.
+        """
+        reader_exception = None if reader_task.cancelled() else reader_task.exception()
+
+        session_id_future = self.session_id_future_map.get(session_stream)
+        if session_id_future and not session_id_future.done():
+            session_id_future.set_exception(
+                reader_exception or RuntimeError("Session stream closed before a session ID was received."))
+
+        for final_result_future in self.final_result_future_map.get(session_stream, {}).values():
+            if not final_result_future.done():
+                final_result_future.set_exception(
+                    reader_exception or RuntimeError("Session stream closed before the final result was received."))
+
+    async def stop_session_stream_reader(self, session_stream):
+        """
+        Cancel the task reading from the given session stream and wait for it to finish.
+        :param session_stream: Session stream to stop reading from.
+        """
+        reader_task = self.session_reader_task_map.pop(session_stream, None)
+        if not reader_task:
+            return
+
+        reader_task.cancel()
+        await asyncio.gather(reader_task, return_exceptions=True)
+
+    async def task_read_session_streams(self):
+        """
+        Waits until the session reader tasks are cancelled (see kill_stream_reader_tasks), then stops the reader tasks
+        of any session streams that are still open.
+        """
+        await self.session_reader_task_cancel.wait()
+
+        for session_stream in list(self.session_reader_task_map):
+            await self.stop_session_stream_reader(session_stream)
+
     async def task_read_global_streams(self):
         """
-        Iterates through set of global streams and process responses.
-        """
-        while not self.global_reader_task_cancel.is_set():
-            if self.global_stream_set is None:
-                return
-            for stream in self.global_stream_set:
-                # For each stream in the set, check for certain response types to put into their own queues.
-                if 'terminated' not in str(stream):  # Don't attempt to read if the stream's been terminated.
-                    r = await stream.read()
-                    if r:
-                        response_type = r.WhichOneof("response")
-
-                        if response_type == 'global_event':
-                            if r.global_event.status_message.code:
-                                raise Exception(r.global_event.status_message.code,
-                                                r.global_event.status_message.message)
-
-                            self.queue_map[stream].global_event_queue.put_nowait(r.global_event)
-                        elif response_type == 'global_settings':
-                            self.queue_map[stream].global_settings_queue.put_nowait(r.global_settings)
-                        else:
-                            pass
-            await asyncio.sleep(0)
-        if self.global_reader_task_cancel.is_set():
+        Waits until the global reader tasks are cancelled (see kill_stream_reader_tasks), then stops the reader tasks
+        of any global streams that are still open.
+        """
+        await self.global_reader_task_cancel.wait()
+
+        for global_stream in list(self.global_reader_task_map):
+            await self.stop_global_stream_reader(global_stream)
+
+    async def task_read_global_stream(self, global_stream):
+        """
+        Reads responses from a single global stream until the stream ends, and dispatches them to their waiters or the
+        stream's queues. One of these tasks runs for every global stream (see start_global_stream_reader), so a quiet
+        stream never holds up the others, and shutting down never waits on a pending read.
+        :param global_stream: Global stream to read responses from.
+        """
+        try:
+            while True:
+                r = await global_stream.read()
+                if r is grpc.aio.EOF:
+                    return
+
+                if r:
+                    self.handle_global_response(global_stream=global_stream, r=r)
+        finally:
+            # However the reader ends (EOF, error or cancellation), the stream no longer counts against its channel.
+            self.channel_pool.release_stream(global_stream)
+
+    def handle_global_response(self, global_stream, r: global_msg.GlobalResponse):
+        """
+        Dispatch a response read from a global stream.
+        :param global_stream: Global stream the response was read from.
+        :param r: Response read from the stream.
+        """
+        # A response to a request that is being waited on (see global_load_grammar) is passed to the waiter as is,
+        # including error events, instead of being queued.
+        global_response_future = self.global_response_future_map.pop(r.correlation_id.value, None)
+        if global_response_future:
+            if not global_response_future.done():
+                global_response_future.set_result(r)
             return
 
+        response_type = r.WhichOneof("response")
+
+        if response_type == 'global_event':
+            if r.global_event.status_message.code:
+                raise Exception(r.global_event.status_message.code,
+                                r.global_event.status_message.message)
+
+            self.queue_map[global_stream].global_event_queue.put_nowait(r.global_event)
+        elif response_type == 'global_settings':
+            self.queue_map[global_stream].global_settings_queue.put_nowait(r.global_settings)
+
+    def start_global_stream_reader(self, global_stream):
+        """
+        Create the task that reads responses from the given global stream.
+        :param global_stream: Global stream to start reading from.
+        """
+        reader_task = asyncio.get_running_loop().create_task(self.task_read_global_stream(global_stream))
+        # A failed reader only affects its own stream: the error is raised to requests waiting on the stream (see
+        # global_load_grammar). Retrieve it here so that it is not reported as never retrieved.
+        reader_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        self.global_reader_task_map[global_stream] = reader_task
+
+    async def stop_global_stream_reader(self, global_stream):
+        """
+        Cancel the reader task of the given global stream, and wait for it to finish.
+        :param global_stream: Global stream to stop reading from.
+        """
+        reader_task = self.global_reader_task_map.pop(global_stream, None)
+        if not reader_task:
+            return
+
+        reader_task.cancel()
+        await asyncio.gather(reader_task, return_exceptions=True)
+
     @staticmethod
     def empty_queue(q: asyncio.Queue):
         for _ in range(q.qsize()):
@@ -303,7 +681,6 @@ class LumenVoxApiClient:
         self.empty_all_stream_queues()
         self.empty_global_queues()
 
-        self.empty_queue(self.session_id_queue)
         self.empty_queue(self.response_handler_queue)
 
     @staticmethod
@@ -328,6 +705,31 @@ class LumenVoxApiClient:
         except asyncio.QueueEmpty:
             return None
 
+    async def get_from_session_queue(self, session_stream, aio_queue: asyncio.Queue, wait: int):
+        """
+        Retrieves an item from a queue of the given session stream. If the stream's reader task failed, its exception is
+        raised once the queue is empty, instead of waiting for a response that can no longer arrive.
+        """
+        reader_task = self.session_reader_task_map.get(session_stream)
+
+        if aio_queue.empty() and session_stream in self.session_reader_exception_map:
+            raise self.session_reader_exception_map[session_stream]
+
+        if not wait or not reader_task or reader_task.done():
+            return await self.get_from_queue(aio_queue=aio_queue, wait=wait)
+
+        # Wait for whichever comes first: the next item, or the end of the stream's reader.
+        get_task = asyncio.ensure_future(aio_queue.get())
+        await asyncio.wait({get_task, reader_task}, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+        if get_task.done():
+            return get_task.result()
+
+        get_task.cancel()
+        if session_stream in self.session_reader_exception_map:
+            raise self.session_reader_exception_map[session_stream]
+
+        return None
+
     async def get_session_general_response(self, session_stream, wait: int = 3):
         """
         Given session stream, attempt to receive a general (non-notification) response from the respective queue.
@@ -335,7 +737,9 @@ class LumenVoxApiClient:
         if session_stream not in self.queue_map:
             return None
 
-        return await self.get_from_queue(aio_queue=self.queue_map[session_stream].general_response_queue, wait=wait)
+        return await self.get_from_session_queue(session_stream=session_stream,
+                                                 aio_queue=self.queue_map[session_stream].general_response_queue,
+                                                 wait=wait)
 
     async def get_session_partial_result(self, session_stream, wait: int = 3):
         """
@@ -344,7 +748,9 @@ class LumenVoxApiClient:
         if session_stream not in self.queue_map:
             return None
 
-        return await self.get_from_queue(aio_queue=self.queue_map[session_stream].partial_result_queue, wait=wait)
+        return await self.get_from_session_queue(session_stream=session_stream,
+                                                 aio_queue=self.queue_map[session_stream].partial_result_queue,
+                                                 wait=wait)
 
     async def get_session_final_result(self, session_stream, wait: int = 3):
         """
@@ -353,7 +759,101 @@ class LumenVoxApiClient:
         if session_stream not in self.queue_map:
             return None
 
-        return await self.get_from_queue(aio_queue=self.queue_map[session_stream].result_queue, wait=wait)
+        return await self.get_from_session_queue(session_stream=session_stream,
+                                                 aio_queue=self.queue_map[session_stream].result_queue, wait=wait)
+
+    def get_final_result_future(self, session_stream, interaction_id: str) -> asyncio.Future:
+        """
+        Return the future that is resolved with the final result of the given interaction, creating it if needed.
+        Once the future is registered, the reader task resolves it instead of queueing the result. A result that arrived
+        before the future was registered is claimed from the result queue, so it is not lost.
+        :param session_stream: Stream of the session the interaction belongs to.
+        :param interaction_id: ID of the interaction.
+        """
+        interaction_future_map = self.final_result_future_map.get(session_stream, {})
+        if interaction_id in interaction_future_map:
+            return interaction_future_map[interaction_id]
+
+        final_result_future = asyncio.get_running_loop().create_future()
+        final_result = None
+        if session_stream in self.queue_map:
+            final_result = self.take_queued_final_result(session_stream=session_stream, interaction_id=interaction_id)
+
+        reader_task = self.session_reader_task_map.get(session_stream)
+        if final_result:
+            final_result_future.set_result(final_result)
+        elif session_stream not in self.queue_map or (reader_task and reader_task.done()):
+            # Released streams, or streams whose reader has ended, can never resolve the future; don't register it.
+            final_result_future.set_exception(
+                RuntimeError("Session stream closed before the final result was received."))
+            return final_result_future
+
+        self.final_result_future_map.setdefault(session_stream, {})[interaction_id] = final_result_future
+
+        return final_result_future
+
+    def take_queued_final_result(self, session_stream, interaction_id: str):
+        """
+        Remove the final result of the given interaction from the result queue of the session stream, leaving any other
+        queued results in order.
+        :param session_stream: Stream of the session the interaction belongs to.
+        :param interaction_id: ID of the interaction.
+        :return: FinalResult message. None if not queued.
+        """
+        result_queue = self.queue_map[session_stream].result_queue
+        final_result = None
+        for _ in range(result_queue.qsize()):
+            queued_result = result_queue.get_nowait()
+            if final_result is None and queued_result.interaction_id == interaction_id:
+                final_result = queued_result
+            else:
+                result_queue.put_nowait(queued_result)
+
+        return final_result
+
+    async def wait_for_final_result(self, session_stream, interaction_id: str, timeout: float = None):
+        """
+        Wait for the final result of the given interaction. Returns as soon as the reader task receives it.
+        Cancelling the caller does not discard the result; use cancel_final_result to stop every waiter. If the session
+        stream ends (or its reader fails) before the result is received, the reader's exception (or a RuntimeError) is
+        raised.
+        :param session_stream: Stream of the session the interaction belongs to.
+        :param interaction_id: ID of the interaction to wait for.
+        :param timeout: Maximum time (seconds) to wait. Waits indefinitely if None.
+        :return: FinalResult message. None if not received within the timeout.
+        """
+        final_result_future = self.get_final_result_future(session_stream=session_stream,
+                                                           interaction_id=interaction_id)
+        try:
+            # Shield the future so that a timeout (or cancelled caller) leaves it available to other waiters.
+            return await asyncio.wait_for(asyncio.shield(final_result_future), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def cancel_final_result(self, session_stream, interaction_id: str):
+        """
+        Cancel the wait for the final result of the given interaction. Anything awaiting wait_for_final_result for the
+        interaction receives asyncio.CancelledError.
+        :param session_stream: Stream of the session the interaction belongs to.
+        :param interaction_id: ID of the interaction.
+        """
+        final_result_future = self.final_result_future_map.get(session_stream, {}).get(interaction_id)
+        if final_result_future:
+            final_result_future.cancel()
+
+    def cancel_audio_push_on_final_result(self, session_stream, interaction_id: str,
+                                          audio_push_cancel_event: asyncio.Event):
+        """
+        Set audio_push_cancel_event as soon as the final result of the given interaction is received (or its wait is
+        cancelled), so that an AudioHandler pushing audio for the interaction stops instead of streaming audio that is
+        no longer needed, such as the rest of a call once AMD or CPA has reached a decision.
+        :param session_stream: Stream of the session the interaction belongs to.
+        :param interaction_id: ID of the interaction.
+        :param audio_push_cancel_event: Event to set (see AudioHandler.audio_push_cancel_event).
+        """
+        final_result_future = self.get_final_result_future(session_stream=session_stream,
+                                                           interaction_id=interaction_id)
+        final_result_future.add_done_callback(lambda future: audio_push_cancel_event.set())
 
     async def set_session_stream_for_reader_task(self, session_stream):
         """
@@ -374,17 +874,15 @@ class LumenVoxApiClient:
         self.session_stream_set = None
         self.global_stream_set = None
 
-    def run_user_coroutine(self, user_coroutine) -> tuple:
+    def init_event_loop_and_reader_tasks(self):
         """
-        The Lumenvox gRPC API works with asynchronous messages in both directions.
-        This function sets up the required event loop and message queues to support bidirectional functionality.
-        The user supplied coroutine is the "task" to perform interactions with the LumenVox API.
-        
-        :param user_coroutine: The async-defined coroutine to run as the main task
-        :return: Tuple of return values from tasks run in self.loop.run_until_complete.
+        Create a new event loop, reset the stream sets and maps, and create the stream reader tasks.
         """
         self.session_stream_set = set()
         self.global_stream_set = set()
+        self.session_reader_task_map = {}
+        self.session_reader_exception_map = {}
+        self.global_reader_task_map = {}
 
         # Set event loop policy on Windows
         if os.name == 'nt':
@@ -394,7 +892,12 @@ class LumenVoxApiClient:
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
 
-        self.session_id_queue = asyncio.Queue()
+        self.session_id_future_map = {}
+        self.final_result_future_map = {}
+        self.global_response_future_map = {}
+        self.session_response_future_map = {}
+        self.session_grammar_label_map = {}
+        self.stream_write_lock_map = {}
         self.response_handler_queue = asyncio.Queue()
 
         # Initialize events that can be used to cancel the stream reader tasks.
@@ -402,21 +905,98 @@ class LumenVoxApiClient:
         self.session_reader_task_cancel = asyncio.Event()
         self.global_reader_task_cancel = asyncio.Event()
 
-        # Create reader tasks for both Session and Global streams.
+        # Create reader tasks for both Session and Global streams. Each session and global stream gets its own reader
+        # task once it is initialized (see session_init and global_init); the tasks created here tear them down when
+        # cancelled.
         self.stream_reader_task = self.loop.create_task(self.task_read_session_streams())
         self.global_reader_task = self.loop.create_task(self.task_read_global_streams())
 
+    def run_user_coroutine(self, user_coroutine) -> tuple:
+        """
+        The Lumenvox gRPC API works with asynchronous messages in both directions.
+        This function sets up the required event loop and message queues to support bidirectional functionality.
+        The user supplied coroutine is the "task" to perform interactions with the LumenVox API.
+
+        If the client is being used as a context manager (persistent loop mode), the coroutine is run on the client's
+        long-lived event loop instead, reusing its reader tasks and channel pool.
+
+        :param user_coroutine: The async-defined coroutine to run as the main task
+        :return: Tuple of return values from tasks run in self.loop.run_until_complete.
+        """
+        if self.persistent_loop:
+            return self.run_user_coroutine_on_persistent_loop(user_coroutine=user_coroutine)
+
+        self.init_event_loop_and_reader_tasks()
+
         # The task the user provides will be the 'main' task.
         main_task = self.loop.create_task(user_coroutine)
         # The main task and the reader tasks are collected to run all at once.
         tasks = asyncio.gather(main_task, self.stream_reader_task, self.global_reader_task)
 
-        # Tasks collected into asyncio.gather and run in the loop will return their respective values inside a tuple.
-        task_return_values: tuple = self.loop.run_until_complete(tasks)
+        try:
+            # Tasks collected into asyncio.gather and run in the loop will return their respective values inside a
+            # tuple.
+            task_return_values: tuple = self.loop.run_until_complete(tasks)
+        finally:
+            # The channels are bound to this loop, and the next call creates a new one, so close them while this loop
+            # can still run their shutdown.
+            self.loop.run_until_complete(self.channel_pool_close())
+
+        if self.leak_check:
+            self.report_leaked_streams()
+
         return task_return_values
 
-    @staticmethod
-    async def session_stream_write(session_stream, correlation_id: str = None,
+    def __enter__(self):
+        """
+        Persistent loop mode: the client owns one event loop, one set of reader tasks and one channel pool until the
+        with-block exits, and run_user_coroutine can be called repeatedly without restarting any of them.
+        """
+        self.init_event_loop_and_reader_tasks()
+        self.persistent_loop = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Stop the reader tasks, close the channel pool and close the event loop owned by the client.
+        """
+        self.persistent_loop = False
+        self.kill_stream_reader_tasks()
+
+        self.loop.run_until_complete(
+            asyncio.gather(self.stream_reader_task, self.global_reader_task, return_exceptions=True))
+        self.loop.run_until_complete(self.channel_pool_close())
+
+        if self.leak_check:
+            self.report_leaked_streams()
+
+        # Cancel anything user coroutines left running (e.g. audio push tasks) before closing the loop.
+        remaining_tasks = asyncio.all_tasks(self.loop)
+        for task in remaining_tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*remaining_tasks, return_exceptions=True))
+
+        self.loop.close()
+        self.loop = None
+
+    def run_user_coroutine_on_persistent_loop(self, user_coroutine) -> tuple:
+        """
+        Run the user coroutine on the client's long-lived event loop (see __enter__).
+        A failed session stream reader only affects its own session: the error is raised to the coroutine when it waits
+        on that session (see session_stream_reader_done), so other coroutines sharing the loop keep running.
+        :param user_coroutine: The async-defined coroutine to run as the main task
+        :return: Tuple containing the return value of the coroutine.
+        """
+        main_task = self.loop.create_task(user_coroutine)
+        try:
+            self.loop.run_until_complete(main_task)
+        finally:
+            if self.leak_check:
+                self.report_leaked_streams()
+
+        return (main_task.result(),)
+
+    async def session_stream_write(self, session_stream, correlation_id: str = None,
                                    session_request_msg: session_msg.SessionRequestMessage = None,
                                    audio_request_msg: common_msg.AudioRequestMessage = None,
                                    interaction_request_msg: interaction_msg.InteractionRequestMessage = None,
@@ -425,7 +1005,9 @@ class LumenVoxApiClient:
         Takes a stream, correlation ID and one of the 'oneof' request types: SessionRequestMessage (NOT
         SessionRequest), AudioRequestMessage, InteractionRequestMessage, DtmfPushRequest to construct a SessionRequest
         with.
-        Sends the SessionRequest message to the stream
+        Sends the SessionRequest message to the stream. Writes to the same stream are serialized, since a gRPC stream
+        does not allow a new write to start while another is still in progress (e.g. an audio push task running
+        alongside the main task).
         """
 
         # provided random correlation ID if a string for it is not provided.
@@ -446,7 +1028,14 @@ class LumenVoxApiClient:
             session_request = \
                 session_msg.SessionRequest(correlation_id=correlation_id, dtmf_request=dtmf_push_req)
 
-        await session_stream.write(session_request)
+        stream_write_lock = self.stream_write_lock_map.get(session_stream)
+        if not stream_write_lock:
+            # The stream has been released (or was never initialized), so there is nothing to serialize against.
+            await session_stream.write(session_request)
+            return
+
+        async with stream_write_lock:
+            await session_stream.write(session_request)
 
     @staticmethod
     async def global_stream_write(global_stream,
@@ -544,13 +1133,13 @@ class LumenVoxApiClient:
                                         session_request_msg=session_request_msg,
                                         correlation_id=correlation_uuid)
 
-        await asyncio.sleep(0.1)
-
-    async def session_close(self, session_stream, correlation_id: str = None):
+    async def session_close(self, session_stream, correlation_id: str = None, release_stream: bool = True):
         """
         Close Session given a stream.
         :param correlation_id: Optional UUID that can be used to track requests.
         :param session_stream: A previously created stream to and from which we write and read messages.
+        :param release_stream: If True, the client's entries for the stream are removed once the request is sent (see
+        release_session_stream). Set to False to keep reading responses from the stream.
         """
 
         # Message setup.
@@ -562,6 +1151,9 @@ class LumenVoxApiClient:
                                         session_request_msg=session_request_msg,
                                         correlation_id=correlation_id)
 
+        if release_stream:
+            self.release_session_stream(session_stream)
+
     async def session_set_inbound_audio_format(self, session_stream, correlation_id: str = None,
                                                audio_format_msg = None):
         """
@@ -582,14 +1174,48 @@ class LumenVoxApiClient:
                                         session_request_msg=session_request_msg,
                                         correlation_id=correlation_id)
 
+    async def session_load_grammar(self, session_stream, language: str, grammar_label: str, grammar_url: str = None,
+                                   inline_grammar_text: str = None,
+                                   grammar_settings: settings_msg.GrammarSettings = None, correlation_id: str = None):
+        """
+        Load a grammar for the session, so that interactions within the session can reference it by label (see
+        common.proto Grammar.session_grammar_label) instead of sending and compiling the grammar each time.
+        See load_session_grammar to also wait for the response and track the label.
+        :param session_stream: Stream of the session to load the grammar into.
+        :param language: Language of the grammar (e.g. 'en-US').
+        :param grammar_label: Label to reference the grammar by. Must consist of letters, digits, hyphens and
+        underscores only.
+        :param grammar_url: A grammar URL to be loaded.
+        :param inline_grammar_text: A string containing the raw grammar text.
+        :param grammar_settings: Optional grammar settings.
+        :param correlation_id: Optional UUID that can be used to track requests.
+        """
+        session_load_grammar_request = session_msg.SessionLoadGrammarRequest(language=language,
+                                                                             grammar_label=grammar_label,
+                                                                             grammar_settings=grammar_settings)
+        if grammar_url:
+            session_load_grammar_request.grammar_url = grammar_url
+        else:
+            session_load_grammar_request.inline_grammar_text = inline_grammar_text
+
+        session_request_msg = session_msg.SessionRequestMessage(session_load_grammar=session_load_grammar_request)
+
+        await self.session_stream_write(session_stream=session_stream,
+                                        session_request_msg=session_request_msg,
+                                        correlation_id=correlation_id)
+
     async def session_audio_push(self, session_stream, correlation_id: str = None, audio_data: bytes = None):
         """
         Wrapping over AudioPushRequest (common.proto).
         Takes audio_data as bytes and sends the data within a protobuf message over gRPC.
         :param session_stream: Stream of the session to send an AudioPush request to.
-        :param audio_data: Bytes of audio data to send into the API with AudioPush.
+        :param audio_data: Bytes of audio data (or a bytes-like object such as a memoryview slice from an AudioBuffer)
+        to send into the API with AudioPush.
         :param correlation_id: Optional UUID that can be used to track requests.
         """
+        # Protobuf bytes fields only accept bytes, so views are copied here, once, as the message is built.
+        if audio_data is not None and not isinstance(audio_data, bytes):
+            audio_data = bytes(audio_data)
 
         audio_push_request = common_msg.AudioPushRequest(audio_data=audio_data)
         audio_request_msg = common_msg.AudioRequestMessage(audio_push=audio_push_request)
@@ -974,14 +1600,16 @@ class LumenVoxApiClient:
                                         interaction_request_msg=interaction_request_msg,
                                         correlation_id=correlation_id)
 
-    async def audio_push_from_buffer(self, session_stream, audio_buffer, correlation_id: str = None) -> bool:
+    async def audio_push_from_buffer(self, session_stream, audio_buffer, correlation_id: str = None,
+                                     chunk_bytes: int = None) -> bool:
         """
         Helper function to take an audio buffer (AudioBuffer defined in helper_audio_functions.py) and push its data
         into the session stream.
+        :param chunk_bytes: Optional number of bytes to push, instead of the buffer's chunk size.
 
         With every audio push, a session_event message is returned.
         """
-        audio_data = audio_buffer.get_next_chunk()
+        audio_data = audio_buffer.get_next_chunk(chunk_bytes=chunk_bytes)
         if audio_data is None:
             # We've reached the end of the buffer, so nothing else to send.
             return False
@@ -1004,6 +1632,11 @@ class LumenVoxApiClient:
         self.init_session_stream_maps(session_stream)
         await self.set_session_stream_for_reader_task(session_stream=session_stream)
 
+        # Each SessionCreate gets its own future, resolved by the stream's reader task, so concurrent session_init calls
+        # can never pick up each other's session IDs.
+        self.session_id_future_map[session_stream] = asyncio.get_running_loop().create_future()
+        self.start_session_stream_reader(session_stream)
+
         if session_id:
             await self.session_create(session_stream=session_stream, session_id=session_id,
                                       deployment_uuid=deployment_uuid, operator_uuid=operator_uuid,
@@ -1012,27 +1645,167 @@ class LumenVoxApiClient:
             await self.session_create(session_stream=session_stream, deployment_uuid=deployment_uuid,
                                       operator_uuid=operator_uuid, correlation_uuid=correlation_uuid)
 
-        session_id = await self.session_id_queue.get()
+        try:
+            session_id = await self.session_id_future_map[session_stream]
+        finally:
+            # The stream may already have been released (which drops its future), so don't assume the entry is there.
+            self.session_id_future_map.pop(session_stream, None)
         if session_id:
             print("session_id from session_create:", session_id)
 
         return session_stream, session_id
 
+    async def load_session_grammar(self, session_stream, language: str, grammar_label: str, grammar_url: str = None,
+                                   inline_grammar_text: str = None,
+                                   grammar_settings: settings_msg.GrammarSettings = None, correlation_id: str = None,
+                                   wait: float = 3) -> str:
+        """
+        Helper function to load a grammar for the session and track its label (see get_session_grammar_labels), so
+        that later interactions of the session can reference it instead of sending it again. A grammar already loaded
+        on the session (with the same language and settings) is not sent again.
+        :param session_stream: Stream of the session to load the grammar into.
+        :param language: Language of the grammar (e.g. 'en-US').
+        :param grammar_label: Label to reference the grammar by.
+        :param grammar_url: A grammar URL to be loaded.
+        :param inline_grammar_text: A string containing the raw grammar text.
+        :param grammar_settings: Optional grammar settings.
+        :param correlation_id: Optional UUID that can be used to track requests.
+        :param wait: Time (seconds) to wait for the response.
+        :return: Session grammar label the grammar is loaded under.
+        """
+        session_grammar_labels = self.get_session_grammar_labels(session_stream=session_stream)
+        grammar_key = grammar_helper.get_session_grammar_key(language=language, grammar_url=grammar_url,
+                                                             inline_grammar_text=inline_grammar_text,
+                                                             grammar_settings=grammar_settings)
+        if grammar_key in session_grammar_labels:
+            return session_grammar_labels[grammar_key]
+
+        correlation_id = correlation_id if correlation_id else str(uuid.uuid4())
+
+        # The response carries the request's correlation ID, which the session reader task uses to resolve this future,
+        # so it can't be confused with other responses of the session.
+        session_response_future = asyncio.get_running_loop().create_future()
+        self.session_response_future_map[correlation_id] = session_response_future
+
+        try:
+            await self.session_load_grammar(session_stream=session_stream, language=language,
+                                            grammar_label=grammar_label, grammar_url=grammar_url,
+                                            inline_grammar_text=inline_grammar_text,
+                                            grammar_settings=grammar_settings, correlation_id=correlation_id)
+            response = await asyncio.wait_for(session_response_future, wait)
+        except asyncio.TimeoutError:
+            response = None
+        finally:
+            self.session_response_future_map.pop(correlation_id, None)
+
+        if not response:
+            raise RuntimeError("No response received for the session load of grammar " + grammar_label + ".")
+
+        response_type = response.WhichOneof("response_type")
+        status = response.session_event.status_message if response_type == 'session_event' else \
+            response.session_grammar.status
+        if status.code:
+            raise Exception(status.code, status.message)
+
+        session_grammar_labels[grammar_key] = grammar_label
+
+        return grammar_label
+
+    def get_session_grammar_labels(self, session_stream) -> dict:
+        """
+        :param session_stream: Stream of the session.
+        :return: Map of the grammars loaded on the session (keyed by grammar_helper.get_session_grammar_key) to their
+        session grammar labels (see grammar_helper.define_grammar).
+        """
+        return self.session_grammar_label_map.get(session_stream, {})
+
     async def session_close_all(self, session_stream):
         """
         Helper function to handle closing session and stream. Check that SessionClose returns a proper status code (0).
         :param session_stream: Stream of the session to close.
         """
-        await self.session_close(session_stream=session_stream)
-        session_close_response = await self.get_session_general_response(session_stream=session_stream, wait=3)
+        try:
+            await self.session_close(session_stream=session_stream, release_stream=False)
+            session_close_response = await self.get_session_general_response(session_stream=session_stream, wait=3)
 
-        print("SessionClose response message:\n", session_close_response)
+            print("SessionClose response message:\n", session_close_response)
 
-        await session_stream.done_writing()
+            await session_stream.done_writing()
+        finally:
+            # Release the stream even if its reader failed, so the failed session does not stay registered.
+            await self.stop_session_stream_reader(session_stream)
+            self.release_session_stream(session_stream)
 
-    @staticmethod
-    async def global_stream_close(global_stream):
+    async def global_init(self):
+        """
+        Helper function to create a global stream and register it with the global reader task.
+        Global requests (such as GlobalLoadGrammarRequest) apply to the whole deployment rather than a single session.
+        :return: Global stream.
+        """
+        global_stream = await self.create_channel_and_init_stream(stream_type=StreamType.STREAM_TYPE_GLOBAL)
+        self.init_global_stream_maps(global_stream)
+        await self.set_global_stream_for_reader_task(global_stream=global_stream)
+        self.start_global_stream_reader(global_stream)
+
+        return global_stream
+
+    async def global_load_grammar(self, global_stream, deployment_uuid: str, operator_uuid: str, language: str,
+                                  grammar_label: str, grammar_url: str = None, inline_grammar_text: str = None,
+                                  grammar_settings: settings_msg.GrammarSettings = None, correlation_id: str = None,
+                                  wait: float = 30) -> global_msg.GlobalResponse:
+        """
+        Load a grammar for the whole deployment, so that interactions can reference it by label (see
+        common.proto Grammar.global_grammar_label) instead of sending and compiling the grammar each time.
+        :param global_stream: Global stream to send the request on (see global_init).
+        :param deployment_uuid: Unique UUID of the deployment to load the grammar into.
+        :param operator_uuid: Optional unique UUID can be used to track who is making API calls.
+        :param language: Language of the grammar (e.g. 'en-US').
+        :param grammar_label: Label to reference the grammar by. Must consist of letters, digits, hyphens and
+        underscores only.
+        :param grammar_url: A grammar URL to be loaded.
+        :param inline_grammar_text: A string containing the raw grammar text.
+        :param grammar_settings: Optional grammar settings.
+        :param correlation_id: Optional UUID can be used to track individual API calls.
+        :param wait: Time (seconds) to wait for the response.
+        :return: GlobalResponse to the request (global_grammar, or global_event on error). None if not received.
+        Raises the exception of the stream's reader task if it failed while waiting.
+        """
+        correlation_id = correlation_id if correlation_id else str(uuid.uuid4())
+
+        global_load_grammar_request = global_msg.GlobalLoadGrammarRequest(language=language,
+                                                                          grammar_label=grammar_label,
+                                                                          grammar_settings=grammar_settings)
+        if grammar_url:
+            global_load_grammar_request.grammar_url = grammar_url
+        else:
+            global_load_grammar_request.inline_grammar_text = inline_grammar_text
+
+        # The response carries the request's correlation ID, which the global reader task uses to resolve this future.
+        global_response_future = asyncio.get_running_loop().create_future()
+        self.global_response_future_map[correlation_id] = global_response_future
+
+        try:
+            await self.global_stream_write(global_stream=global_stream, deployment_uuid=deployment_uuid,
+                                           operator_uuid=operator_uuid, correlation_id=correlation_id,
+                                           global_load_grammar_request=global_load_grammar_request)
+
+            # Wait for whichever comes first: the response, or the end of the stream's reader.
+            reader_task = self.global_reader_task_map.get(global_stream)
+            await asyncio.wait({global_response_future, reader_task} if reader_task else {global_response_future},
+                               timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            if global_response_future.done():
+                return global_response_future.result()
+
+            if reader_task and reader_task.done() and not reader_task.cancelled() and reader_task.exception():
+                raise reader_task.exception()
+
+            return None
+        finally:
+            self.global_response_future_map.pop(correlation_id, None)
+
+    async def global_stream_close(self, global_stream):
         await global_stream.done_writing()
+        self.release_global_stream(global_stream)
 
     async def audio_pull_all(self, session_stream, audio_id: str, audio_channel: int = None, audio_start: int = None,
                              audio_length: int = None, correlation_id: str = None) -> bytes:
@@ -1066,32 +1839,51 @@ class LumenVoxApiClient:
     def kill_stream_reader_tasks(self):
         """
         Use this function to kill the stream-reading asyncio tasks, so they won't continue after all other functions.
+        In persistent loop mode the reader tasks are shared by every coroutine, so they are only killed when the client
+        exits (see __exit__) and this function does nothing.
         """
+        if self.persistent_loop:
+            return
+
         self.session_reader_task_cancel.set()
         self.global_reader_task_cancel.set()
 
-    async def get_streaming_response(self, session_stream, audio_push_finish_event: asyncio.Event, wait: int = 5):
+    async def get_streaming_response(self, session_stream, audio_push_finish_event: asyncio.Event, wait: float = 5,
+                                     interaction_id: str = None):
         """
         Some interactions, such as ASR, Transcription, AMD, and CPA may call for waiting for a final result message to
         be received from the API while audio is being streamed/processed.
-        This function runs a loop while audio_push_finish_event is not set to check for the final result message.
+        This function returns as soon as the final result is received. Once audio_push_finish_event is set, the result
+        is given at most `wait` more seconds to arrive.
         :param session_stream: Stream of the session to receive a final result message from.
         :param audio_push_finish_event: An event that is set when audio is done being sent.
-        :param wait: Time to wait for final response message for each loop iteration.
+        :param wait: Time (seconds) to wait for the final result message after all audio has been sent.
+        :param interaction_id: ID of the interaction to wait for. If not provided, the next final result received on the
+        session stream is returned.
         :return: Final result message. None if not received.
         """
-        final_result = None
-
-        # Run a loop to check for final result while the audio is being pushed.
-        while not audio_push_finish_event.is_set():
-            # Check for final result while this loop runs.
-            # This next call will return None if the final result is not ready yet.
-            final_result = await self.get_session_final_result(session_stream=session_stream, wait=wait)
-
-            # Break this loop if we get the final result.
-            if final_result:
-                break
-
-            await asyncio.sleep(0.0)  # Use this sleep to enable an asyncio loop.
+        if interaction_id:
+            final_result_future = self.get_final_result_future(session_stream=session_stream,
+                                                               interaction_id=interaction_id)
+            # Shield the future so that giving up on it here leaves it available to other waiters.
+            result_task = asyncio.shield(final_result_future)
+        elif session_stream in self.queue_map:
+            result_task = asyncio.ensure_future(self.queue_map[session_stream].result_queue.get())
+        else:
+            return None
 
-        return final_result
+        audio_push_finish_task = asyncio.ensure_future(audio_push_finish_event.wait())
+        try:
+            # Wait for whichever comes first: the final result, or the end of the audio.
+            await asyncio.wait({result_task, audio_push_finish_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not result_task.done():
+                await asyncio.wait({result_task}, timeout=wait)
+        finally:
+            audio_push_finish_task.cancel()
+
+        # A result wait that failed (the session stream ended first) is treated as no result.
+        if result_task.done() and not result_task.cancelled() and not result_task.exception():
+            return result_task.result()
+
+        result_task.cancel()
+        return None
@@ -153,6 +153,8 @@ if __name__ == '__main__':
 
     # Initialize the LumenVoxApiClient class which houses the underlying read/write API functions, as well as allow the
     # user to run sessions as tasks along with other tasks to read responses from the API.
-    lumenvox_api = LumenVoxApiClient()
-    process_interactions(tsv_read_file_path=tsv_file_path, tsv_result_file_path=tsv_result_path,
-                         lumenvox_api_client=lumenvox_api)
+    # Using the client as a context manager keeps one event loop, one set of reader tasks and one channel pool for
+    # every row of the TSV.
+    with LumenVoxApiClient() as lumenvox_api:
+        process_interactions(tsv_read_file_path=tsv_file_path, tsv_result_file_path=tsv_result_path,
+                             lumenvox_api_client=lumenvox_api)
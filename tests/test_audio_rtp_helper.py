@@ -0,0 +1,206 @@
+"""
+Tests for helpers/audio_rtp_helper.py: the RTP jitter buffer, and RtpAudioSource receiving packets over loopback UDP.
+"""
+import asyncio
+import socket
+import struct
+import unittest
+
+from helpers.audio_rtp_helper import RTP_PAYLOAD_TYPE_PCMA
+from helpers.audio_rtp_helper import RTP_PAYLOAD_TYPE_PCMU
+from helpers.audio_rtp_helper import RTP_SILENCE_BYTES
+from helpers.audio_rtp_helper import RtpAudioSource
+from helpers.audio_rtp_helper import RtpJitterBuffer
+from helpers.audio_rtp_helper import parse_rtp_packet
+
+PAYLOAD_SIZE = 160  # 20ms of G.711 audio at 8kHz.
+SSRC = 0x1234
+
+
+def build_rtp_packet(sequence_number: int, payload: bytes, payload_type: int = RTP_PAYLOAD_TYPE_PCMU,
+                     ssrc: int = SSRC) -> bytes:
+    """
+    :param sequence_number: Sequence number of the packet (wrapped to 16 bits).
+    :param payload: Audio payload of the packet.
+    :param payload_type: RTP payload type.
+    :param ssrc: Synchronization source of the stream.
+    :return: Datagram holding the RTP packet.
+    """
+    header = struct.pack('!BBHII', 0x80, payload_type, sequence_number % 0x10000, sequence_number * PAYLOAD_SIZE, ssrc)
+    return header + payload
+
+
+def build_payloads(count: int) -> list:
+    """
+    :param count: Number of payloads.
+    :return: Payloads that are distinct from each other and from silence.
+    """
+    return [bytes([index % 200 + 1]) * PAYLOAD_SIZE for index in range(count)]
+
+
+class RtpJitterBufferTest(unittest.TestCase):
+    def add_packets(self, jitter_buffer: RtpJitterBuffer, first_sequence_number: int, payloads: list,
+                    order: list) -> bytes:
+        """
+        :return: Audio released by the jitter buffer (including what is held at the end), for packets added in order.
+        """
+        released = []
+        for index in order:
+            packet = parse_rtp_packet(build_rtp_packet(first_sequence_number + index, payloads[index]))
+            released += jitter_buffer.add_packet(packet)
+
+        return b''.join(released + jitter_buffer.reset())
+
+    def test_in_order(self):
+        payloads = build_payloads(20)
+        jitter_buffer = RtpJitterBuffer()
+
+        self.assertEqual(self.add_packets(jitter_buffer, 1000, payloads, list(range(20))), b''.join(payloads))
+        self.assertEqual(jitter_buffer.packets_lost, 0)
+        self.assertEqual(jitter_buffer.packets_reordered, 0)
+
+    def test_reordering(self):
+        payloads = build_payloads(20)
+        order = [0, 2, 1, 3, 6, 4, 5, 7, 8, 9, 11, 10, 12, 13, 14, 15, 16, 17, 19, 18]
+        jitter_buffer = RtpJitterBuffer()
+
+        self.assertEqual(self.add_packets(jitter_buffer, 1000, payloads, order), b''.join(payloads))
+        self.assertEqual(jitter_buffer.packets_lost, 0)
+        self.assertEqual(jitter_buffer.packets_reordered, 5)
+
+    def test_loss_is_concealed(self):
+        payloads = build_payloads(20)
+        lost = {5, 6, 12}
+        jitter_buffer = RtpJitterBuffer()
+
+        audio = self.add_packets(jitter_buffer, 1000, payloads, [index for index in range(20) if index not in lost])
+        expected = b''.join(RTP_SILENCE_BYTES[RTP_PAYLOAD_TYPE_PCMU] * PAYLOAD_SIZE if index in lost else payload
+                            for index, payload in enumerate(payloads))
+        self.assertEqual(audio, expected)
+        self.assertEqual(jitter_buffer.packets_lost, len(lost))
+
+    def test_loss_without_concealment(self):
+        payloads = build_payloads(20)
+        jitter_buffer = RtpJitterBuffer(conceal_loss=False)
+
+        audio = self.add_packets(jitter_buffer, 1000, payloads, [index for index in range(20) if index != 5])
+        self.assertEqual(audio, b''.join(payloads[:5] + payloads[6:]))
+        self.assertEqual(jitter_buffer.packets_lost, 1)
+
+    def test_sequence_wrap(self):
+        payloads = build_payloads(20)
+        order = [0, 1, 2, 4, 3, 5, 6, 7, 9, 8, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19]
+        jitter_buffer = RtpJitterBuffer()
+
+        # Sequence numbers run from 65530 through 0 to 13.
+        self.assertEqual(self.add_packets(jitter_buffer, 65530, payloads, order), b''.join(payloads))
+        self.assertEqual(jitter_buffer.packets_lost, 0)
+        self.assertEqual(jitter_buffer.packets_late, 0)
+
+    def test_loss_across_sequence_wrap(self):
+        payloads = build_payloads(20)
+        lost = {5, 6}  # Sequence numbers 65535 and 0.
+        jitter_buffer = RtpJitterBuffer()
+
+        audio = self.add_packets(jitter_buffer, 65530, payloads, [index for index in range(20) if index not in lost])
+        self.assertEqual(len(audio), len(b''.join(payloads)))
+        self.assertEqual(jitter_buffer.packets_lost, len(lost))
+
+    def test_duplicates(self):
+        payloads = build_payloads(20)
+        # Packet 3 is re-delivered while held, and packet 1 after it was released.
+        order = [0, 1, 3, 3, 2, 1, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19]
+        jitter_buffer = RtpJitterBuffer()
+
+        self.assertEqual(self.add_packets(jitter_buffer, 1000, payloads, order), b''.join(payloads))
+        self.assertEqual(jitter_buffer.packets_duplicate, 2)
+        self.assertEqual(jitter_buffer.packets_late, 0)
+
+    def test_late_packet(self):
+        payloads = build_payloads(20)
+        # Packet 2 arrives after enough later packets were held for it to be skipped as lost.
+        order = [0, 1, 3, 4, 5, 6, 7, 8, 2, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19]
+        jitter_buffer = RtpJitterBuffer()
+
+        self.add_packets(jitter_buffer, 1000, payloads, order)
+        self.assertEqual(jitter_buffer.packets_lost, 1)
+        self.assertEqual(jitter_buffer.packets_late, 1)
+        self.assertEqual(jitter_buffer.packets_duplicate, 0)
+
+
+class RtpAudioSourceTest(unittest.IsolatedAsyncioTestCase):
+    async def receive_audio(self, datagrams: list, **kwargs) -> tuple:
+        """
+        Send the datagrams to an RtpAudioSource over loopback UDP and read the audio until it ends.
+        :return: Audio read from the source, and the source's stats.
+        """
+        audio_source = RtpAudioSource(host='127.0.0.1', port=0, end_timeout_s=0.3, **kwargs)
+        await audio_source.open()
+        port = audio_source.transport.get_extra_info('sockname')[1]
+
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for datagram in datagrams:
+                sender.sendto(datagram, ('127.0.0.1', port))
+                # Give the source a chance to receive each datagram, so that loopback keeps the order they were sent in.
+                await asyncio.sleep(0.001)
+        finally:
+            sender.close()
+
+        try:
+            audio = await audio_source.read_all()
+        finally:
+            audio_source.close()
+
+        return audio, audio_source.get_stats()
+
+    async def test_reordering_across_sequence_wrap(self):
+        payloads = build_payloads(30)
+        order = list(range(30))
+        for index in range(1, 27, 5):
+            order[index], order[index + 1] = order[index + 1], order[index]
+
+        audio, stats = await self.receive_audio([build_rtp_packet(65520 + index, payloads[index]) for index in order])
+        self.assertEqual(audio, b''.join(payloads))
+        self.assertEqual(stats['packets_lost'], 0)
+        self.assertGreater(stats['packets_reordered'], 0)
+
+    async def test_loss(self):
+        payloads = build_payloads(30)
+        lost = {10, 11, 20}
+        datagrams = [build_rtp_packet(500 + index, payload, payload_type=RTP_PAYLOAD_TYPE_PCMA)
+                     for index, payload in enumerate(payloads) if index not in lost]
+
+        audio, stats = await self.receive_audio(datagrams)
+        expected = b''.join(RTP_SILENCE_BYTES[RTP_PAYLOAD_TYPE_PCMA] * PAYLOAD_SIZE if index in lost else payload
+                            for index, payload in enumerate(payloads))
+        self.assertEqual(audio, expected)
+        self.assertEqual(stats['packets_lost'], len(lost))
+
+    async def test_duplicates_and_ignored_packets(self):
+        payloads = build_payloads(10)
+        datagrams = [build_rtp_packet(100 + index, payload) for index, payload in enumerate(payloads)]
+        datagrams.insert(5, datagrams[2])  # Duplicate of a released packet.
+        datagrams.insert(3, build_rtp_packet(100, b'\x01\x02\x03\x04', payload_type=101))  # DTMF event.
+        datagrams.insert(1, b'not rtp')
+
+        audio, stats = await self.receive_audio(datagrams)
+        self.assertEqual(audio, b''.join(payloads))
+        self.assertEqual(stats['packets_duplicate'], 1)
+        self.assertEqual(stats['packets_late'], 0)
+        self.assertEqual(stats['packets_ignored'], 2)
+
+    async def test_new_ssrc_restarts_sequence(self):
+        payloads = build_payloads(20)
+        datagrams = [build_rtp_packet(100 + index, payload) for index, payload in enumerate(payloads[:10])]
+        datagrams += [build_rtp_packet(40000 + index, payload, ssrc=SSRC + 1)
+                      for index, payload in enumerate(payloads[10:])]
+
+        audio, stats = await self.receive_audio(datagrams)
+        self.assertEqual(audio, b''.join(payloads))
+        self.assertEqual(stats['packets_late'], 0)
+        self.assertEqual(stats['packets_lost'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
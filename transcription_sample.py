@@ -162,12 +162,13 @@ async def transcription(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCli
             session_stream=session_stream, interaction_id=interaction_id, correlation_id=correlation_id)
         final_result = await lumenvox_api_client.get_session_final_result(session_stream=session_stream)
     else:
-        # Call get_streaming_response which runs a loop attempting to receive the final result message as audio is being
+        # Call get_streaming_response which waits for the final result message of the interaction as audio is being
         # pushed and processed.
         # Adjust the wait parameter of get_streaming_response if having issues getting the result in time.
         final_result = \
             await lumenvox_api_client.get_streaming_response(
-                session_stream=session_stream, audio_push_finish_event=audio_push_finish_event)
+                session_stream=session_stream, audio_push_finish_event=audio_push_finish_event,
+                interaction_id=interaction_id)
 
     # Collect partial results here in cases like Continuous Transcription where they are returned.
     partial_results_received = []
@@ -42,7 +42,8 @@ from transcription_sample import transcription
 
 
 def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient, tsv_read_file_path: str,
-                         tsv_result_file_path: str, extensions: list = None, normalization_enabled: bool = False):
+                         tsv_result_file_path: str, extensions: list = None, normalization_enabled: bool = False,
+                         speed_factor: float = None, trim_silence: bool = False):
     # Define an audio format for ULAW 8kHz. See the audio_helper file referenced above for more information on the
     # data within these messages.
     audio_format_msg = AUDIO_FORMAT_ULAW_8KHZ
@@ -87,7 +88,6 @@ def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCl
     # Loop through files referenced in TSV and run ASR interactions.
     with (open(tsv_read_file_path) as tsv_file):
         first_line_read = False
-        filepath = ''
 
         # Loop through each line in file.
         for line in tsv_file:
@@ -102,6 +102,7 @@ def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCl
 
             # Grab the filepath from the TSV entry.
             # Check for extensions if provided.
+            filepath = ''
             if extensions:
                 for ext in extensions:
                     if split_line[0].endswith(ext):
@@ -125,7 +126,12 @@ def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCl
                         lumenvox_api_client=lumenvox_api_client,
                         chunk_audio=True,
                         audio_push_chunk_size_bytes=4000,
-                        audio_push_sleep_override=0.1,
+                        # Push at the given speed factor if provided (0 being unthrottled), otherwise sleep a fixed
+                        # 0.1 seconds between chunks.
+                        audio_push_sleep_override=0.1 if speed_factor is None else 0,
+                        audio_push_speed_factor=1 if speed_factor is None else speed_factor,
+                        # Drop leading and trailing silence before pushing, if enabled.
+                        trim_silence=trim_silence,
                     )
 
                 # Run the coroutine for the file referenced in the TSV.
@@ -134,9 +140,10 @@ def process_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiCl
 
                 # The function that handles the interaction will be run alongside the stream-reading tasks.
                 # Upon finishing, the tasks will provide return values as a tuple. run_user_coroutine returns those
-                # values, the first of which being the result needed for this script.
+                # values, the first of which being the result needed for this script. The transcription function
+                # returns the final result along with any partial results, so only the final result is taken.
                 loop_run_return_values = lumenvox_api_client.run_user_coroutine(user_coroutine=coroutine)
-                final_result_msg = loop_run_return_values[0]
+                final_result_msg, _ = loop_run_return_values[0]
 
                 # Write results to TSV file.
                 write_result_info_to_tsv(tsv_file=results_tsv, result_msg=final_result_msg, audio_file_ref=filepath,
@@ -207,9 +214,11 @@ def print_available_sys_args():
     """
     print("sys.argv[1] - TSV file to get audio file paths from")
     print("sys.argv[2] - TSV file to write to")
-    print("(optional) sys.argv[3:] - Normalization flag and Audio file extensions to limit to.")
+    print("(optional) sys.argv[3:] - Normalization flag, Audio file extensions to limit to, audio push speed and "
+          "silence trimming.")
     print("Ex.:")
     print('python3 transcription_tsv.py "C:\test_audio_ref_file.tsv" results.tsv -norm 1 -ext .raw -ext .ulaw')
+    print('python3 transcription_tsv.py "C:\test_audio_ref_file.tsv" results.tsv -speed 10 -trim 1')
 
 
 if __name__ == '__main__':
@@ -220,6 +229,8 @@ if __name__ == '__main__':
     (optional) sys.argv[3:] - Normalization flag and Audio file extensions to limit to.
         "-norm 1" - enable normalization
         "-ext .ulaw -ext .alaw" - File extensions 
+        "-speed 10" - Push audio at 10x real time ("-speed 0" pushes audio as fast as possible)
+        "-trim 1" - Drop leading and trailing silence before pushing audio
 
     Ex.:
     python3 transcription_tsv.py "C:\test_audio_ref_file.tsv" results.tsv -norm 1 -ext .raw -ext .ulaw
@@ -247,6 +258,8 @@ if __name__ == '__main__':
 
     enable_normalization = False
     file_extensions = None
+    audio_push_speed = None
+    enable_silence_trimming = False
 
     if other_options:
         # Iterate through other provided arguments and determine normalization flag/
@@ -258,15 +271,21 @@ if __name__ == '__main__':
                     if not file_extensions:
                         file_extensions = []
                     file_extensions.append(other_options[i + 1])
-            except IndexError:
+                if other_options[i] == '-speed':
+                    audio_push_speed = float(other_options[i + 1])
+                if other_options[i] == '-trim':
+                    enable_silence_trimming = True if int(other_options[i + 1]) else False
+            except (IndexError, ValueError):
                 print("Arguments incorrectly formatted.")
                 print_available_sys_args()
 
     # Initialize the LumenVoxApiClient class which houses the underlying read/write API functions, as well as allow the
     # user to run sessions as tasks along with other tasks to read responses from the API.
-    lumenvox_api = LumenVoxApiClient()
-
-    # Run through interactions here (and specify different grammars or settings if need be).
-    process_interactions(lumenvox_api_client=lumenvox_api, tsv_read_file_path=tsv_file_path,
-                         tsv_result_file_path=tsv_result_path, extensions=file_extensions,
-                         normalization_enabled=enable_normalization)
+    # Using the client as a context manager keeps one event loop, one set of reader tasks and one channel pool for
+    # every row of the TSV.
+    with LumenVoxApiClient() as lumenvox_api:
+        # Run through interactions here (and specify different grammars or settings if need be).
+        process_interactions(lumenvox_api_client=lumenvox_api, tsv_read_file_path=tsv_file_path,
+                             tsv_result_file_path=tsv_result_path, extensions=file_extensions,
+                             normalization_enabled=enable_normalization, speed_factor=audio_push_speed,
+                             trim_silence=enable_silence_trimming)
@@ -33,6 +33,8 @@ from lumenvox_api_handler import LumenVoxApiClient
 from helpers.audio_helper import AudioHandler
 # Import the AudioFormat used in this file.
 from helpers.audio_helper import AUDIO_FORMAT_WAV_8KHZ
+# Both interactions use the same file, so it is read once through the shared audio cache.
+from helpers.audio_cache_helper import shared_audio_cache
 
 # This script will utilize the TranscriptionInteractionData class from the transcription_sample.py
 from transcription_sample import TranscriptionInteractionData
@@ -93,7 +95,8 @@ def run_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient
             audio_file_path=audio_file_path,
             audio_format=audio_format_msg,
             audio_push_chunk_size_bytes=audio_chunk_size,
-            lumenvox_api_client=lumenvox_api_client))
+            lumenvox_api_client=lumenvox_api_client,
+            audio_cache=shared_audio_cache))
     interaction_data_1.audio_handler.print_audio_push_messages = print_audio_push_messages
     interaction_data_1.audio_consume_settings = audio_consume_settings_1
     interaction_data_1.recognition_settings = recognition_settings
@@ -106,7 +109,8 @@ def run_interactions(lumenvox_api_client: lumenvox_api_handler.LumenVoxApiClient
             audio_file_path=audio_file_path,
             audio_format=audio_format_msg,
             audio_push_chunk_size_bytes=audio_chunk_size,
-            lumenvox_api_client=lumenvox_api_client))
+            lumenvox_api_client=lumenvox_api_client,
+            audio_cache=shared_audio_cache))
     interaction_data_2.audio_handler.print_audio_push_messages = print_audio_push_messages
     interaction_data_2.audio_consume_settings = audio_consume_settings_2
     interaction_data_2.recognition_settings = recognition_settings
@@ -0,0 +1,256 @@
+"""
+TSV Process Pool Runner
+This script runs one of the TSV scripts (asr_batch_transcription_tsv.py, transcription_tsv.py or
+normalize_text_tsv.py) across multiple worker processes, for corpora large enough that a single Python process
+becomes the bottleneck.
+
+The rows of the input TSV are split into contiguous shards. Each shard is run in a worker process with its own
+LumenVoxApiClient (and so its own event loop and channel pool), using the process_interactions function of the
+selected script. Once all shards have finished, their results are merged into one results file in input order. If any
+shards fail, the results of the others are still merged, and the failed shards are reported afterwards.
+
+Example to run:
+python3 tsv_process_pool_runner.py asr_batch_transcription_tsv "C:\\test_audio_ref_file.tsv" results.tsv --workers 8
+
+Options:
+--workers N - Number of worker processes (defaults to the number of CPUs).
+--shard-size N - Number of rows per shard (defaults to splitting the rows evenly across the workers).
+
+Options accepted by the selected script's process_interactions function can be passed through as well (options the
+selected script doesn't accept are rejected before any shard is run):
+-ext .ulaw - (asr_batch_transcription_tsv / transcription_tsv) File extension to limit to; can be repeated.
+-norm 1 - (transcription_tsv) Enable normalization.
+-speed N - (transcription_tsv) Push audio at N times real time (0 for as fast as possible).
+-trim 1 - (transcription_tsv) Drop leading and trailing silence before pushing audio.
+--concurrency N - (asr_batch_transcription_tsv) Interactions to run at once within each worker.
+--cache-mb N - (asr_batch_transcription_tsv) MB of audio files to cache in memory within each worker.
+--global-grammars - (asr_batch_transcription_tsv) Load the grammar once per worker and reference it by label.
+"""
+import importlib
+import inspect
+import os
+import shutil
+import sys
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+
+# Import code needed to interact with the API.
+from lumenvox_api_handler import LumenVoxApiClient
+
+# TSV scripts that can be run through the process pool.
+TSV_SCRIPT_MODULES = ['asr_batch_transcription_tsv', 'transcription_tsv', 'normalize_text_tsv']
+
+
+def run_shard(script_module_name: str, shard_read_file_path: str, shard_result_file_path: str,
+              process_interactions_kwargs: dict):
+    """
+    Run the interactions for one shard of the input TSV. This runs in a worker process.
+    :param script_module_name: Name of the TSV script module whose process_interactions function is used.
+    :param shard_read_file_path: Path to the TSV file holding the rows of this shard.
+    :param shard_result_file_path: Path to the TSV file to write this shard's results to.
+    :param process_interactions_kwargs: Additional keyword arguments for process_interactions.
+    """
+    script_module = importlib.import_module(script_module_name)
+
+    # Each shard gets its own client, and so its own event loop, reader tasks and channel pool.
+    with LumenVoxApiClient() as lumenvox_api:
+        script_module.process_interactions(lumenvox_api_client=lumenvox_api, tsv_read_file_path=shard_read_file_path,
+                                           tsv_result_file_path=shard_result_file_path,
+                                           **process_interactions_kwargs)
+
+
+def check_process_interactions_kwargs(script_module_name: str, process_interactions_kwargs: dict):
+    """
+    Check that the selected script's process_interactions function accepts the given options, so that an unsupported
+    option is reported before any shard is run instead of failing in every worker.
+    :param script_module_name: Name of the TSV script module whose process_interactions function is used.
+    :param process_interactions_kwargs: Additional keyword arguments for process_interactions.
+    """
+    script_module = importlib.import_module(script_module_name)
+    accepted_parameters = inspect.signature(script_module.process_interactions).parameters
+
+    unsupported_options = [name for name in process_interactions_kwargs if name not in accepted_parameters]
+    if unsupported_options:
+        raise ValueError(script_module_name + " does not support the option(s): " + ", ".join(unsupported_options))
+
+
+def write_shard_files(tsv_read_file_path: str, shard_dir: str, shard_size: int) -> list:
+    """
+    Split the rows of the input TSV into shard files, each beginning with the header of the input TSV.
+    :param tsv_read_file_path: Path to the input TSV file.
+    :param shard_dir: Directory to write the shard files to.
+    :param shard_size: Maximum number of rows per shard.
+    :return: List of shard file paths, in input order.
+    """
+    with open(tsv_read_file_path) as tsv_file:
+        header = tsv_file.readline()
+        rows = [line for line in tsv_file if line.strip()]
+
+    shard_file_paths = []
+    for shard_index, row_index in enumerate(range(0, len(rows), shard_size)):
+        shard_file_path = os.path.join(shard_dir, 'shard_' + str(shard_index) + '.tsv')
+        with open(shard_file_path, 'w') as shard_file:
+            shard_file.write(header)
+            shard_file.writelines(rows[row_index:row_index + shard_size])
+        shard_file_paths.append(shard_file_path)
+
+    return shard_file_paths
+
+
+def merge_shard_results(shard_result_file_paths: list, tsv_result_file_path: str):
+    """
+    Merge the shard result files into the results TSV, keeping the header line of the first shard only.
+    :param shard_result_file_paths: List of shard result file paths, in input order.
+    :param tsv_result_file_path: Path to TSV to save results to.
+    """
+    header_written = False
+
+    with open(tsv_result_file_path, 'a') as results_tsv:
+        for shard_result_file_path in shard_result_file_paths:
+            if not os.path.exists(shard_result_file_path):
+                continue
+
+            with open(shard_result_file_path) as shard_result_file:
+                header = shard_result_file.readline()
+                if not header_written:
+                    results_tsv.write(header)
+                    header_written = True
+                shutil.copyfileobj(shard_result_file, results_tsv)
+
+
+def process_interactions_in_pool(script_module_name: str, tsv_read_file_path: str, tsv_result_file_path: str,
+                                 workers: int = None, shard_size: int = None,
+                                 process_interactions_kwargs: dict = None):
+    """
+    Run the interactions for the input TSV across a pool of worker processes and merge the results.
+    :param script_module_name: Name of the TSV script module whose process_interactions function is used.
+    :param tsv_read_file_path: Path to the input TSV file.
+    :param tsv_result_file_path: Path to TSV to save results to.
+    :param workers: Number of worker processes (defaults to the number of CPUs).
+    :param shard_size: Number of rows per shard (defaults to splitting the rows evenly across the workers).
+    :param process_interactions_kwargs: Additional keyword arguments for process_interactions.
+    """
+    if script_module_name not in TSV_SCRIPT_MODULES:
+        raise ValueError("Unsupported TSV script: " + script_module_name + ". Expected one of: " +
+                         ", ".join(TSV_SCRIPT_MODULES))
+
+    check_process_interactions_kwargs(script_module_name=script_module_name,
+                                      process_interactions_kwargs=process_interactions_kwargs or {})
+
+    workers = workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as shard_dir:
+        with open(tsv_read_file_path) as tsv_file:
+            row_count = sum(1 for line in tsv_file if line.strip()) - 1
+        if not shard_size:
+            shard_size = max(1, -(-row_count // workers))
+
+        shard_file_paths = write_shard_files(tsv_read_file_path=tsv_read_file_path, shard_dir=shard_dir,
+                                             shard_size=shard_size)
+        shard_result_file_paths = [path[:-len('.tsv')] + '_result.tsv' for path in shard_file_paths]
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(shard_file_paths)) or 1) as executor:
+            futures = [executor.submit(run_shard, script_module_name, shard_file_path, shard_result_file_path,
+                                       process_interactions_kwargs or {})
+                       for shard_file_path, shard_result_file_path in zip(shard_file_paths, shard_result_file_paths)]
+
+            # A failed shard doesn't stop the others; the results of the shards that finished are merged first.
+            failed_shards = []
+            for shard_index, future in enumerate(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failed_shards.append((shard_index, e))
+
+        failed_shard_indexes = [shard_index for shard_index, _ in failed_shards]
+        merge_shard_results(shard_result_file_paths=[path for shard_index, path in enumerate(shard_result_file_paths)
+                                                     if shard_index not in failed_shard_indexes],
+                            tsv_result_file_path=tsv_result_file_path)
+
+    if failed_shards:
+        raise RuntimeError("Shards failed (their rows are missing from the results): " + "; ".join(
+            "shard " + str(shard_index) + " (rows " + str(shard_index * shard_size + 1) + "-" +
+            str(min((shard_index + 1) * shard_size, row_count)) + "): " + repr(e) for shard_index, e in failed_shards))
+
+
+def print_available_sys_args():
+    """
+    Print system arguments upon error.
+    :return:
+    """
+    print("sys.argv[1] - TSV script to run (" + ", ".join(TSV_SCRIPT_MODULES) + ")")
+    print("sys.argv[2] - TSV file to read from")
+    print("sys.argv[3] - TSV file to write to")
+    print("(optional) --workers N - Number of worker processes")
+    print("(optional) --shard-size N - Number of rows per shard")
+    print("(optional) -ext .ulaw - File extension to limit to (can be repeated)")
+    print("(optional) -norm 1 - Enable normalization (transcription_tsv)")
+    print("(optional) -speed N - Push audio at N times real time (transcription_tsv)")
+    print("(optional) -trim 1 - Drop leading and trailing silence before pushing audio (transcription_tsv)")
+    print("(optional) --concurrency N - Interactions to run at once in each worker (asr_batch_transcription_tsv)")
+    print("(optional) --cache-mb N - MB of audio files to cache in each worker (asr_batch_transcription_tsv)")
+    print("(optional) --global-grammars - Load the grammar once and reference it by label "
+          "(asr_batch_transcription_tsv)")
+    print("Ex.:")
+    print('python3 tsv_process_pool_runner.py asr_batch_transcription_tsv "C:\\test_audio_ref_file.tsv" results.tsv '
+          '--workers 8')
+
+
+if __name__ == '__main__':
+    """
+    Run one of the TSV scripts across a pool of worker processes.
+    sys.argv[1] - TSV script to run.
+    sys.argv[2] - TSV file to read from.
+    sys.argv[3] - TSV file to write to.
+    (optional) sys.argv[4:] - Pool options and options for the TSV script.
+    """
+
+    if len(sys.argv) < 4:
+        print("Invalid number of arguments")
+        print_available_sys_args()
+
+        sys.exit()
+
+    # Allow the script to be given as a file name as well as a module name.
+    script_name = os.path.splitext(os.path.basename(sys.argv[1]))[0]
+    tsv_file_path = sys.argv[2]
+    tsv_result_path = sys.argv[3]
+
+    # This will grab the list of other arguments if one or more were provided.
+    other_options: list = sys.argv[4:]
+
+    worker_count = None
+    rows_per_shard = None
+    script_kwargs = {}
+
+    # Iterate through other provided arguments and determine the pool and script options.
+    for i in range(len(other_options)):
+        try:
+            if other_options[i] == '--workers':
+                worker_count = int(other_options[i + 1])
+            if other_options[i] == '--shard-size':
+                rows_per_shard = int(other_options[i + 1])
+            if other_options[i] == '--concurrency':
+                script_kwargs['concurrency'] = int(other_options[i + 1])
+            if other_options[i] == '--cache-mb':
+                script_kwargs['audio_cache_max_bytes'] = int(float(other_options[i + 1]) * 1024 * 1024)
+            if other_options[i] == '--global-grammars':
+                script_kwargs['global_grammars'] = True
+            if other_options[i] == '-norm':
+                script_kwargs['normalization_enabled'] = True if int(other_options[i + 1]) else False
+            if other_options[i] == '-speed':
+                script_kwargs['speed_factor'] = float(other_options[i + 1])
+            if other_options[i] == '-trim':
+                script_kwargs['trim_silence'] = True if int(other_options[i + 1]) else False
+            if other_options[i] == '-ext':
+                script_kwargs.setdefault('extensions', []).append(other_options[i + 1])
+        except (IndexError, ValueError):
+            print("Arguments incorrectly formatted.")
+            print_available_sys_args()
+
+            sys.exit()
+
+    process_interactions_in_pool(script_module_name=script_name, tsv_read_file_path=tsv_file_path,
+                                 tsv_result_file_path=tsv_result_path, workers=worker_count,
+                                 shard_size=rows_per_shard, process_interactions_kwargs=script_kwargs)